@@ -11,18 +11,22 @@ from .prices import (
     gecko_price_chart,
     gecko_price_current,
     gecko_price_historical,  # back-compat alias for gecko_price_chart
+    gecko_price_range,
     llama_price_chart,
     llama_price_historical,
     twelvedata_price_chart,  # alias for twelvedata_price_historical
     twelvedata_price_current,
     twelvedata_price_historical,
 )
+from .series import PriceSeries
 
 # Define public API
 __all__ = [
+    "PriceSeries",
     "gecko_price_chart",
     "gecko_price_current",
     "gecko_price_historical",
+    "gecko_price_range",
     "llama_price_chart",
     "llama_price_historical",
     "twelvedata_price_chart",
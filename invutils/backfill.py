@@ -0,0 +1,282 @@
+"""Resumable, checkpointed backfill jobs shared by any number of worker processes."""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from .config import (
+    DEFILLAMA_CHART_MAX_SPAN,
+    DEFILLAMA_PERIOD_SECONDS,
+    TWELVEDATA_INTERVAL_SECONDS,
+    TWELVEDATA_MAX_OUTPUTSIZE,
+    TWELVEDATA_NO_DATA,
+)
+from .prices import llama_price_chart, twelvedata_price_historical
+from .utils import KeyPool, priority_scope
+from .utils.dates import format_utc
+
+logger = logging.getLogger(__name__)
+
+# A claimed unit whose worker has not finished within this many seconds is reclaimed
+DEFAULT_LEASE = 600.0
+
+# Attempts before a unit is marked failed and skipped
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    coin_id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    interval TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    count INTEGER,
+    error TEXT,
+    UNIQUE (provider, coin_id, start, end, interval)
+)
+"""
+
+
+class Unit(NamedTuple):
+    """One (id, window) unit of work: points in [start, end) at the given interval."""
+
+    seq: int
+    provider: str
+    coin_id: str
+    start: int
+    end: int
+    interval: str
+
+
+def fetch_unit(unit: Unit, api_key: Union[str, KeyPool, None] = None) -> Dict[str, Any]:
+    """Fetch one unit's window with the matching provider function and return its envelope."""
+    if unit.provider == "defillama":
+        span = max(1, (unit.end - unit.start) // DEFILLAMA_PERIOD_SECONDS[unit.interval])
+        return llama_price_chart(unit.coin_id, unit.start, span, period=unit.interval)
+    if unit.provider == "twelvedata":
+        if not api_key:
+            raise ValueError("twelvedata units need an API key")
+        return twelvedata_price_historical(
+            unit.coin_id,
+            api_key,
+            interval=unit.interval,
+            outputsize=TWELVEDATA_MAX_OUTPUTSIZE,
+            start_date=format_utc(unit.start),
+            end_date=format_utc(unit.end - 1),
+            epoch=True,
+            timezone="UTC",
+        )
+    raise ValueError(f"unknown provider '{unit.provider}'")
+
+
+def _empty(unit: Unit, envelope: Dict[str, Any]) -> bool:
+    """True for a valid answer with no points, e.g. a window before the asset was listed."""
+    if unit.provider == "defillama":
+        # Every page was answered and none had points
+        return envelope.get("missing_windows") == []
+    return str(envelope.get("message", "")).startswith(TWELVEDATA_NO_DATA)
+
+
+class BackfillJob:
+    """
+    A backfill split into (id, window) units, checkpointed in SQLite.
+
+    Units are added once (re-adding is a no-op), claimed atomically by workers in
+    insertion order, and marked done only after the caller's sink has stored
+    their points. Restarting a worker resumes from the first incomplete unit;
+    claims held by dead workers expire after ``lease`` seconds. Several worker
+    processes can run against the same file without duplicating work.
+
+    Args:
+        path: SQLite checkpoint file
+        lease: Seconds before an unfinished claim may be taken by another worker
+        max_attempts: Failures after which a unit is marked 'failed' and skipped
+
+    Example:
+        >>> job = BackfillJob('eth-5m.sqlite')
+        >>> job.add_defillama(['ethereum:0x...'], start=1609459200, end=1640995200, period='5m')
+        >>> job.run(lambda unit, points: store(points))
+        >>> job.progress()
+        {'pending': 0, 'claimed': 0, 'done': 220, 'failed': 0}
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease: float = DEFAULT_LEASE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ==================== Planning ====================
+
+    def add_units(
+        self, provider: str, ids: Iterable[str], start: int, end: int, interval: str, window: int
+    ) -> int:
+        """Split [start, end) into windows of ``window`` seconds per id; return units added."""
+        if end <= start:
+            raise ValueError(f"end must be after start, got start={start} end={end}")
+        if window <= 0:
+            raise ValueError(f"window must be positive, got {window}")
+        rows = [
+            (provider, coin_id, s, min(s + window, end), interval)
+            for coin_id in ids
+            for s in range(start, end, window)
+        ]
+        conn = self._connect()
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO units (provider, coin_id, start, end, interval) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        return conn.total_changes - before
+
+    def add_defillama(self, ids: Iterable[str], start: int, end: int, period: str = "1d") -> int:
+        """Plan DefiLlama /chart units, one per 500-point page."""
+        if period not in DEFILLAMA_PERIOD_SECONDS:
+            raise ValueError(
+                f"period must be one of {list(DEFILLAMA_PERIOD_SECONDS)}, got '{period}'"
+            )
+        window = DEFILLAMA_CHART_MAX_SPAN * DEFILLAMA_PERIOD_SECONDS[period]
+        return self.add_units("defillama", ids, start, end, period, window)
+
+    def add_twelvedata(
+        self, symbols: Iterable[str], start: int, end: int, interval: str = "1day"
+    ) -> int:
+        """Plan Twelve Data time_series units, one per 5000-bar window."""
+        if interval not in TWELVEDATA_INTERVAL_SECONDS:
+            raise ValueError(
+                f"interval must be one of {list(TWELVEDATA_INTERVAL_SECONDS)}, got '{interval}'"
+            )
+        window = TWELVEDATA_MAX_OUTPUTSIZE * TWELVEDATA_INTERVAL_SECONDS[interval]
+        return self.add_units("twelvedata", symbols, start, end, interval, window)
+
+    # ==================== Execution ====================
+
+    def claim(self, worker: str) -> Optional[Unit]:
+        """Atomically claim the first pending (or expired) unit, or return None when none remain."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT seq, provider, coin_id, start, end, interval FROM units "
+                "WHERE status = 'pending' OR (status = 'claimed' AND claimed_at < ?) "
+                "ORDER BY seq LIMIT 1",
+                (now - self.lease,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE units SET status = 'claimed', worker = ?, claimed_at = ? WHERE seq = ?",
+                    (worker, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Unit(*row) if row is not None else None
+
+    def complete(self, unit: Unit, count: int) -> None:
+        """Checkpoint a unit as done."""
+        self._connect().execute(
+            "UPDATE units SET status = 'done', count = ?, error = NULL WHERE seq = ?",
+            (count, unit.seq),
+        )
+
+    def fail(self, unit: Unit, error: str) -> None:
+        """Record a failed attempt; the unit is retried until max_attempts, then skipped."""
+        self._connect().execute(
+            "UPDATE units SET attempts = attempts + 1, error = ?, worker = NULL, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+            "WHERE seq = ?",
+            (error, self.max_attempts, unit.seq),
+        )
+
+    def run(
+        self,
+        sink: Callable[[Unit, List[Dict[str, Any]]], None],
+        fetch: Optional[Callable[[Unit], Dict[str, Any]]] = None,
+        worker: Optional[str] = None,
+        api_key: Union[str, KeyPool, None] = None,
+    ) -> int:
+        """
+        Process units until none remain; return how many this worker completed.
+
+        ``sink(unit, points)`` must persist the points before returning — the
+        unit is checkpointed as done only afterwards, so a crash in between
+        re-fetches the unit rather than losing it. Requests are made in the
+        'bulk' priority class. A window the provider answers with no points
+        is checkpointed as done with a count of 0, not retried.
+        """
+        worker = worker or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        fetch = fetch or (lambda u: fetch_unit(u, api_key))
+        completed = 0
+        while True:
+            unit = self.claim(worker)
+            if unit is None:
+                return completed
+            try:
+                with priority_scope("bulk"):
+                    envelope = fetch(unit)
+            except (TypeError, ValueError) as e:
+                self.fail(unit, str(e))
+                continue
+            if envelope["status"] != "success" and _empty(unit, envelope):
+                self.complete(unit, 0)
+                completed += 1
+                continue
+            if envelope["status"] != "success":
+                logger.warning("backfill unit %s %s@%s failed", unit.provider, unit.coin_id, unit.start)
+                self.fail(unit, "provider returned status 'error'")
+                continue
+            sink(unit, envelope["data"])
+            self.complete(unit, envelope["count"])
+            completed += 1
+
+    # ==================== Monitoring ====================
+
+    def progress(self) -> Dict[str, int]:
+        """Return unit counts by status."""
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        for status, n in self._connect().execute(
+            "SELECT status, COUNT(*) FROM units GROUP BY status"
+        ):
+            counts[status] = n
+        return counts
+
+    def failed_units(self) -> List[Unit]:
+        """Return units that exhausted their attempts."""
+        rows = self._connect().execute(
+            "SELECT seq, provider, coin_id, start, end, interval FROM units "
+            "WHERE status = 'failed' ORDER BY seq"
+        )
+        return [Unit(*row) for row in rows]
+
+    def reset_failed(self) -> None:
+        """Put failed units back in the queue with a fresh attempt count."""
+        self._connect().execute(
+            "UPDATE units SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        )
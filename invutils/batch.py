@@ -0,0 +1,271 @@
+"""Batch fetching from a manifest with streaming output (used by ``invutils fetch``)."""
+
+import csv
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+)
+
+from .config import DEFAULT_PROVIDER_LIMITS
+from .prices import gecko_price_chart, llama_price_chart, twelvedata_price_historical
+from .utils import KeyPool, priority_scope
+
+logger = logging.getLogger(__name__)
+
+# Columns written for every point; provider-specific fields absent from a point are left empty
+OUTPUT_FIELDS = [
+    "provider", "id", "timestamp", "datetime", "price",
+    "open", "high", "low", "close", "volume",
+]
+
+# Jobs read ahead of the pool while their provider is at its limit
+_MAX_WAITING = 1000
+
+
+class Job(NamedTuple):
+    """One manifest row."""
+
+    provider: str
+    id: str
+    range: Optional[str] = None  # days (coingecko), span (defillama), outputsize (twelvedata)
+    interval: Optional[str] = None  # period (defillama), interval (twelvedata)
+    start: Optional[int] = None  # defillama only
+    vs_currency: Optional[str] = None  # coingecko only
+
+
+def read_manifest(path: str) -> Iterator[Job]:
+    """
+    Yield jobs from a CSV (header row) or JSON / JSON Lines manifest.
+
+    Columns/keys: provider, id, range, interval, start, vs_currency.
+    """
+    with Path(path).open(newline="") as f:
+        if path.endswith(".csv"):
+            rows: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        elif path.endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            start = row.get("start")
+            yield Job(
+                provider=str(row["provider"]).strip().lower(),
+                id=str(row["id"]).strip(),
+                range=str(row["range"]) if row.get("range") not in (None, "") else None,
+                interval=row.get("interval") or None,
+                start=int(start) if start not in (None, "") else None,
+                vs_currency=row.get("vs_currency") or None,
+            )
+
+
+def fetch_job(
+    job: Job, api_keys: Optional[Dict[str, Union[str, KeyPool]]] = None
+) -> Dict[str, Any]:
+    """Call the chart function matching a job's provider and return its envelope."""
+    api_keys = api_keys or {}
+    if job.provider == "coingecko":
+        return gecko_price_chart(
+            job.id,
+            vs_currency=job.vs_currency or "usd",
+            days=job.range or "365",
+            api_key=api_keys.get("coingecko"),
+        )
+    if job.provider == "defillama":
+        if job.start is None or job.range is None:
+            raise ValueError(f"defillama job {job.id} needs start and range (span)")
+        return llama_price_chart(job.id, job.start, int(job.range), period=job.interval or "1d")
+    if job.provider == "twelvedata":
+        api_key = api_keys.get("twelvedata")
+        if not api_key:
+            raise ValueError("twelvedata jobs need an API key")
+        return twelvedata_price_historical(
+            job.id,
+            api_key,
+            interval=job.interval or "1day",
+            outputsize=int(job.range or 30),
+            epoch=True,
+        )
+    raise ValueError(f"unknown provider '{job.provider}'")
+
+
+class JsonLinesWriter:
+    """Write one JSON object per point."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._f.write(json.dumps(row) + "\n")
+
+    def close(self) -> None:
+        self._f.flush()
+
+
+class CsvWriter:
+    """Write points as CSV rows with OUTPUT_FIELDS columns."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+        self._writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._f.flush()
+
+
+class ParquetWriter:
+    """Write each job's points as a Parquet row group (requires pyarrow)."""
+
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet output requires pyarrow: pip install 'invutils[parquet]'"
+            ) from None
+        self._pa = pa
+        self._schema = pa.schema([
+            ("provider", pa.string()), ("id", pa.string()),
+            ("timestamp", pa.int64()), ("datetime", pa.string()), ("price", pa.float64()),
+            ("open", pa.float64()), ("high", pa.float64()), ("low", pa.float64()),
+            ("close", pa.float64()), ("volume", pa.int64()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            columns = {name: [row.get(name) for row in rows] for name in OUTPUT_FIELDS}
+            self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def envelope_rows(job: Job, envelope: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an envelope's data points into output rows tagged with provider and id."""
+    return [{"provider": job.provider, "id": job.id, **point} for point in envelope["data"]]
+
+
+class BatchStats:
+    """Progress and throughput counters for a batch run."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.done = 0
+        self.failed = 0
+        self.points = 0
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.done} jobs ({self.failed} failed), {self.points} points in {elapsed:.1f}s — "
+            f"{self.done / elapsed:.2f} jobs/s, {self.points / elapsed:.0f} points/s"
+        )
+
+
+def run_batch(
+    jobs: Iterable[Job],
+    write: Callable[[List[Dict[str, Any]]], None],
+    workers: int = 8,
+    provider_limits: Optional[Dict[str, int]] = None,
+    api_keys: Optional[Dict[str, Union[str, KeyPool]]] = None,
+    progress: Optional[Callable[[Job, Dict[str, Any], BatchStats], None]] = None,
+) -> BatchStats:
+    """
+    Fetch every job concurrently and stream its rows to ``write`` as it completes.
+
+    At most ``workers`` jobs are in flight, and at most ``provider_limits[p]``
+    of them target provider p. A job is handed to the pool only when its
+    provider has room, so a provider at its limit never holds pool threads:
+    its jobs wait in a queue (at most 1000 are read ahead, so memory stays
+    bounded regardless of manifest size) while other providers' jobs run.
+    Failed jobs are counted and reported through ``progress``; they do not stop the run.
+    Requests are made in the 'bulk' priority class, so interactive calls sharing
+    a provider's quota go first.
+    """
+    limits = {**DEFAULT_PROVIDER_LIMITS, **(provider_limits or {})}
+    for name, limit in limits.items():
+        if limit < 1:
+            raise ValueError(f"provider limit for {name} must be at least 1, got {limit}")
+    stats = BatchStats()
+
+    def run(job: Job) -> Dict[str, Any]:
+        with priority_scope("bulk"):
+            try:
+                return fetch_job(job, api_keys)
+            except (TypeError, ValueError) as e:
+                logger.error("job %s %s rejected: %s", job.provider, job.id, e)
+                return {"source": job.provider, "status": "error", "count": 0, "data": []}
+
+    source = iter(jobs)
+    pending: Dict[Future[Dict[str, Any]], Job] = {}
+    # Jobs read from the manifest whose provider was at its limit, and jobs running, per provider
+    waiting: Dict[str, Deque[Job]] = {}
+    running: Dict[str, int] = {}
+
+    def has_room(provider: str) -> bool:
+        return running.get(provider, 0) < limits.get(provider, workers)
+
+    def next_job() -> Optional[Job]:
+        """The oldest waiting job whose provider has room, else the next one read that fits."""
+        for provider, queue in waiting.items():
+            if queue and has_room(provider):
+                return queue.popleft()
+        while sum(len(queue) for queue in waiting.values()) < _MAX_WAITING:
+            job = next(source, None)
+            if job is None or has_room(job.provider):
+                return job
+            waiting.setdefault(job.provider, deque()).append(job)
+        return None
+
+    def fill(pool: ThreadPoolExecutor) -> None:
+        while len(pending) < workers:
+            job = next_job()
+            if job is None:
+                return
+            running[job.provider] = running.get(job.provider, 0) + 1
+            pending[pool.submit(run, job)] = job
+
+    def finish(done: Set["Future[Dict[str, Any]]"]) -> None:
+        for future in done:
+            job = pending.pop(future)
+            running[job.provider] -= 1
+            envelope = future.result()
+            stats.done += 1
+            if envelope["status"] != "success":
+                stats.failed += 1
+            rows = envelope_rows(job, envelope)
+            stats.points += len(rows)
+            write(rows)
+            if progress is not None:
+                progress(job, envelope, stats)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fill(pool)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            finish(done)
+            fill(pool)
+
+    return stats
@@ -0,0 +1,266 @@
+"""Command-line entry point: ``invutils <command>``."""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DEFAULT_DAILY_QUOTAS, DEFAULT_RATE_LIMITS, SERVER_HOST, SERVER_PORT
+
+
+def _parse_rate_limit(value: str) -> Tuple[str, float, float]:
+    """Parse 'provider=calls/period' (e.g. 'coingecko=30/60')."""
+    try:
+        name, spec = value.split("=", 1)
+        calls, _, period = spec.partition("/")
+        return name.strip(), float(calls), float(period or 60)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"rate limit must look like 'provider=calls/period', got '{value}'"
+        ) from None
+
+
+def _parse_provider_limit(value: str) -> Tuple[str, int]:
+    """Parse 'provider=N' (e.g. 'defillama=16')."""
+    try:
+        name, n = value.split("=", 1)
+        limit = int(n)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"provider limit must look like 'provider=N', got '{value}'"
+        ) from None
+    if limit < 1:
+        raise argparse.ArgumentTypeError(f"provider limit must be at least 1, got '{value}'")
+    return name.strip(), limit
+
+
+def _install_adaptive(max_limit: int) -> None:
+    """Gate every provider's requests through an AIMD concurrency controller."""
+    from .utils import AdaptiveConcurrency, set_adaptive_concurrency
+
+    for name in ("coingecko", "defillama", "twelvedata"):
+        set_adaptive_concurrency(name, AdaptiveConcurrency(max_limit=max(max_limit, 4)))
+
+
+def _api_key(name: str, value: Optional[str]) -> Any:
+    """One key as given, or a KeyPool with the provider's per-key limits for 'KEY1,KEY2,...'."""
+    if not value or "," not in value:
+        return value
+    from .utils import KeyPool
+
+    calls, period = DEFAULT_RATE_LIMITS.get(name, (None, 60))
+    keys = [key.strip() for key in value.split(",") if key.strip()]
+    return KeyPool(keys, calls, period, daily_quota=DEFAULT_DAILY_QUOTAS.get(name))
+
+
+def _install_breakers() -> None:
+    """Give every provider endpoint a circuit breaker with the configured defaults."""
+    from .utils import set_circuit_breaker
+
+    for name in ("coingecko", "defillama", "twelvedata"):
+        set_circuit_breaker(name)
+
+
+def _cmd_fetch(args: argparse.Namespace) -> int:
+    from .batch import CsvWriter, JsonLinesWriter, ParquetWriter, read_manifest, run_batch
+    from .utils import KeyPool, get_concurrency_limiter
+
+    fmt = args.format or _format_from_path(args.output)
+    api_keys = {
+        "coingecko": _api_key(
+            "coingecko", args.coingecko_key or os.environ.get("COINGECKO_API_KEY")
+        ),
+        "twelvedata": _api_key(
+            "twelvedata", args.twelvedata_key or os.environ.get("TWELVEDATA_API_KEY")
+        ),
+    }
+
+    def progress(job: Any, envelope: Dict[str, Any], stats: Any) -> None:
+        if not args.quiet:
+            print(
+                f"[{stats.done}] {job.provider} {job.id}: {envelope['status']} "
+                f"({envelope['count']} points) — {stats.summary()}",
+                file=sys.stderr,
+            )
+
+    if fmt == "parquet" and args.output == "-":
+        raise SystemExit("parquet output needs a file path (-o)")
+
+    provider_limits = dict(args.provider_limit)
+    if args.adaptive:
+        # Controllers pace the requests; job limits only cap memory
+        _install_adaptive(args.workers)
+        provider_limits = {
+            **dict.fromkeys(("coingecko", "defillama", "twelvedata"), args.workers),
+            **provider_limits,
+        }
+
+    if args.breaker:
+        _install_breakers()
+
+    with contextlib.ExitStack() as stack:
+        if fmt == "parquet":
+            writer: Any = ParquetWriter(args.output)
+        else:
+            out = (
+                sys.stdout
+                if args.output == "-"
+                else stack.enter_context(Path(args.output).open("w", newline=""))
+            )
+            writer = CsvWriter(out) if fmt == "csv" else JsonLinesWriter(out)
+        stack.callback(writer.close)
+
+        if args.record or args.replay:
+            from . import replay
+
+            stack.enter_context(
+                replay.record(args.record) if args.record else replay.replay(args.replay)
+            )
+
+        stats = run_batch(
+            read_manifest(args.manifest),
+            writer.write,
+            workers=args.workers,
+            provider_limits=provider_limits,
+            api_keys=api_keys,
+            progress=progress,
+        )
+
+    print(stats.summary(), file=sys.stderr)
+    if args.adaptive:
+        limits = []
+        for name in ("coingecko", "defillama", "twelvedata"):
+            controller = get_concurrency_limiter(name)
+            if controller is not None:
+                limits.append(f"{name}={controller.stats()['limit']}")
+        print("adaptive limits: " + ", ".join(limits), file=sys.stderr)
+    for name, pool in api_keys.items():
+        if isinstance(pool, KeyPool):
+            usage = ", ".join(f"{key['key']}={key['requests']}" for key in pool.stats())
+            print(f"{name} keys: {usage}", file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def _format_from_path(path: str) -> str:
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith(".parquet"):
+        return "parquet"
+    return "jsonl"
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from .server import serve
+    from .utils import ResponseCache, set_rate_limit, set_response_cache
+
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for name, calls, period in args.rate_limit:
+        limits[name] = (calls, period)
+    for name, (calls, period) in limits.items():
+        set_rate_limit(name, calls, period)
+    if args.cache:
+        set_response_cache(ResponseCache(args.cache))
+    if args.adaptive:
+        _install_adaptive(32)
+    if args.breaker:
+        _install_breakers()
+
+    serve(args.host, args.port, args.unix_socket)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="invutils", description="invutils command-line tools")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log at INFO level")
+    commands = parser.add_subparsers(dest="command", metavar="<command>")
+    commands.required = True
+
+    serve = commands.add_parser(
+        "serve", help="run a local proxy that shares one cache and quota across services"
+    )
+    serve.add_argument("--host", default=SERVER_HOST)
+    serve.add_argument("--port", type=int, default=SERVER_PORT)
+    serve.add_argument("--unix-socket", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    serve.add_argument("--cache", metavar="PATH", help="SQLite file for the shared response cache")
+    serve.add_argument(
+        "--rate-limit",
+        metavar="PROVIDER=CALLS/PERIOD",
+        type=_parse_rate_limit,
+        action="append",
+        default=[],
+        help="override a provider rate limit (repeatable), e.g. coingecko=500/60",
+    )
+    serve.add_argument(
+        "--adaptive", action="store_true",
+        help="adapt each provider's concurrency to 429s and latency (AIMD)",
+    )
+    serve.add_argument(
+        "--breaker", action="store_true",
+        help="fail fast on provider endpoints that keep failing (circuit breakers)",
+    )
+    serve.set_defaults(func=_cmd_serve)
+
+    fetch = commands.add_parser(
+        "fetch", help="fetch every series in a manifest concurrently and stream the points"
+    )
+    fetch.add_argument(
+        "manifest", help="CSV, JSON or JSON Lines with provider,id,range,interval[,start,vs_currency]"
+    )
+    fetch.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    fetch.add_argument(
+        "-f", "--format", choices=["csv", "jsonl", "parquet"],
+        help="output format (default: from the output extension, else jsonl)",
+    )
+    fetch.add_argument("-w", "--workers", type=int, default=8, help="jobs in flight at once")
+    fetch.add_argument(
+        "--provider-limit",
+        metavar="PROVIDER=N",
+        type=_parse_provider_limit,
+        action="append",
+        default=[],
+        help="max simultaneous requests for a provider (repeatable)",
+    )
+    fetch.add_argument(
+        "--adaptive", action="store_true",
+        help="adapt each provider's concurrency to 429s and latency (up to --workers)",
+    )
+    fetch.add_argument(
+        "--breaker", action="store_true",
+        help="fail fast on provider endpoints that keep failing (circuit breakers)",
+    )
+    fetch.add_argument(
+        "--coingecko-key",
+        help="key, or comma-separated keys to rotate (default: $COINGECKO_API_KEY)",
+    )
+    fetch.add_argument(
+        "--twelvedata-key",
+        help="key, or comma-separated keys to rotate (default: $TWELVEDATA_API_KEY)",
+    )
+    replay_group = fetch.add_mutually_exclusive_group()
+    replay_group.add_argument(
+        "--record", metavar="ARCHIVE", help="record every provider response into ARCHIVE (.jsonl.gz)"
+    )
+    replay_group.add_argument(
+        "--replay", metavar="ARCHIVE", help="answer provider requests from ARCHIVE, offline"
+    )
+    fetch.add_argument("-q", "--quiet", action="store_true", help="only print the final summary")
+    fetch.set_defaults(func=_cmd_fetch)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    code: int = args.func(args)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,83 @@
 """Constants and configuration for invutils."""
 
+from pathlib import Path
+
 # ==============================================
 # Request Configuration
 # ==============================================
 
 DEFAULT_TIMEOUT: int = 10
 
+# ==============================================
+# Response Cache Configuration
+# ==============================================
+
+# TTL in seconds per endpoint, keyed by URL path fragment (longest match wins)
+CACHE_TTLS = {
+    "/simple/price": 30,  # CoinGecko current
+    "/market_chart": 300,  # CoinGecko chart
+    "/prices/current": 30,  # DefiLlama current
+    "/prices/historical": 3600,  # DefiLlama point-in-time
+    "/chart": 300,  # DefiLlama chart
+    "/price": 30,  # Twelve Data current
+    "/time_series": 300,  # Twelve Data historical
+}
+CACHE_DEFAULT_TTL: int = 60
+
+# Seconds past expiry during which a stale body is served while one worker refreshes it
+CACHE_STALE_TTL: int = 300
+
+# Seconds an id known to return no data is skipped (see NegativeCache)
+NEGATIVE_CACHE_TTL: int = 3600
+
+# Entries a NegativeCache holds before expired (then soonest-expiring) ones are dropped
+NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+
+# Seconds FX rates and rate series are reused by FxConverter
+FX_CACHE_TTL: int = 300
+
+# ==============================================
+# Rate Limits (calls, period in seconds)
+# ==============================================
+
+# Free/Demo tier limits, applied by `invutils serve`
+DEFAULT_RATE_LIMITS = {
+    "coingecko": (30, 60),
+    "twelvedata": (8, 60),
+}
+
+# Circuit breakers (see set_circuit_breaker): consecutive failures (5xx, timeouts,
+# connection errors) that open an endpoint's circuit, and seconds before it is probed
+BREAKER_FAILURE_THRESHOLD: int = 5
+BREAKER_COOLDOWN: float = 30.0
+
+# Requests allowed per API key per UTC day, for key pools built by `invutils fetch`
+# (Twelve Data free tier: 800 credits a day)
+DEFAULT_DAILY_QUOTAS = {
+    "twelvedata": 800,
+}
+
+# Jobs run at the same time per provider by `invutils fetch` (see run_batch)
+DEFAULT_PROVIDER_LIMITS = {
+    "coingecko": 2,
+    "defillama": 8,
+    "twelvedata": 1,
+}
+
+# Weighted fair queuing between request classes waiting on a provider's quota
+# (see invutils.utils.scheduler); batch fetches and backfills run as 'bulk'
+PRIORITY_WEIGHTS = {
+    "interactive": 10,
+    "bulk": 1,
+}
+
+# ==============================================
+# Proxy Server
+# ==============================================
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT: int = 8765
+
 # ==============================================
 # API Endpoints
 # ==============================================
@@ -15,6 +87,9 @@ COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 COINGECKO_ENDPOINTS = {
     "price_current": f"{COINGECKO_BASE_URL}/simple/price",
     "price_chart": f"{COINGECKO_BASE_URL}/coins/%s/market_chart",  # f'https://api.coingecko.com/api/v3/coins/{id}/market_chart'
+    "price_range": f"{COINGECKO_BASE_URL}/coins/%s/market_chart/range",  # f'https://api.coingecko.com/api/v3/coins/{id}/market_chart/range?from=&to='
+    "coins_list": f"{COINGECKO_BASE_URL}/coins/list",
+    "coins_markets": f"{COINGECKO_BASE_URL}/coins/markets",
 }
 
 # Defillama
@@ -30,4 +105,61 @@ TWELVEDATA_BASE_URL = "https://api.twelvedata.com"
 TWELVEDATA_ENDPOINTS = {
     "price_current": f"{TWELVEDATA_BASE_URL}/price",
     "time_series": f"{TWELVEDATA_BASE_URL}/time_series",
+    "stocks": f"{TWELVEDATA_BASE_URL}/stocks",
+    "etf": f"{TWELVEDATA_BASE_URL}/etf",
+    "forex_pairs": f"{TWELVEDATA_BASE_URL}/forex_pairs",
+    "cryptocurrencies": f"{TWELVEDATA_BASE_URL}/cryptocurrencies",
+}
+
+# ==============================================
+# Provider Limits
+# ==============================================
+
+# DefiLlama rejects span > ~500 on the /chart endpoint
+DEFILLAMA_CHART_MAX_SPAN: int = 500
+
+# Seconds per DefiLlama period string, for pagination offsets and backfill windows
+DEFILLAMA_PERIOD_SECONDS = {
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+# Twelve Data caps outputsize at 5000 points per request
+TWELVEDATA_MAX_OUTPUTSIZE: int = 5000
+
+# Approximate seconds per Twelve Data interval, for sizing date windows
+# (1month rounded up to 31 days)
+TWELVEDATA_INTERVAL_SECONDS = {
+    "1min": 60, "5min": 300, "15min": 900, "30min": 1800, "45min": 2700,
+    "1h": 3600, "2h": 7200, "4h": 14400, "8h": 28800,
+    "1day": 86400, "1week": 604800, "1month": 2678400,
+}
+
+# Start of the error message Twelve Data sends for a valid window with no bars
+TWELVEDATA_NO_DATA = "No data is available"
+
+# ==============================================
+# Coin ID Resolution
+# ==============================================
+
+RESOLVER_CACHE_DIR = str(Path.home() / ".cache" / "invutils")
+RESOLVER_TTL: int = 86400
+# Seconds before a resolver whose lists could not be loaded tries again
+RESOLVER_RETRY: int = 60
+
+# CoinGecko platform name -> DefiLlama chain prefix (identical names are omitted)
+COINGECKO_TO_DEFILLAMA_CHAINS = {
+    "binance-smart-chain": "bsc",
+    "arbitrum-one": "arbitrum",
+    "polygon-pos": "polygon",
+    "optimistic-ethereum": "optimism",
+    "avalanche": "avax",
+    "xdai": "xdai",
+    "harmony-shard-0": "harmony",
+    "okex-chain": "okexchain",
+    "huobi-token": "heco",
 }
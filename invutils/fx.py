@@ -0,0 +1,170 @@
+"""Convert USD prices to other currencies with cached Twelve Data FX rates."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import FX_CACHE_TTL
+from .series import PriceSeries, align
+from .utils.dates import format_utc
+
+logger = logging.getLogger(__name__)
+
+_DAY = 86400
+
+# FX markets close at weekends and on holidays; a rate this old still fills a point
+_FX_TOLERANCE = 4 * _DAY
+
+# Chart spans up to this long use hourly FX bars, longer ones daily
+_HOURLY_MAX_SPAN = 90 * _DAY
+
+
+class FxConverter:
+    """
+    USD -> currency conversion backed by Twelve Data forex rates.
+
+    Current rates and rate series are fetched once per currency and kept for
+    ``ttl`` seconds, so pricing a chart in several currencies costs one
+    CoinGecko request plus one FX request per currency instead of one
+    CoinGecko request per currency.
+
+    Args:
+        api_key: Twelve Data API key
+        ttl: Seconds a fetched rate or rate series is reused
+        pairs: Currency -> Twelve Data symbol overrides (default 'USD/<CUR>');
+            pairs quoted the other way round (e.g. 'EUR/USD') are inverted
+
+    Example:
+        >>> set_fx_converter(FxConverter('twelvedata-key'))
+        >>> gecko_price_chart('bitcoin', vs_currency='eur', days=30, fx=True)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        ttl: float = FX_CACHE_TTL,
+        pairs: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.ttl = ttl
+        self.pairs = {k.lower(): v.upper() for k, v in (pairs or {}).items()}
+        self._lock = threading.Lock()
+        self._rates: Dict[str, Tuple[float, float]] = {}
+        self._series: Dict[Tuple[str, str], Tuple[float, int, PriceSeries]] = {}
+
+    def _pair(self, currency: str) -> Tuple[str, bool]:
+        """Twelve Data symbol for a currency and whether its quotes must be inverted."""
+        symbol = self.pairs.get(currency, f"USD/{currency.upper()}")
+        return symbol, symbol.split("/", 1)[0].lower() == currency
+
+    # ==================== Rates ====================
+
+    def rate(self, currency: str) -> Optional[float]:
+        """Units of currency per USD now, or None if the rate is unavailable."""
+        currency = currency.lower()
+        if currency == "usd":
+            return 1.0
+        now = time.time()
+        with self._lock:
+            cached = self._rates.get(currency)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        # Imported here because invutils.prices.coingecko imports this module
+        from .prices.twelvedata import twelvedata_price_current
+
+        symbol, inverted = self._pair(currency)
+        envelope = twelvedata_price_current(symbol, self.api_key)
+        if envelope["status"] != "success":
+            logger.warning("fx: no current rate for %s", symbol)
+            return None
+        rate: float = envelope["data"][0]["price"]
+        rate = 1.0 / rate if inverted else rate
+        with self._lock:
+            self._rates[currency] = (now + self.ttl, rate)
+        return rate
+
+    def series(self, currency: str, start: int, end: int) -> Optional[PriceSeries]:
+        """Units of currency per USD over [start, end], hourly or daily by span."""
+        currency = currency.lower()
+        interval = "1h" if end - start <= _HOURLY_MAX_SPAN else "1day"
+        key = (currency, interval)
+        now = time.time()
+        with self._lock:
+            cached = self._series.get(key)
+        if cached is not None and cached[0] > now and cached[1] <= start:
+            return cached[2]
+
+        from .prices.twelvedata import twelvedata_price_historical
+
+        symbol, inverted = self._pair(currency)
+        fetch_start = start - _FX_TOLERANCE
+        envelope = twelvedata_price_historical(
+            symbol,
+            self.api_key,
+            interval=interval,
+            outputsize=5000,
+            start_date=format_utc(fetch_start),
+            end_date=format_utc(int(now)),
+            epoch=True,
+            timezone="UTC",
+        )
+        if envelope["status"] != "success":
+            logger.warning("fx: no %s series for %s", interval, symbol)
+            return None
+        rates = PriceSeries.from_envelope(envelope, field="close")
+        if inverted:
+            rates = PriceSeries(rates.timestamps, (1.0 / r for r in rates.prices))
+        with self._lock:
+            self._series[key] = (now + self.ttl, fetch_start, rates)
+        return rates
+
+    # ==================== Conversion ====================
+
+    def convert_points(
+        self, points: List[Dict[str, Any]], currency: str, fields: Sequence[str] = ("price",)
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Convert USD chart points to currency at the rate in force at each timestamp.
+
+        Points with no rate within four days before them are dropped; returns
+        None when no rate series is available.
+        """
+        if currency.lower() == "usd" or not points:
+            return points
+        rates = self.series(currency, points[0]["timestamp"], points[-1]["timestamp"])
+        if rates is None:
+            return None
+        grid = [p["timestamp"] for p in points]
+        column = align({"fx": rates}, grid, tolerance=_FX_TOLERANCE).column("fx")
+        converted = []
+        for point, rate in zip(points, column):
+            if rate != rate:  # NaN: no rate for this point
+                continue
+            row = dict(point)
+            for field in fields:
+                if row.get(field) is not None:
+                    row[field] = row[field] * rate
+            converted.append(row)
+        return converted
+
+    def clear(self) -> None:
+        """Forget every cached rate and series."""
+        with self._lock:
+            self._rates.clear()
+            self._series.clear()
+
+
+_converter: Optional[FxConverter] = None
+
+
+def set_fx_converter(converter: Optional[FxConverter]) -> None:
+    """Install the converter used by gecko_price_chart / gecko_price_current(fx=True)."""
+    global _converter
+    _converter = converter
+
+
+def get_fx_converter() -> Optional[FxConverter]:
+    """Return the installed converter, if any."""
+    return _converter
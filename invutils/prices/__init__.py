@@ -8,6 +8,7 @@ from .coingecko import (
     gecko_price_chart,
     gecko_price_current,
     gecko_price_historical,  # back-compat alias for gecko_price_chart
+    gecko_price_range,
 )
 from .defillama import (
     llama_price_chart,
@@ -23,6 +24,7 @@ __all__ = [
     "gecko_price_chart",
     "gecko_price_current",
     "gecko_price_historical",
+    "gecko_price_range",
     "llama_price_chart",
     "llama_price_historical",
     "twelvedata_price_chart",
@@ -1,28 +1,122 @@
 """CoinGecko API functions for cryptocurrency price data."""
 
 import logging
+import threading
 import time
-from typing import Any, Dict, Optional, Union
-
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from ..config import COINGECKO_ENDPOINTS, DEFAULT_TIMEOUT
-from ..utils import handle_api_request
+from ..fx import FxConverter, get_fx_converter
+from ..resolver import resolve_ids
+from ..utils import (
+    ApiRequest,
+    KeyPool,
+    deadlined,
+    handle_api_request,
+    in_caller_context,
+    known_empty,
+    mark_empty,
+    proxied,
+)
 
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+_DAY = 86400
+
+# CoinGecko picks granularity from the window length: <=1 day 5-minutely, <=90 days hourly,
+# longer daily. (min, max) window seconds that yield each granularity; None = unbounded.
+_RANGE_WINDOWS: Dict[str, Tuple[int, Optional[int]]] = {
+    "hourly": (2 * _DAY, 90 * _DAY),
+    "daily": (91 * _DAY, None),
+}
+
+# Series remembered by gecko_price_chart(incremental=True), keyed by (id, vs_currency, granularity):
+# (earliest timestamp the series covers, points)
+_incremental_series: Dict[
+    Tuple[str, str, Optional[str]], Tuple[int, List[Dict[str, Any]]]
+] = {}
+_incremental_lock = threading.Lock()
+
+# Requests in flight at once when a call fans out (rate limits still apply per request)
+_MAX_WORKERS = 4
+
+# Max characters of the comma-joined ids query value per /simple/price request,
+# keeping the full URL well under common 8 KB limits
+_MAX_IDS_CHARS = 2000
+
+
+# gecko_price_chart field name -> /market_chart response key
+_CHART_FIELDS: Dict[str, str] = {
+    "price": "prices",
+    "market_cap": "market_caps",
+    "volume": "total_volumes",
+}
+
+
+def _fx_converter(fx: bool) -> Optional[FxConverter]:
+    """The installed FX converter when fx=True, else None."""
+    if not isinstance(fx, bool):
+        raise TypeError(f"fx must be a boolean, got {type(fx).__name__}")
+    if not fx:
+        return None
+    converter = get_fx_converter()
+    if converter is None:
+        raise ValueError("fx=True needs an FX converter; call invutils.fx.set_fx_converter() first")
+    return converter
+
+
+def _key_args(api_key: Union[str, KeyPool, None]) -> Dict[str, Any]:
+    """ApiRequest arguments sending api_key: one key, or a key taken from a KeyPool per send."""
+    if isinstance(api_key, KeyPool):
+        return {"keys": api_key, "key_header": "x-cg-demo-api-key"}
+    return {"headers": {"x-cg-demo-api-key": api_key}} if api_key else {}
+
+
+def _normalize_chart_points(pairs: List[List[float]]) -> List[Dict[str, Any]]:
+    """CoinGecko returns [[timestamp_ms, value], ...]; convert to {timestamp (s), price}."""
+    return [
+        {
+            "timestamp": int(timestamp_ms / 1000),  # Convert ms to seconds
+            "price": price,
+        }
+        for timestamp_ms, price in pairs
+    ]
+
 
+@proxied
+@deadlined
 def gecko_price_current(
-    id: str, vs_currencies: str = "usd", api_key: Optional[str] = None
+    id: str,
+    vs_currencies: str = "usd",
+    api_key: Union[str, KeyPool, None] = None,
+    fx: bool = False,
+    hedge: bool = False,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
 ) -> Dict[str, Any]:
     """
     CoinGecko - Get current price of coin or coins.
 
+    Id lists of any size are accepted: ids are de-duplicated and split into
+    URL-safe batches fetched concurrently, and the results are merged into one
+    envelope. Ids from batches that failed are listed in ``failed_ids``.
+    With a negative cache installed, ids CoinGecko left out of a successful
+    response are remembered and not requested again until their entry expires.
+
+    With fx=True only USD prices are requested and the other currencies are
+    derived with the installed FxConverter's rates (see invutils.fx).
+
+    With hedge=True a batch that is slower than CoinGecko's rolling p95 is
+    requested a second time and the first good answer wins (see Hedger).
+
     Args:
       id (str): CoinGecko ID(s) - single ('bitcoin') or multiple ('bitcoin,ethereum')
       vs_currencies (str, optional): Currency(ies) to price against (default: 'usd')
-      api_key (str, optional): CoinGecko Demo API key
+      api_key (str | KeyPool, optional): CoinGecko Demo API key, or a pool of keys to rotate
+      fx (bool, optional): Convert from USD locally instead of asking CoinGecko (default: False)
+      hedge (bool, optional): Hedge slow requests with a duplicate (default: False)
+      deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
       Dict with standardized format:
@@ -31,6 +125,7 @@ def gecko_price_current(
           "fetched_at": 1640995200,
           "status": "success" | "error",
           "count": 2,
+          "failed_ids": [],             # ids whose batch request failed
           "data": [
             {"coin_id": "bitcoin", "price": 45000.0, "currency": "usd"},
             ...
@@ -49,68 +144,149 @@ def gecko_price_current(
     if not vs_currencies.strip():
         raise ValueError("vs_currencies cannot be empty or whitespace")
 
+    converter = _fx_converter(fx)
+
+    if not isinstance(hedge, bool):
+        raise TypeError(f"hedge must be a boolean, got {type(hedge).__name__}")
+
+    id = resolve_ids("coingecko", id)
     url = COINGECKO_ENDPOINTS["price_current"]
+    request_currencies = "usd" if converter is not None else vs_currencies
 
-    # Add API key to headers if provided
-    headers = {}
-    if api_key:
-        headers["x-cg-demo-api-key"] = api_key
+    # A pooled key is picked per request, so batches spread across the pool
+    key_args = _key_args(api_key)
 
-    # Make request with error handling
-    raw_result = handle_api_request(
-        "coingecko",
-        lambda: requests.get(
-            url,
-            params={"ids": id, "vs_currencies": vs_currencies},
-            headers=headers,
-            timeout=DEFAULT_TIMEOUT,
-        ),
-        DEFAULT_TIMEOUT,
+    # Large id lists are split into URL-safe batches and fetched concurrently;
+    # ids known to have no price are left out
+    batches = _id_batches(
+        ",".join(i for i in id.split(",") if not known_empty("coingecko", i.strip(), "current"))
     )
 
+    def fetch(batch: List[str]) -> Optional[Dict[str, Any]]:
+        return handle_api_request(
+            "coingecko",
+            ApiRequest(
+                url,
+                params={"ids": ",".join(batch), "vs_currencies": request_currencies},
+                **key_args,
+                timeout=DEFAULT_TIMEOUT,
+                hedge=hedge,
+            ),
+            DEFAULT_TIMEOUT,
+        )
+
+    if len(batches) <= 1:
+        results = [fetch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(batches))) as pool:
+            results = list(pool.map(in_caller_context(fetch), batches))
+
     # Build standardized response
     fetched_at = int(time.time())
 
-    if raw_result is None:
-        return {
-            "source": "coingecko",
-            "fetched_at": fetched_at,
-            "status": "error",
-            "count": 0,
-            "data": [],
-        }
-
-    # Transform raw API response to standard format
+    # Transform raw API responses to standard format
     data = []
+    failed_ids: List[str] = []
     currencies_list = vs_currencies.split(",")
 
-    for coin_id, price_data in raw_result.items():
-        for currency in currencies_list:
-            if currency in price_data:
-                data.append(
-                    {"coin_id": coin_id, "price": price_data[currency], "currency": currency}
-                )
+    # Units of each currency per USD, when converting locally
+    fx_rates: Dict[str, Optional[float]] = {}
+    if converter is not None:
+        fx_rates = {currency: converter.rate(currency) for currency in currencies_list}
+
+    for batch, raw_result in zip(batches, results):
+        if raw_result is None:
+            failed_ids.extend(batch)
+            continue
+        for coin_id in batch:
+            if coin_id not in raw_result:
+                mark_empty("coingecko", coin_id, "current")
+        for coin_id, price_data in raw_result.items():
+            if converter is not None:
+                usd = price_data.get("usd")
+                price_data = {
+                    currency: usd * rate
+                    for currency, rate in fx_rates.items()
+                    if usd is not None and rate is not None
+                }
+            for currency in currencies_list:
+                if currency in price_data:
+                    data.append(
+                        {"coin_id": coin_id, "price": price_data[currency], "currency": currency}
+                    )
 
     return {
         "source": "coingecko",
         "fetched_at": fetched_at,
         "status": "success" if data else "error",
         "count": len(data),
+        "failed_ids": failed_ids,
         "data": data,
     }
 
 
+def _id_batches(ids: str, max_chars: int = _MAX_IDS_CHARS) -> List[List[str]]:
+    """Split a comma-separated id string into de-duplicated batches of at most max_chars joined."""
+    unique = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    batches: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for coin_id in unique:
+        added = len(coin_id) + (1 if current else 0)
+        if current and length + added > max_chars:
+            batches.append(current)
+            current, length = [], 0
+            added = len(coin_id)
+        current.append(coin_id)
+        length += added
+    if current:
+        batches.append(current)
+    return batches
+
+
+@proxied
+@deadlined
 def gecko_price_chart(
-    id: str, vs_currency: str = "usd", days: Union[int, str] = "365", api_key: Optional[str] = None
+    id: str,
+    vs_currency: str = "usd",
+    days: Union[int, str] = "365",
+    api_key: Union[str, KeyPool, None] = None,
+    incremental: bool = False,
+    fields: Sequence[str] = ("price",),
+    fx: bool = False,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
 ) -> Dict[str, Any]:
     """
     CoinGecko - Get historical price data for a coin.
 
+    With incremental=True the last series per (id, vs_currency, granularity) is
+    kept in memory; later calls request only the days since its last closed
+    point, replace the still-open trailing point, and return the merged series
+    trimmed to ``days``. A call reaching further back than the remembered
+    series, or whose delta would come back at a coarser granularity, fetches
+    in full. Series shorter than 2 days are always fetched in full.
+
+    ``fields`` selects columns from the same response: market caps and volumes
+    come back with every /market_chart call, so requesting them costs nothing extra.
+
+    With a negative cache installed, ids CoinGecko does not know (HTTP 404) and
+    (vs_currency, days) ranges that came back empty are answered locally with
+    an error envelope until their entry expires.
+
+    With fx=True the USD series is fetched (and shared by every currency) and
+    converted with the installed FxConverter at the FX rate in force at each
+    point; points with no rate in the four days before them are dropped.
+
     Args:
       id (str): CoinGecko coin ID (e.g., 'bitcoin', 'ethereum')
       vs_currency (str, optional): Currency to price against (default: 'usd')
       days (int | str, optional): Number of days or 'max' (1-90: hourly, >90: daily)
-      api_key (str, optional): CoinGecko Demo API key
+      api_key (str | KeyPool, optional): CoinGecko Demo API key, or a pool of keys to rotate
+      incremental (bool, optional): Refresh from the remembered series (default: False)
+      fields (sequence of str, optional): Columns to return, any of 'price', 'market_cap',
+        'volume' (default: ('price',))
+      fx (bool, optional): Convert from USD locally instead of asking CoinGecko (default: False)
+      deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
       Dict with standardized format:
@@ -124,7 +300,7 @@ def gecko_price_chart(
           "count": 720,
           "data": [
             {"timestamp": 1640908800, "price": 44500.0},
-            ...
+            ...                          # plus "market_cap" / "volume" when requested
           ]
         }
     """
@@ -143,29 +319,42 @@ def gecko_price_chart(
     if not isinstance(days, (int, str)):
         raise TypeError(f"days must be an integer or string, got {type(days).__name__}")
 
-    url = COINGECKO_ENDPOINTS["price_chart"] % (id)
-
-    # Add API key to headers if provided
-    headers = {}
-    if api_key:
-        headers["x-cg-demo-api-key"] = api_key
+    if isinstance(fields, str) or not isinstance(fields, (list, tuple)):
+        raise TypeError(f"fields must be a list or tuple of strings, got {type(fields).__name__}")
+    if not fields:
+        raise ValueError("fields cannot be empty")
+    unknown = [f for f in fields if f not in _CHART_FIELDS]
+    if unknown:
+        raise ValueError(f"fields must be among {list(_CHART_FIELDS)}, got {unknown}")
+    fields = tuple(dict.fromkeys(fields))
+    converter = _fx_converter(fx)
+
+    id = resolve_ids("coingecko", id)
+    request_currency = "usd" if converter is not None else vs_currency
+    range_key = f"{request_currency}:{days}"
+
+    if known_empty("coingecko", id, range_key):
+        data = None
+    elif incremental and _chart_granularity(days) is not None:
+        data = _incremental_chart(id, request_currency, days, api_key, fields)
+    else:
+        raw_result = _fetch_market_chart(
+            id, {"vs_currency": request_currency, "days": days}, api_key
+        )
+        data = None
+        if raw_result is not None and "prices" in raw_result:
+            # Transform raw API response to standard format
+            data = _normalize_chart_rows(raw_result, fields)
+        if data == []:
+            mark_empty("coingecko", id, range_key)
 
-    # Make request with error handling
-    raw_result = handle_api_request(
-        "coingecko",
-        lambda: requests.get(
-            url,
-            params={"vs_currency": vs_currency, "days": days},
-            headers=headers,
-            timeout=DEFAULT_TIMEOUT,
-        ),
-        DEFAULT_TIMEOUT,
-    )
+    if data and converter is not None:
+        data = converter.convert_points(data, vs_currency, fields)
 
     # Build standardized response
     fetched_at = int(time.time())
 
-    if raw_result is None or "prices" not in raw_result:
+    if data is None:
         return {
             "source": "coingecko",
             "fetched_at": fetched_at,
@@ -177,17 +366,6 @@ def gecko_price_chart(
             "data": [],
         }
 
-    # Transform raw API response to standard format
-    # CoinGecko returns: [[timestamp_ms, price], ...]
-    data = []
-    for timestamp_ms, price in raw_result["prices"]:
-        data.append(
-            {
-                "timestamp": int(timestamp_ms / 1000),  # Convert ms to seconds
-                "price": price,
-            }
-        )
-
     return {
         "source": "coingecko",
         "fetched_at": fetched_at,
@@ -200,5 +378,262 @@ def gecko_price_chart(
     }
 
 
+def _normalize_chart_rows(
+    raw_result: Dict[str, Any], fields: Tuple[str, ...]
+) -> List[Dict[str, Any]]:
+    """Build {timestamp, <field>...} rows from one /market_chart response, aligned on timestamp."""
+    if fields == ("price",):
+        return _normalize_chart_points(raw_result["prices"])
+
+    columns = {
+        field: {int(ts_ms / 1000): value for ts_ms, value in raw_result.get(key) or []}
+        for field, key in _CHART_FIELDS.items()
+        if field in fields and field != "price"
+    }
+    rows = []
+    for point in _normalize_chart_points(raw_result["prices"]):
+        row: Dict[str, Any] = {"timestamp": point["timestamp"]}
+        for field in fields:
+            row[field] = point["price"] if field == "price" else columns[field].get(point["timestamp"])
+        rows.append(row)
+    return rows
+
+
+def _fetch_market_chart(
+    id: str, params: Dict[str, Any], api_key: Union[str, KeyPool, None]
+) -> Optional[Dict[str, Any]]:
+    """Request /coins/{id}/market_chart with the given params (recording unknown ids)."""
+    request = ApiRequest(
+        COINGECKO_ENDPOINTS["price_chart"] % (id),
+        params=params,
+        timeout=DEFAULT_TIMEOUT,
+        **_key_args(api_key),
+    )
+    raw_result = handle_api_request("coingecko", request, DEFAULT_TIMEOUT)
+    if raw_result is None and request.status_code == 404:
+        mark_empty("coingecko", id)
+    return raw_result
+
+
+def _chart_granularity(days: Union[int, str]) -> Optional[str]:
+    """Granularity CoinGecko returns for a days value, or None when incremental refresh does not apply."""
+    if str(days).strip().lower() == "max":
+        return "daily"
+    try:
+        n = int(days)
+    except ValueError:
+        return None
+    if n < 2:
+        return None  # 5-minutely; small enough to refetch in full
+    return "hourly" if n <= 90 else "daily"
+
+
+def _incremental_chart(
+    id: str,
+    vs_currency: str,
+    days: Union[int, str],
+    api_key: Union[str, KeyPool, None],
+    fields: Tuple[str, ...] = ("price",),
+) -> Optional[List[Dict[str, Any]]]:
+    """Extend the remembered series with only the points since its last closed timestamp."""
+    granularity = _chart_granularity(days)
+    key = (id, vs_currency, granularity)
+    now = int(time.time())
+    cutoff = 0 if str(days).strip().lower() == "max" else now - int(days) * _DAY
+    with _incremental_lock:
+        covered_from, stored = _incremental_series.get(key, (now, []))
+
+    params: Optional[Dict[str, Any]] = None
+    if len(stored) >= 2 and covered_from <= cutoff:
+        # The last stored point is still open (current price); refetch from the one before it
+        delta_days = -(-(now - stored[-2]["timestamp"]) // _DAY) + 1
+        if granularity != "hourly":
+            params = {"vs_currency": vs_currency, "days": delta_days, "interval": "daily"}
+        elif _chart_granularity(max(2, delta_days)) == "hourly":
+            params = {"vs_currency": vs_currency, "days": max(2, delta_days)}
+        # else: a delta over 90 days would come back daily; refetch in full
+    if params is None:
+        params = {"vs_currency": vs_currency, "days": days}
+        covered_from, stored = cutoff, []
+
+    raw_result = _fetch_market_chart(id, params, api_key)
+    if raw_result is None or "prices" not in raw_result:
+        return None
+    # Remember every column so later calls can ask for any subset
+    fresh = _normalize_chart_rows(raw_result, tuple(_CHART_FIELDS))
+
+    if fresh:
+        first_new = fresh[0]["timestamp"]
+        merged = [p for p in stored[:-1] if p["timestamp"] < first_new] + fresh
+    else:
+        merged = stored
+
+    with _incremental_lock:
+        _incremental_series[key] = (covered_from, merged)
+    return [
+        {"timestamp": p["timestamp"], **{f: p[f] for f in fields}}
+        for p in merged
+        if p["timestamp"] >= cutoff
+    ]
+
+
+def clear_incremental_cache() -> None:
+    """Forget every series remembered by gecko_price_chart(incremental=True)."""
+    with _incremental_lock:
+        _incremental_series.clear()
+
+
+def _range_windows(start: int, end: int, granularity: str) -> List[Tuple[int, int]]:
+    """
+    Split [start, end] into windows whose length makes CoinGecko return the wanted granularity.
+
+    Windows never exceed the maximum length; a window shorter than the minimum
+    is stretched backwards (overlapping its neighbour) so the provider does not
+    switch to a finer granularity. Overlapping points are de-duplicated later.
+    """
+    if granularity not in _RANGE_WINDOWS:
+        return [(start, end)]
+    min_len, max_len = _RANGE_WINDOWS[granularity]
+    step = max_len or (end - start)
+    windows = []
+    window_start = start
+    while True:
+        window_end = min(window_start + step, end)
+        windows.append((min(window_start, window_end - min_len), window_end))
+        if window_end >= end:
+            return windows
+        window_start = window_end
+
+
+@proxied
+@deadlined
+def gecko_price_range(
+    id: str,
+    start: int,
+    end: int,
+    granularity: str = "hourly",
+    vs_currency: str = "usd",
+    api_key: Union[str, KeyPool, None] = None,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
+) -> Dict[str, Any]:
+    """
+    CoinGecko - Get a price series for an arbitrary time range at a fixed granularity.
+
+    Uses the /market_chart/range endpoint. CoinGecko chooses granularity from the
+    length of each request (hourly up to 90 days, daily beyond), so the range is
+    split into windows that keep the requested granularity — e.g. a year of
+    hourly data becomes five 90-day-or-less windows. Windows are fetched
+    concurrently, overlaps are de-duplicated, and one ordered series is returned.
+    Ids a negative cache has recorded as unknown are not requested at all.
+    Windows not fetched before ``deadline`` are listed in ``missing_windows``
+    alongside the points that did arrive.
+
+    Args:
+      id (str): CoinGecko coin ID (e.g., 'bitcoin')
+      start (int): UNIX timestamp for the start of the range
+      end (int): UNIX timestamp for the end of the range
+      granularity (str, optional): 'hourly', 'daily', or 'auto' (one request,
+        provider-chosen granularity) (default: 'hourly')
+      vs_currency (str, optional): Currency to price against (default: 'usd')
+      api_key (str | KeyPool, optional): CoinGecko Demo API key, or a pool of keys to rotate
+      deadline (float, optional): Total seconds for the whole call, every request included
+
+    Returns:
+      Dict with standardized format:
+        {
+          "source": "coingecko",
+          "fetched_at": 1640995200,
+          "status": "success" | "error",
+          "coin_id": "bitcoin",
+          "currency": "usd",
+          "period": {"start": 1609459200, "end": 1640995200, "granularity": "hourly"},
+          "missing_windows": [],          # [[from, to], ...] windows that failed or ran out of time
+          "count": 8760,
+          "data": [
+            {"timestamp": 1609459200, "price": 29000.0},
+            ...
+          ]
+        }
+    """
+
+    # Input validation
+    if not isinstance(id, str):
+        raise TypeError(f"id must be a string, got {type(id).__name__}")
+    if not id.strip():
+        raise ValueError("id cannot be empty or whitespace")
+
+    for name, value in (("start", start), ("end", end)):
+        if not isinstance(value, int):
+            raise TypeError(f"{name} must be an integer, got {type(value).__name__}")
+        if value <= 0:
+            raise ValueError(f"{name} must be positive, got {value}")
+    if end <= start:
+        raise ValueError(f"end must be after start, got start={start} end={end}")
+
+    if not isinstance(granularity, str):
+        raise TypeError(f"granularity must be a string, got {type(granularity).__name__}")
+    if granularity not in ("auto", *_RANGE_WINDOWS):
+        raise ValueError(
+            f"granularity must be one of {['auto', *_RANGE_WINDOWS]}, got '{granularity}'"
+        )
+
+    if not isinstance(vs_currency, str):
+        raise TypeError(f"vs_currency must be a string, got {type(vs_currency).__name__}")
+    if not vs_currency.strip():
+        raise ValueError("vs_currency cannot be empty or whitespace")
+
+    id = resolve_ids("coingecko", id)
+    url = COINGECKO_ENDPOINTS["price_range"] % (id)
+    unknown_id = known_empty("coingecko", id)
+
+    key_args = _key_args(api_key)
+    windows = _range_windows(start, end, granularity)
+
+    def fetch(window: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        if unknown_id:
+            return None
+        request = ApiRequest(
+            url,
+            params={"vs_currency": vs_currency, "from": window[0], "to": window[1]},
+            timeout=DEFAULT_TIMEOUT,
+            **key_args,
+        )
+        raw_result = handle_api_request("coingecko", request, DEFAULT_TIMEOUT)
+        if raw_result is None and request.status_code == 404:
+            mark_empty("coingecko", id)
+        return raw_result
+
+    if len(windows) == 1:
+        results = [fetch(windows[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(windows))) as pool:
+            results = list(pool.map(in_caller_context(fetch), windows))
+
+    # Merge windows: later windows overwrite overlapping timestamps, then keep [start, end]
+    merged: Dict[int, Any] = {}
+    missing_windows = []
+    for window, raw_result in zip(windows, results):
+        if raw_result is None or "prices" not in raw_result:
+            missing_windows.append(list(window))
+            continue
+        for point in _normalize_chart_points(raw_result["prices"]):
+            if start <= point["timestamp"] <= end:
+                merged[point["timestamp"]] = point["price"]
+
+    data = [{"timestamp": ts, "price": merged[ts]} for ts in sorted(merged)]
+
+    return {
+        "source": "coingecko",
+        "fetched_at": int(time.time()),
+        "status": "success" if data else "error",
+        "coin_id": id,
+        "currency": vs_currency,
+        "period": {"start": start, "end": end, "granularity": granularity},
+        "missing_windows": missing_windows,
+        "count": len(data),
+        "data": data,
+    }
+
+
 # Back-compat alias — will be removed in a future major version
 gecko_price_historical = gecko_price_chart
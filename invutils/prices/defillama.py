@@ -2,37 +2,51 @@
 
 import logging
 import time
-from typing import Any, Dict, List, Optional
-
-import requests
-
-from ..config import DEFAULT_TIMEOUT, DEFILLAMA_ENDPOINTS
-from ..utils import handle_api_request
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import (
+    DEFAULT_TIMEOUT,
+    DEFILLAMA_CHART_MAX_SPAN,
+    DEFILLAMA_ENDPOINTS,
+    DEFILLAMA_PERIOD_SECONDS,
+)
+from ..resolver import resolve_ids
+from ..utils import (
+    ApiRequest,
+    current_deadline,
+    deadlined,
+    handle_api_request,
+    known_empty,
+    mark_empty,
+    proxied,
+)
 
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
-# DefiLlama rejects span > ~500 on the /chart endpoint
-_CHART_MAX_SPAN = 500
-
-# Seconds per period string for pagination offset calculation
-_PERIOD_SECONDS: Dict[str, int] = {
-    "5m": 300,
-    "15m": 900,
-    "30m": 1800,
-    "1h": 3600,
-    "4h": 14400,
-    "1d": 86400,
-}
 
-
-def llama_price_historical(id: str, timestamp: Optional[int] = None) -> Dict[str, Any]:
+@proxied
+@deadlined
+def llama_price_historical(
+    id: str,
+    timestamp: Optional[int] = None,
+    hedge: bool = False,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
+) -> Dict[str, Any]:
     """
     DefiLlama - Get historical/current price data for tokens.
 
+    With a negative cache installed, ids missing from a successful response are
+    remembered for that timestamp and left out of later requests.
+
+    With hedge=True a request slower than DefiLlama's rolling p95 is sent a
+    second time and the first good answer wins (see Hedger).
+
     Args:
       id (str): DefiLlama ID(s) - single ('chain:address') or multiple (comma-separated)
       timestamp (Optional[int]): UNIX timestamp for historical prices (default: current time)
+      hedge (bool, optional): Hedge slow requests with a duplicate (default: False)
+      deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
       Dict with standardized format:
@@ -61,7 +75,9 @@ def llama_price_historical(id: str, timestamp: Optional[int] = None) -> Dict[str
     if not id.strip():
         raise ValueError("id cannot be empty or whitespace")
 
-    # Use current time if timestamp not provided
+    # Use current time if timestamp not provided; current-price misses share one
+    # negative-cache key instead of one per second
+    range_key = "current" if timestamp is None else str(timestamp)
     if timestamp is None:
         timestamp = int(time.time())
 
@@ -70,12 +86,25 @@ def llama_price_historical(id: str, timestamp: Optional[int] = None) -> Dict[str
     if timestamp <= 0:
         raise ValueError(f"timestamp must be positive, got {timestamp}")
 
-    url = DEFILLAMA_ENDPOINTS["price_historical"] % (timestamp, id)
+    if not isinstance(hedge, bool):
+        raise TypeError(f"hedge must be a boolean, got {type(hedge).__name__}")
+
+    id = resolve_ids("defillama", id)
 
-    # Make request with error handling
-    raw_result = handle_api_request(
-        "defillama", lambda: requests.get(url, timeout=DEFAULT_TIMEOUT), DEFAULT_TIMEOUT
-    )
+    # Ids known to have no price at this timestamp are not requested again
+    ids = [i for i in id.split(",") if not known_empty("defillama", i.strip(), range_key)]
+    raw_result = None
+    if ids:
+        url = DEFILLAMA_ENDPOINTS["price_historical"] % (timestamp, ",".join(ids))
+
+        # Make request with error handling
+        raw_result = handle_api_request(
+            "defillama", ApiRequest(url, timeout=DEFAULT_TIMEOUT, hedge=hedge), DEFAULT_TIMEOUT
+        )
+        if raw_result is not None and "coins" in raw_result:
+            for coin_id in ids:
+                if coin_id.strip() not in raw_result["coins"]:
+                    mark_empty("defillama", coin_id.strip(), range_key)
 
     # Build standardized response
     fetched_at = int(time.time())
@@ -118,21 +147,29 @@ def llama_price_historical(id: str, timestamp: Optional[int] = None) -> Dict[str
 
 def _fetch_chart_chunks(
     coin_id: str, start: int, span: int, period: str, period_seconds: int
-) -> List[Dict[str, Any]]:
-    """Fetch all paginated chunks for a single coin_id from the /chart endpoint."""
+) -> Tuple[List[Dict[str, Any]], List[List[int]]]:
+    """Fetch all paginated chunks for a single coin_id; return (points, [from, to] not fetched)."""
     url = DEFILLAMA_ENDPOINTS["price_chart"] % coin_id
     points: List[Dict[str, Any]] = []
+    missing: List[List[int]] = []
     remaining = span
     chunk_start = start
 
     while remaining > 0:
-        chunk_span = min(remaining, _CHART_MAX_SPAN)
+        chunk_span = min(remaining, DEFILLAMA_CHART_MAX_SPAN)
+        chunk_end = chunk_start + (chunk_span - 1) * period_seconds
+
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired():
+            # Out of time: the rest of the range is one missing window
+            missing.append([chunk_start, start + (span - 1) * period_seconds])
+            break
 
         raw_result = handle_api_request(
             "defillama",
-            lambda u=url, s=chunk_start, n=chunk_span, p=period: requests.get(
-                u,
-                params={"start": s, "span": n, "period": p},
+            ApiRequest(
+                url,
+                params={"start": chunk_start, "span": chunk_span, "period": period},
                 timeout=DEFAULT_TIMEOUT,
             ),
             DEFAULT_TIMEOUT,
@@ -140,19 +177,37 @@ def _fetch_chart_chunks(
 
         if raw_result is not None and "coins" in raw_result:
             points.extend(raw_result["coins"].get(coin_id, {}).get("prices", []))
+        else:
+            missing.append([chunk_start, chunk_end])
 
         remaining -= chunk_span
         chunk_start += chunk_span * period_seconds
 
-    return points
+    return points, missing
 
 
+def _chart_points(
+    coin_id: str, start: int, span: int, period: str, period_seconds: int
+) -> Tuple[List[Dict[str, Any]], List[List[int]]]:
+    """Fetch a coin's chart points, skipping and recording ids known to have none in the range."""
+    range_key = f"{period}:{start}:{span}"
+    if known_empty("defillama", coin_id, range_key):
+        return [], []
+    points, missing = _fetch_chart_chunks(coin_id, start, span, period, period_seconds)
+    if not points and not missing:
+        mark_empty("defillama", coin_id, range_key)
+    return points, missing
+
+
+@proxied
+@deadlined
 def llama_price_chart(
     id: str,
     start: int,
     span: int,
     period: str = "1d",
     fallback_chain: Optional[str] = None,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
 ) -> Dict[str, Any]:
     """
     DefiLlama - Get a historical price time series for a single token.
@@ -166,6 +221,14 @@ def llama_price_chart(
     uses a different chain than where the token actually trades (e.g. ARB indexed
     under 'ethereum:0x...' but priced on 'arbitrum:0x...').
 
+    With a negative cache installed, an id whose every page came back empty is
+    remembered for this (period, start, span) and skipped — pagination and
+    fallback included — until its entry expires.
+
+    With a ``deadline``, pages stop being requested once it passes and the
+    points fetched so far are returned; pages that failed or were never
+    requested are listed in ``missing_windows``.
+
     Args:
       id (str): DefiLlama ID in 'chain:address' format (e.g., 'ethereum:0x...')
       start (int): UNIX timestamp for the start of the range
@@ -173,6 +236,7 @@ def llama_price_chart(
       period (str): Granularity — one of '5m', '15m', '30m', '1h', '4h', '1d' (default: '1d')
       fallback_chain (str, optional): Chain prefix to try if the primary ID returns empty
         (e.g., 'arbitrum'). The address part of id is reused. No-op if id has no ':'.
+      deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
       Dict with standardized format:
@@ -184,6 +248,7 @@ def llama_price_chart(
           "start": 1609459200,
           "span": 365,
           "period": "1d",
+          "missing_windows": [],   # [[from, to], ...] pages that failed or ran out of time
           "count": 365,
           "data": [
             {"timestamp": 1609459200, "price": 730.0},
@@ -210,8 +275,10 @@ def llama_price_chart(
 
     if not isinstance(period, str):
         raise TypeError(f"period must be a string, got {type(period).__name__}")
-    if period not in _PERIOD_SECONDS:
-        raise ValueError(f"period must be one of {list(_PERIOD_SECONDS)}, got '{period}'")
+    if period not in DEFILLAMA_PERIOD_SECONDS:
+        raise ValueError(
+            f"period must be one of {list(DEFILLAMA_PERIOD_SECONDS)}, got '{period}'"
+        )
 
     if fallback_chain is not None:
         if not isinstance(fallback_chain, str):
@@ -219,8 +286,9 @@ def llama_price_chart(
         if not fallback_chain.strip():
             raise ValueError("fallback_chain cannot be empty or whitespace")
 
-    period_seconds = _PERIOD_SECONDS[period]
-    all_points = _fetch_chart_chunks(id, start, span, period, period_seconds)
+    id = resolve_ids("defillama", id)
+    period_seconds = DEFILLAMA_PERIOD_SECONDS[period]
+    all_points, missing_windows = _chart_points(id, start, span, period, period_seconds)
     effective_id = id
 
     # Fallback: retry once with an alternate chain prefix if primary returned nothing
@@ -229,9 +297,9 @@ def llama_price_chart(
         alt_id = f"{fallback_chain}:{address}"
         if alt_id != id:
             logger.info("defillama chart: %s returned empty, retrying with %s", id, alt_id)
-            alt_points = _fetch_chart_chunks(alt_id, start, span, period, period_seconds)
+            alt_points, alt_missing = _chart_points(alt_id, start, span, period, period_seconds)
             if alt_points:
-                all_points = alt_points
+                all_points, missing_windows = alt_points, alt_missing
                 effective_id = alt_id
 
     fetched_at = int(time.time())
@@ -245,6 +313,7 @@ def llama_price_chart(
             "start": start,
             "span": span,
             "period": period,
+            "missing_windows": missing_windows,
             "count": 0,
             "data": [],
         }
@@ -259,6 +328,7 @@ def llama_price_chart(
         "start": start,
         "span": span,
         "period": period,
+        "missing_windows": missing_windows,
         "count": len(data),
         "data": data,
     }
@@ -2,12 +2,12 @@
 
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Union
 
-import requests
-
-from ..config import DEFAULT_TIMEOUT, TWELVEDATA_ENDPOINTS
-from ..utils import handle_api_request
+from ..config import DEFAULT_TIMEOUT, TWELVEDATA_ENDPOINTS, TWELVEDATA_MAX_OUTPUTSIZE
+from ..resolver import resolve_ids
+from ..utils import ApiRequest, KeyPool, deadlined, handle_api_request, proxied
+from ..utils.dates import EpochParser
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +17,37 @@ _VALID_INTERVALS = {
 }
 
 
-def twelvedata_price_current(symbol: str, api_key: str) -> Dict[str, Any]:
+def _check_api_key(api_key: Union[str, KeyPool]) -> None:
+    """Validate an api_key argument (a key string or a KeyPool)."""
+    if isinstance(api_key, KeyPool):
+        return
+    if not isinstance(api_key, str):
+        raise TypeError(f"api_key must be a string or KeyPool, got {type(api_key).__name__}")
+    if not api_key.strip():
+        raise ValueError("api_key cannot be empty or whitespace")
+
+
+def _request(url: str, params: Dict[str, Any], api_key: Union[str, KeyPool]) -> ApiRequest:
+    """ApiRequest sending api_key, or a key taken from a KeyPool per send, as 'apikey'."""
+    if isinstance(api_key, KeyPool):
+        return ApiRequest(url, params=params, timeout=DEFAULT_TIMEOUT, keys=api_key)
+    return ApiRequest(url, params={**params, "apikey": api_key}, timeout=DEFAULT_TIMEOUT)
+
+
+@proxied
+@deadlined
+def twelvedata_price_current(
+    symbol: str,
+    api_key: Union[str, KeyPool],
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
+) -> Dict[str, Any]:
     """
     Twelve Data - Get the latest price for a stock, ETF, forex pair, or index.
 
     Args:
         symbol (str): Ticker symbol (e.g., 'AAPL', 'VTI', 'EUR/USD')
-        api_key (str): Twelve Data API key
+        api_key (str | KeyPool): Twelve Data API key, or a pool of keys to rotate
+        deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
         Dict with standardized format:
@@ -40,18 +64,13 @@ def twelvedata_price_current(symbol: str, api_key: str) -> Dict[str, Any]:
     if not symbol.strip():
         raise ValueError("symbol cannot be empty or whitespace")
 
-    if not isinstance(api_key, str):
-        raise TypeError(f"api_key must be a string, got {type(api_key).__name__}")
-    if not api_key.strip():
-        raise ValueError("api_key cannot be empty or whitespace")
+    _check_api_key(api_key)
+
+    symbol = resolve_ids("twelvedata", symbol)
 
     raw_result = handle_api_request(
         "twelvedata",
-        lambda: requests.get(
-            TWELVEDATA_ENDPOINTS["price_current"],
-            params={"symbol": symbol, "apikey": api_key},
-            timeout=DEFAULT_TIMEOUT,
-        ),
+        _request(TWELVEDATA_ENDPOINTS["price_current"], {"symbol": symbol}, api_key),
         DEFAULT_TIMEOUT,
     )
 
@@ -75,21 +94,43 @@ def twelvedata_price_current(symbol: str, api_key: str) -> Dict[str, Any]:
     }
 
 
+@proxied
+@deadlined
 def twelvedata_price_historical(
     symbol: str,
-    api_key: str,
+    api_key: Union[str, KeyPool],
     interval: str = "1day",
     outputsize: int = 30,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    epoch: bool = False,
+    timezone: Optional[str] = None,
+    deadline: Optional[float] = None,  # noqa: ARG001 - read by @deadlined
 ) -> Dict[str, Any]:
     """
     Twelve Data - Get historical OHLCV time series for a stock, ETF, forex pair, or index.
 
+    With epoch=True every row also carries an integer ``timestamp`` (UNIX
+    seconds), like the other providers' series. Intraday datetimes are read in
+    ``timezone``, or the exchange timezone from the response meta; daily and
+    longer bars map to UTC midnight of their date.
+
+    An error envelope carries Twelve Data's ``message`` when the API sent one
+    (e.g. 'No data is available on the specified dates...').
+
     Args:
         symbol (str): Ticker symbol (e.g., 'AAPL', 'VTI', 'EUR/USD')
-        api_key (str): Twelve Data API key
+        api_key (str | KeyPool): Twelve Data API key, or a pool of keys to rotate
         interval (str): Time interval — one of '1min', '5min', '15min', '30min', '45min',
             '1h', '2h', '4h', '8h', '1day', '1week', '1month' (default: '1day')
         outputsize (int): Number of data points to return, 1–5000 (default: 30)
+        start_date (str, optional): Only return bars at or after this date/time
+            ('2021-01-04' or '2021-01-04 09:30:00', in ``timezone``)
+        end_date (str, optional): Only return bars at or before this date/time
+        epoch (bool, optional): Add a UNIX ``timestamp`` to every row (default: False)
+        timezone (str, optional): Timezone of start_date, end_date and the returned
+            datetimes — 'UTC' or an IANA name (default: the exchange's local time)
+        deadline (float, optional): Total seconds for the whole call, every request included
 
     Returns:
         Dict with standardized format:
@@ -99,10 +140,12 @@ def twelvedata_price_historical(
                 "status": "success" | "error",
                 "symbol": "AAPL",
                 "interval": "1day",
+                "timezone": "America/New_York",   # of 'datetime'; omitted when unknown
                 "count": 30,
                 "data": [
                     {
                         "datetime": "2021-01-04",
+                        "timestamp": 1609718400,   # only with epoch=True
                         "open": 133.52,
                         "high": 133.61,
                         "low": 126.76,
@@ -118,10 +161,7 @@ def twelvedata_price_historical(
     if not symbol.strip():
         raise ValueError("symbol cannot be empty or whitespace")
 
-    if not isinstance(api_key, str):
-        raise TypeError(f"api_key must be a string, got {type(api_key).__name__}")
-    if not api_key.strip():
-        raise ValueError("api_key cannot be empty or whitespace")
+    _check_api_key(api_key)
 
     if not isinstance(interval, str):
         raise TypeError(f"interval must be a string, got {type(interval).__name__}")
@@ -130,28 +170,44 @@ def twelvedata_price_historical(
 
     if not isinstance(outputsize, int):
         raise TypeError(f"outputsize must be an integer, got {type(outputsize).__name__}")
-    if not 1 <= outputsize <= 5000:
-        raise ValueError(f"outputsize must be between 1 and 5000, got {outputsize}")
+    if not 1 <= outputsize <= TWELVEDATA_MAX_OUTPUTSIZE:
+        raise ValueError(
+            f"outputsize must be between 1 and {TWELVEDATA_MAX_OUTPUTSIZE}, got {outputsize}"
+        )
+
+    for name, value in (
+        ("start_date", start_date), ("end_date", end_date), ("timezone", timezone)
+    ):
+        if value is not None and not isinstance(value, str):
+            raise TypeError(f"{name} must be a string, got {type(value).__name__}")
+
+    if not isinstance(epoch, bool):
+        raise TypeError(f"epoch must be a boolean, got {type(epoch).__name__}")
+
+    symbol = resolve_ids("twelvedata", symbol)
+
+    params: Dict[str, Any] = {
+        "symbol": symbol,
+        "interval": interval,
+        "outputsize": outputsize,
+    }
+    if start_date is not None:
+        params["start_date"] = start_date
+    if end_date is not None:
+        params["end_date"] = end_date
+    if timezone is not None:
+        params["timezone"] = timezone
 
     raw_result = handle_api_request(
         "twelvedata",
-        lambda: requests.get(
-            TWELVEDATA_ENDPOINTS["time_series"],
-            params={
-                "symbol": symbol,
-                "interval": interval,
-                "outputsize": outputsize,
-                "apikey": api_key,
-            },
-            timeout=DEFAULT_TIMEOUT,
-        ),
+        _request(TWELVEDATA_ENDPOINTS["time_series"], params, api_key),
         DEFAULT_TIMEOUT,
     )
 
     fetched_at = int(time.time())
 
     if raw_result is None or "values" not in raw_result:
-        return {
+        envelope: Dict[str, Any] = {
             "source": "twelvedata",
             "fetched_at": fetched_at,
             "status": "error",
@@ -160,22 +216,31 @@ def twelvedata_price_historical(
             "count": 0,
             "data": [],
         }
+        if raw_result is not None and raw_result.get("message"):
+            envelope["message"] = str(raw_result["message"])
+        return envelope
+
+    # Timezone the returned datetimes are in
+    data_timezone = timezone or (raw_result.get("meta") or {}).get("exchange_timezone")
+    to_epoch = EpochParser(data_timezone) if epoch else None
 
     data: list = []
     for entry in raw_result["values"]:
-        row: Dict[str, Any] = {
-            "datetime": entry["datetime"],
+        row: Dict[str, Any] = {"datetime": entry["datetime"]}
+        if to_epoch is not None:
+            row["timestamp"] = to_epoch(entry["datetime"])
+        row.update({
             "open": float(entry["open"]),
             "high": float(entry["high"]),
             "low": float(entry["low"]),
             "close": float(entry["close"]),
-        }
+        })
         volume = entry.get("volume")
         if volume is not None:
             row["volume"] = int(volume)
         data.append(row)
 
-    return {
+    result: Dict[str, Any] = {
         "source": "twelvedata",
         "fetched_at": fetched_at,
         "status": "success" if data else "error",
@@ -184,6 +249,9 @@ def twelvedata_price_historical(
         "count": len(data),
         "data": data,
     }
+    if data_timezone:
+        result["timezone"] = data_timezone
+    return result
 
 
 # Convenience alias matching the naming pattern of other providers
@@ -0,0 +1,70 @@
+"""Record provider responses to an archive and replay them offline."""
+
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from .utils import Cassette, ResponseCache, get_cassette, set_cassette
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def record(path: str) -> Iterator[Cassette]:
+    """
+    Record every raw provider response received in the block into path.
+
+    Responses are added to the archive if it exists (the latest per request
+    wins) and the file is written when the block exits, even on error.
+
+    Example:
+        >>> with record('prod-2024-06-01.jsonl.gz'):
+        ...     run_batch(jobs, writer.write)
+    """
+    cassette = Cassette(path, mode="record")
+    previous = get_cassette()
+    set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous)
+        cassette.save()
+        logger.info("replay: %s recorded into %s", cassette.stats()["recorded"], path)
+
+
+@contextmanager
+def replay(path: str, strict: bool = True) -> Iterator[Cassette]:
+    """
+    Answer provider requests in the block from the archive at path, with no network latency.
+
+    Every price function then normalizes the recorded payloads exactly as it
+    did when they were recorded. With strict=True (default) a request missing
+    from the archive fails as an error response; with strict=False it is sent.
+
+    Example:
+        >>> with replay('prod-2024-06-01.jsonl.gz') as cassette:
+        ...     llama_price_chart('coingecko:bitcoin', 1609459200, 2000)
+        >>> cassette.stats()['misses']
+        0
+    """
+    cassette = Cassette(path, mode="replay", strict=strict)
+    previous = get_cassette()
+    set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous)
+
+
+def warm_cache(path: str, cache: ResponseCache) -> int:
+    """
+    Copy every successful response in the archive at path into cache; return how many.
+
+    Entries are stored as fetched now, so they stay fresh for their endpoint's TTL.
+    """
+    count = 0
+    for key, status, body in Cassette(path, mode="replay").entries():
+        if status == 200:
+            cache.set(key, body)
+            count += 1
+    return count
@@ -0,0 +1,276 @@
+"""Resolve tickers to provider ids using cached provider coin and symbol lists."""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .config import (
+    COINGECKO_ENDPOINTS,
+    COINGECKO_TO_DEFILLAMA_CHAINS,
+    DEFAULT_TIMEOUT,
+    RESOLVER_CACHE_DIR,
+    RESOLVER_RETRY,
+    RESOLVER_TTL,
+    TWELVEDATA_ENDPOINTS,
+)
+from .utils import ApiRequest, handle_api_request
+
+logger = logging.getLogger(__name__)
+
+# Twelve Data reference lists merged into the symbol index
+_TWELVEDATA_LISTS = ("stocks", "etf", "forex_pairs", "cryptocurrencies")
+
+
+class CoinResolver:
+    """
+    Symbol and address indexes built from provider coin lists.
+
+    Each list is downloaded once, stored as JSON in ``cache_dir`` and reused
+    until it is older than ``ttl`` seconds; the indexes are rebuilt on the
+    first lookup after they are ``ttl`` seconds old, so a long-running process
+    picks up new listings. Lookups are dict hits on lowercase keys. If a list can be neither downloaded nor read from disk,
+    lookups use what did load and the lists are tried again after ``retry``
+    seconds.
+
+    Args:
+        cache_dir: Directory for the downloaded lists
+        ttl: Seconds before a cached list is downloaded again
+        coingecko_api_key: CoinGecko Demo API key for the coin list downloads
+        twelvedata_api_key: Twelve Data API key for the symbol list downloads
+            (the Twelve Data index is skipped when not given)
+        prefer: Explicit symbol -> CoinGecko id choices that override ranking
+        retry: Seconds before lists that could not be loaded are tried again
+
+    Example:
+        >>> resolver = CoinResolver(coingecko_api_key='...')
+        >>> resolver.gecko_id('ETH')
+        'ethereum'
+        >>> resolver.llama_id('ETH')
+        'coingecko:ethereum'
+        >>> resolver.chains('0x6b175474e89094c44da98b954eedeac495271d0f')
+        ['ethereum', 'arbitrum', ...]
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = RESOLVER_CACHE_DIR,
+        ttl: float = RESOLVER_TTL,
+        coingecko_api_key: Optional[str] = None,
+        twelvedata_api_key: Optional[str] = None,
+        prefer: Optional[Dict[str, str]] = None,
+        retry: float = RESOLVER_RETRY,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.coingecko_api_key = coingecko_api_key
+        self.twelvedata_api_key = twelvedata_api_key
+        self.prefer = {k.lower(): v for k, v in (prefer or {}).items()}
+        self.retry = retry
+        self._lock = threading.Lock()
+        # time.monotonic() at which the indexes are next rebuilt
+        self._refresh_at = 0.0
+        self._gecko_ids: Set[str] = set()
+        self._symbol_to_gecko: Dict[str, List[str]] = {}
+        self._address_to_chains: Dict[str, List[str]] = {}
+        self._twelvedata_symbols: Dict[str, str] = {}
+
+    # ==================== Lookups ====================
+
+    def gecko_ids(self, symbol: str) -> List[str]:
+        """All CoinGecko ids sharing a symbol, best-ranked first."""
+        self._ensure_loaded()
+        return list(self._symbol_to_gecko.get(symbol.strip().lower(), []))
+
+    def gecko_id(self, symbol_or_id: str) -> Optional[str]:
+        """The CoinGecko id for a known id or the best-ranked coin with that symbol."""
+        self._ensure_loaded()
+        key = symbol_or_id.strip().lower()
+        if key in self.prefer:
+            return self.prefer[key]
+        if key in self._gecko_ids:
+            return key
+        candidates = self._symbol_to_gecko.get(key)
+        return candidates[0] if candidates else None
+
+    def llama_id(self, symbol_or_id: str) -> Optional[str]:
+        """A DefiLlama id: 'chain:address' ids pass through, symbols map to 'coingecko:<id>'."""
+        if ":" in symbol_or_id:
+            return symbol_or_id.strip()
+        gecko_id = self.gecko_id(symbol_or_id)
+        return f"coingecko:{gecko_id}" if gecko_id else None
+
+    def chains(self, address: str) -> List[str]:
+        """DefiLlama chain prefixes on which a token contract address is listed."""
+        self._ensure_loaded()
+        return list(self._address_to_chains.get(address.strip().lower(), []))
+
+    def twelvedata_symbol(self, symbol: str) -> Optional[str]:
+        """The canonical Twelve Data symbol (e.g. 'eur/usd' -> 'EUR/USD'), or None if unlisted."""
+        self._ensure_loaded()
+        return self._twelvedata_symbols.get(symbol.strip().lower())
+
+    def resolve(self, provider: str, ids: str) -> str:
+        """Rewrite a comma-separated id string for a provider, leaving unknown entries untouched."""
+        lookup = {
+            "coingecko": self.gecko_id,
+            "defillama": self.llama_id,
+            "twelvedata": self.twelvedata_symbol,
+        }.get(provider)
+        if lookup is None:
+            return ids
+        return ",".join(lookup(part) or part for part in ids.split(","))
+
+    # ==================== Loading ====================
+
+    def refresh(self, force: bool = False) -> None:
+        """(Re)build the indexes, downloading lists that are missing or older than ttl."""
+        with self._lock:
+            self._rebuild(force)
+
+    def _ensure_loaded(self) -> None:
+        if time.monotonic() >= self._refresh_at:
+            with self._lock:
+                # Another thread may have rebuilt while this one waited for the lock
+                if time.monotonic() >= self._refresh_at:
+                    self._rebuild(False)
+
+    def _rebuild(self, force: bool) -> None:
+        """Build the indexes and schedule the next rebuild (caller holds the lock)."""
+        if self._build(force):
+            self._refresh_at = time.monotonic() + self.ttl
+        else:
+            logger.warning("resolver: coin lists unavailable, retrying in %ss", self.retry)
+            self._refresh_at = time.monotonic() + self.retry
+
+    def _build(self, force: bool) -> bool:
+        """Rebuild the indexes; return False if any list could not be loaded."""
+        coins = self._load("coingecko_coins", self._download_gecko_coins, force)
+        markets = self._load("coingecko_markets", self._download_gecko_markets, force)
+        complete = coins is not None and markets is not None
+        coins, markets = coins or [], markets or []
+        rank = {coin_id: i for i, coin_id in enumerate(markets)}
+
+        gecko_ids: Set[str] = set()
+        by_symbol: Dict[str, List[str]] = {}
+        by_address: Dict[str, List[str]] = {}
+        for coin in coins:
+            coin_id = coin["id"]
+            gecko_ids.add(coin_id)
+            by_symbol.setdefault(coin.get("symbol", "").lower(), []).append(coin_id)
+            for platform, address in (coin.get("platforms") or {}).items():
+                if platform and address:
+                    chain = COINGECKO_TO_DEFILLAMA_CHAINS.get(platform, platform)
+                    by_address.setdefault(address.lower(), []).append(chain)
+        for candidates in by_symbol.values():
+            candidates.sort(key=lambda c: rank.get(c, len(rank)))
+
+        twelvedata: Dict[str, str] = {}
+        if self.twelvedata_api_key:
+            for name in _TWELVEDATA_LISTS:
+                symbols = self._load(
+                    f"twelvedata_{name}", lambda n=name: self._download_twelvedata(n), force
+                )
+                complete = complete and symbols is not None
+                for symbol in symbols or []:
+                    twelvedata.setdefault(symbol.lower(), symbol)
+
+        self._gecko_ids = gecko_ids
+        self._symbol_to_gecko = by_symbol
+        self._address_to_chains = by_address
+        self._twelvedata_symbols = twelvedata
+        return complete
+
+    def _load(self, name: str, download: Any, force: bool) -> Optional[Any]:
+        """Return a cached list if fresh, else download and cache it (falling back to stale)."""
+        path = Path(self.cache_dir) / f"{name}.json"
+        fresh = path.exists() and time.time() - path.stat().st_mtime < self.ttl
+        if fresh and not force:
+            with path.open() as f:
+                return json.load(f)
+
+        data = download()
+        if data is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with tmp.open("w") as f:
+                json.dump(data, f)
+            tmp.replace(path)
+            return data
+        if path.exists():
+            logger.warning("resolver: refreshing %s failed, using stale copy", name)
+            with path.open() as f:
+                return json.load(f)
+        return None
+
+    def _gecko_headers(self) -> Dict[str, str]:
+        return {"x-cg-demo-api-key": self.coingecko_api_key} if self.coingecko_api_key else {}
+
+    def _download_gecko_coins(self) -> Optional[List[Dict[str, Any]]]:
+        # These endpoints answer with a JSON list, not an object
+        raw_result: Any = handle_api_request(
+            "coingecko",
+            ApiRequest(
+                COINGECKO_ENDPOINTS["coins_list"],
+                params={"include_platform": "true"},
+                headers=self._gecko_headers(),
+                timeout=DEFAULT_TIMEOUT * 3,
+            ),
+            DEFAULT_TIMEOUT * 3,
+        )
+        return raw_result if isinstance(raw_result, list) else None
+
+    def _download_gecko_markets(self) -> Optional[List[str]]:
+        # Top coins by market cap, used to rank coins that share a symbol
+        raw_result: Any = handle_api_request(
+            "coingecko",
+            ApiRequest(
+                COINGECKO_ENDPOINTS["coins_markets"],
+                params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": 250},
+                headers=self._gecko_headers(),
+                timeout=DEFAULT_TIMEOUT,
+            ),
+            DEFAULT_TIMEOUT,
+        )
+        if not isinstance(raw_result, list):
+            return None
+        return [coin["id"] for coin in raw_result]
+
+    def _download_twelvedata(self, name: str) -> Optional[List[str]]:
+        raw_result = handle_api_request(
+            "twelvedata",
+            ApiRequest(
+                TWELVEDATA_ENDPOINTS[name],
+                params={"apikey": self.twelvedata_api_key},
+                timeout=DEFAULT_TIMEOUT * 3,
+            ),
+            DEFAULT_TIMEOUT * 3,
+        )
+        if raw_result is None or "data" not in raw_result:
+            return None
+        return [entry["symbol"] for entry in raw_result["data"] if "symbol" in entry]
+
+
+_resolver: Optional[CoinResolver] = None
+
+
+def set_resolver(resolver: Optional[CoinResolver]) -> None:
+    """Let price functions accept symbols by resolving them with this resolver (None disables)."""
+    global _resolver
+    _resolver = resolver
+
+
+def get_resolver() -> Optional[CoinResolver]:
+    """Return the installed resolver, if any."""
+    return _resolver
+
+
+def resolve_ids(provider: str, ids: str) -> str:
+    """Resolve symbols in ids for a provider when a resolver is installed; otherwise a no-op."""
+    resolver = _resolver
+    if resolver is None:
+        return ids
+    return resolver.resolve(provider, ids)
@@ -0,0 +1,440 @@
+"""Route price requests to the healthiest provider that knows the asset."""
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from .config import DEFAULT_TIMEOUT, TWELVEDATA_MAX_OUTPUTSIZE, TWELVEDATA_NO_DATA
+from .prices import (
+    gecko_price_current,
+    gecko_price_range,
+    llama_price_chart,
+    llama_price_historical,
+    twelvedata_price_current,
+    twelvedata_price_historical,
+)
+from .resolver import CoinResolver
+from .utils import (
+    Hedger,
+    KeyPool,
+    deadline_scope,
+    get_rate_limiter,
+    in_caller_context,
+    spare_token,
+)
+from .utils.dates import format_utc
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("coingecko", "defillama", "twelvedata")
+
+# Chart granularity -> (DefiLlama period, Twelve Data interval, seconds per point)
+_GRANULARITIES: Dict[str, Tuple[str, str, int]] = {
+    "hourly": ("1h", "1h", 3600),
+    "daily": ("1d", "1day", 86400),
+}
+
+
+class ProviderHealth:
+    """Rolling latency and error rate over a provider's last ``window`` calls."""
+
+    def __init__(self, window: int = 50) -> None:
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._calls.append((latency, ok))
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(1 for _, ok in self._calls if not ok) / len(self._calls)
+
+    @property
+    def latency(self) -> float:
+        """Mean latency of recent successful calls (0 before any succeeded)."""
+        with self._lock:
+            ok = [latency for latency, success in self._calls if success]
+        return sum(ok) / len(ok) if ok else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            calls = len(self._calls)
+        return {"calls": calls, "error_rate": self.error_rate, "latency": self.latency}
+
+
+class PriceRouter:
+    """
+    Send each price request to the best available provider and fail over on errors.
+
+    Providers are ranked per call: those under ``max_error_rate`` before those
+    over it, then those with rate-limit tokens left before those that would
+    have to wait, then by rolling latency, then by the order given. An error
+    envelope from one provider moves on to the next; the answering provider's
+    envelope is returned (so ``source`` names it) with an ``attempts`` list.
+
+    Ids per provider come from ``ids=`` on the call, else the resolver (if
+    given), else the asset is taken as a CoinGecko id — DefiLlama is then asked
+    for ``coingecko:<id>``, and a 'chain:address' asset goes to DefiLlama only.
+
+    Args:
+        providers: Providers to use, in preference order
+        api_keys: Provider -> API key or KeyPool ('twelvedata' is skipped without one)
+        resolver: CoinResolver for symbols and cross-provider ids
+        window: Calls per provider kept for latency and error rate
+        max_error_rate: Error rate at which a provider is demoted
+
+    Example:
+        >>> router = PriceRouter(api_keys={'coingecko': '...'})
+        >>> router.current('ethereum')['source']
+        'coingecko'
+        >>> router.chart('ethereum', 1609459200, 1612137600, granularity='hourly')
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[str] = ("coingecko", "defillama"),
+        api_keys: Optional[Dict[str, Union[str, KeyPool]]] = None,
+        resolver: Optional[CoinResolver] = None,
+        window: int = 50,
+        max_error_rate: float = 0.5,
+    ) -> None:
+        unknown = [p for p in providers if p not in PROVIDERS]
+        if unknown:
+            raise ValueError(f"providers must be among {list(PROVIDERS)}, got {unknown}")
+        self.providers = tuple(providers)
+        self.api_keys = dict(api_keys or {})
+        self.resolver = resolver
+        self.max_error_rate = max_error_rate
+        self._health = {p: ProviderHealth(window) for p in self.providers}
+        self._hedger = Hedger()
+
+    # ==================== Routing ====================
+
+    def ids_for(self, asset: str, ids: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Provider -> id for an asset, limited to providers that can be called."""
+        ids = dict(ids or {})
+        if self.resolver is not None:
+            found = {
+                "coingecko": self.resolver.gecko_id(asset),
+                "defillama": self.resolver.llama_id(asset),
+                "twelvedata": self.resolver.twelvedata_symbol(asset),
+            }
+        elif ":" in asset:
+            found = {"defillama": asset}
+        else:
+            found = {"coingecko": asset, "defillama": f"coingecko:{asset}"}
+        for provider, provider_id in found.items():
+            if provider_id:
+                ids.setdefault(provider, provider_id)
+        if "twelvedata" not in self.api_keys:
+            ids.pop("twelvedata", None)
+        return {p: ids[p] for p in self.providers if p in ids}
+
+    def rank(self, providers: Sequence[str]) -> List[str]:
+        """Order providers best first."""
+
+        def key(provider: str) -> Tuple[bool, bool, float, int]:
+            health = self._health[provider]
+            limiter = get_rate_limiter(provider)
+            throttled = limiter is not None and limiter.stats()["available"] < 1
+            return (
+                health.error_rate >= self.max_error_rate,
+                throttled,
+                health.latency,
+                self.providers.index(provider),
+            )
+
+        return sorted(providers, key=key)
+
+    def _route(
+        self,
+        asset: str,
+        ids: Optional[Dict[str, str]],
+        calls: Dict[str, Callable[[str], Dict[str, Any]]],
+        hedge: bool = False,
+    ) -> Dict[str, Any]:
+        candidates = self.ids_for(asset, ids)
+        attempts: List[Dict[str, Any]] = []
+
+        def attempt(provider: str) -> Optional[Dict[str, Any]]:
+            started = time.monotonic()
+            try:
+                envelope = calls[provider](candidates[provider])
+            except (TypeError, ValueError) as e:
+                # The id does not fit this provider; not a health problem
+                logger.info("router: %s rejected %s: %s", provider, candidates[provider], e)
+                attempts.append({"provider": provider, "status": "rejected", "latency": 0.0})
+                return None
+            latency = time.monotonic() - started
+            self._health[provider].record(latency, envelope["status"] == "success")
+            attempts.append(
+                {"provider": provider, "status": envelope["status"], "latency": latency}
+            )
+            return envelope
+
+        def good(envelope: Optional[Dict[str, Any]]) -> bool:
+            return envelope is not None and envelope["status"] == "success"
+
+        ranked = self.rank([p for p in candidates if p in calls])
+        envelope: Optional[Dict[str, Any]] = None
+        if hedge and len(ranked) >= 2:
+            # Race the best provider against the runner-up once the best is slow
+            first, second = ranked[:2]
+            ranked = ranked[2:]
+            envelope = self._hedger.run(
+                lambda: attempt(first),
+                lambda: attempt(second),
+                ok=good,
+                can_hedge=lambda: spare_token(second),
+            )
+            if good(envelope):
+                return {**envelope, "attempts": list(attempts)}
+            if not any(a["provider"] == second for a in attempts):
+                ranked.insert(0, second)
+
+        for provider in ranked:
+            result = attempt(provider)
+            envelope = result or envelope
+            if good(result):
+                return {**result, "attempts": attempts}  # type: ignore[dict-item]
+            logger.info("router: %s failed for %s, failing over", provider, asset)
+
+        if envelope is None:
+            envelope = {
+                "source": "router",
+                "fetched_at": int(time.time()),
+                "status": "error",
+                "count": 0,
+                "data": [],
+            }
+        return {**envelope, "attempts": attempts}
+
+    # ==================== Requests ====================
+
+    def current(
+        self,
+        asset: str,
+        ids: Optional[Dict[str, str]] = None,
+        hedge: bool = False,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Current USD price of an asset from the best available provider.
+
+        With hedge=True, if the best provider is slower than the router's
+        rolling p95, the runner-up is asked too and the first good answer wins.
+        A ``deadline`` (seconds) covers every provider tried, failovers included.
+        """
+        with deadline_scope(deadline):
+            return self._route(asset, ids, self._current_calls(), hedge=hedge)
+
+    def _current_calls(self) -> Dict[str, Callable[[str], Dict[str, Any]]]:
+        return {
+            "coingecko": lambda i: gecko_price_current(i, api_key=self.api_keys.get("coingecko")),
+            "defillama": lambda i: llama_price_historical(i),
+            "twelvedata": lambda i: twelvedata_price_current(i, self.api_keys["twelvedata"]),
+        }
+
+    def consensus(
+        self,
+        asset: str,
+        ids: Optional[Dict[str, str]] = None,
+        deadline: float = DEFAULT_TIMEOUT,
+        max_deviation: float = 0.02,
+        min_sources: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        Current USD price of an asset from every provider at once, with their median.
+
+        All providers that know the asset are asked concurrently; whatever has
+        answered after ``deadline`` seconds is used and the rest are listed in
+        ``missing``. The deadline also bounds each provider's own requests, so
+        a late call sends nothing further. A source further
+        than ``max_deviation`` (relative) from the median is flagged as an outlier.
+
+        Returns:
+            Envelope with ``source`` 'consensus', one data row per answering
+            provider (``provider``, ``price``, ``deviation``, ``outlier``), and
+            ``median``, ``spread`` ((max - min) / median), ``outliers`` and
+            ``missing``. Status is 'error' with fewer than ``min_sources`` prices.
+        """
+        if deadline <= 0:
+            raise ValueError(f"deadline must be positive, got {deadline}")
+        if max_deviation < 0:
+            raise ValueError(f"max_deviation must be non-negative, got {max_deviation}")
+        calls = self._current_calls()
+        candidates = {p: i for p, i in self.ids_for(asset, ids).items() if p in calls}
+
+        def fetch(provider: str) -> Optional[float]:
+            started = time.monotonic()
+            try:
+                envelope = calls[provider](candidates[provider])
+            except (TypeError, ValueError) as e:
+                logger.info("consensus: %s rejected %s: %s", provider, candidates[provider], e)
+                return None
+            ok = envelope["status"] == "success" and bool(envelope["data"])
+            self._health[provider].record(time.monotonic() - started, ok)
+            return envelope["data"][0]["price"] if ok else None
+
+        prices: Dict[str, float] = {}
+        if candidates:
+            pool = ThreadPoolExecutor(max_workers=len(candidates))
+            with deadline_scope(deadline):
+                fetch_in_scope = in_caller_context(fetch)
+            futures = {pool.submit(fetch_in_scope, p): p for p in candidates}
+            done, late = wait(futures, timeout=deadline)
+            # Do not wait for providers that missed the deadline
+            pool.shutdown(wait=False)
+            for future in done:
+                price = future.result()
+                if price is not None:
+                    prices[futures[future]] = price
+            for future in late:
+                logger.info("consensus: %s missed the %.1fs deadline", futures[future], deadline)
+                self._health[futures[future]].record(deadline, False)
+
+        envelope: Dict[str, Any] = {
+            "source": "consensus",
+            "fetched_at": int(time.time()),
+            "status": "success" if len(prices) >= max(min_sources, 1) else "error",
+            "count": 0,
+            "data": [],
+            "median": None,
+            "spread": None,
+            "outliers": [],
+            "missing": [p for p in candidates if p not in prices],
+        }
+        if not prices:
+            return envelope
+        median = statistics.median(prices.values())
+        rows = []
+        for provider in candidates:
+            if provider not in prices:
+                continue
+            deviation = (prices[provider] - median) / median if median else 0.0
+            rows.append({
+                "provider": provider,
+                "price": prices[provider],
+                "deviation": deviation,
+                "outlier": abs(deviation) > max_deviation,
+            })
+        envelope.update(
+            count=len(rows),
+            data=rows,
+            median=median,
+            spread=(max(prices.values()) - min(prices.values())) / median if median else 0.0,
+            outliers=[row["provider"] for row in rows if row["outlier"]],
+        )
+        return envelope
+
+    def chart(
+        self,
+        asset: str,
+        start: int,
+        end: int,
+        granularity: str = "daily",
+        ids: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        USD price series over [start, end] from the best available provider.
+
+        Every provider's points carry ``timestamp`` and ``price`` (Twelve Data
+        bars add ``price`` = close) and come oldest first, whichever provider
+        answers; Twelve Data's newest-first bars are sorted to match. Twelve
+        Data ranges longer than 5000 bars are requested in 5000-bar windows,
+        and a window with no data is skipped. A ``deadline`` (seconds) covers every
+        provider tried and every page they request.
+        """
+        if granularity not in _GRANULARITIES:
+            raise ValueError(
+                f"granularity must be one of {list(_GRANULARITIES)}, got '{granularity}'"
+            )
+        period, interval, step = _GRANULARITIES[granularity]
+
+        def twelvedata(symbol: str) -> Dict[str, Any]:
+            window = TWELVEDATA_MAX_OUTPUTSIZE * step
+            rows: List[Dict[str, Any]] = []
+            envelope: Dict[str, Any] = {}
+            for window_start in range(start, end + 1, window):
+                envelope = twelvedata_price_historical(
+                    symbol,
+                    self.api_keys["twelvedata"],
+                    interval=interval,
+                    outputsize=TWELVEDATA_MAX_OUTPUTSIZE,
+                    start_date=format_utc(window_start),
+                    end_date=format_utc(min(window_start + window - step, end)),
+                    epoch=True,
+                    timezone="UTC",
+                )
+                if envelope["status"] != "success":
+                    if str(envelope.get("message", "")).startswith(TWELVEDATA_NO_DATA):
+                        continue
+                    return envelope
+                rows.extend({**row, "price": row["close"]} for row in envelope["data"])
+            rows.sort(key=lambda row: row["timestamp"])
+            envelope.update(
+                status="success" if rows else "error", count=len(rows), data=rows
+            )
+            return envelope
+
+        with deadline_scope(deadline):
+            return self._route(asset, ids, {
+                "coingecko": lambda i: gecko_price_range(
+                    i, start, end, granularity=granularity, api_key=self.api_keys.get("coingecko")
+                ),
+                "defillama": lambda i: llama_price_chart(
+                    i, start, (end - start) // step + 1, period=period
+                ),
+                "twelvedata": twelvedata,
+            })
+
+    # ==================== Monitoring ====================
+
+    def hedge_stats(self) -> Dict[str, float]:
+        """Counters of the router's cross-provider hedger."""
+        return self._hedger.stats()
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider calls, error rate, latency and remaining rate-limit tokens."""
+        report: Dict[str, Dict[str, Any]] = {}
+        for provider, health in self._health.items():
+            limiter = get_rate_limiter(provider)
+            report[provider] = {
+                **health.snapshot(),
+                "quota": limiter.stats()["available"] if limiter is not None else None,
+            }
+        return report
+
+
+def consensus_price(
+    asset: str,
+    providers: Sequence[str] = PROVIDERS,
+    api_keys: Optional[Dict[str, Union[str, KeyPool]]] = None,
+    resolver: Optional[CoinResolver] = None,
+    ids: Optional[Dict[str, str]] = None,
+    deadline: float = DEFAULT_TIMEOUT,
+    max_deviation: float = 0.02,
+    min_sources: int = 1,
+) -> Dict[str, Any]:
+    """
+    One-off PriceRouter(...).consensus(...): median current price across providers.
+
+    Example:
+        >>> consensus_price('ethereum', api_keys={'twelvedata': '...'},
+        ...                 ids={'twelvedata': 'ETH/USD'})
+        {'source': 'consensus', 'status': 'success', 'median': 2501.2, 'spread': 0.003,
+         'outliers': [], 'missing': [], 'count': 3, 'data': [...]}
+    """
+    router = PriceRouter(providers, api_keys=api_keys, resolver=resolver)
+    return router.consensus(
+        asset, ids=ids, deadline=deadline, max_deviation=max_deviation, min_sources=min_sources
+    )
@@ -0,0 +1,323 @@
+"""Time-indexed price series with binary-search lookups and as-of alignment."""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .utils.dates import EpochParser
+
+_MODES = ("prev", "next", "nearest")
+
+
+class PriceSeries:
+    """
+    A sorted, array-backed (timestamp, price) series.
+
+    Timestamps are kept in a ``array('q')`` and prices in an ``array('d')``;
+    lookups are binary searches and slices are memoryviews over the same
+    buffers, so neither copies data. Duplicate timestamps keep the last value.
+
+    Args:
+        timestamps: UNIX timestamps (seconds)
+        prices: Prices, one per timestamp
+
+    Example:
+        >>> series = PriceSeries.from_envelope(llama_price_chart('coingecko:ethereum', 1609459200, 365))
+        >>> series.at(1612137600)                   # price at or before the timestamp
+        1314.98
+        >>> series.at(1612137600, mode='nearest')
+        1314.98
+        >>> february = series.between(1612137600, 1614556799)
+    """
+
+    __slots__ = ("_timestamps", "_prices")
+
+    def __init__(self, timestamps: Iterable[int], prices: Iterable[float]) -> None:
+        ts = array("q", timestamps)
+        values = array("d", prices)
+        if len(ts) != len(values):
+            raise ValueError(
+                f"timestamps and prices must have the same length, got {len(ts)} and {len(values)}"
+            )
+        if any(ts[i] >= ts[i + 1] for i in range(len(ts) - 1)):
+            # Sort by timestamp; dict keeps the last value for a repeated timestamp
+            by_ts = dict(zip(ts, values))
+            ts = array("q", sorted(by_ts))
+            values = array("d", (by_ts[t] for t in ts))
+        self._timestamps = memoryview(ts)
+        self._prices = memoryview(values)
+
+    @classmethod
+    def _view(cls, timestamps: memoryview, prices: memoryview) -> "PriceSeries":
+        series = cls.__new__(cls)
+        series._timestamps = timestamps
+        series._prices = prices
+        return series
+
+    @classmethod
+    def from_points(
+        cls,
+        points: Iterable[Dict[str, Any]],
+        field: str = "price",
+        timezone: Optional[str] = None,
+    ) -> "PriceSeries":
+        """
+        Build from ``[{"timestamp": ..., field: ...}, ...]`` points, skipping null values.
+
+        Points without a timestamp use their 'datetime' string (Twelve Data),
+        read in ``timezone`` (default UTC) as twelvedata_price_historical does.
+        """
+        to_epoch = EpochParser(timezone)
+        pairs = [
+            (int(p["timestamp"]) if "timestamp" in p else to_epoch(p["datetime"]), p[field])
+            for p in points
+            if p.get(field) is not None
+        ]
+        return cls((t for t, _ in pairs), (v for _, v in pairs))
+
+    @classmethod
+    def from_envelope(cls, envelope: Dict[str, Any], field: str = "price") -> "PriceSeries":
+        """
+        Build from a chart envelope (use field='close' for twelvedata_price_historical).
+
+        Twelve Data datetimes are read in the envelope's 'timezone'.
+        """
+        return cls.from_points(envelope["data"], field, envelope.get("timezone"))
+
+    # ==================== Access ====================
+
+    @property
+    def timestamps(self) -> memoryview:
+        """The timestamps as a memoryview (no copy)."""
+        return memoryview(self._timestamps)
+
+    @property
+    def prices(self) -> memoryview:
+        """The prices as a memoryview (no copy)."""
+        return memoryview(self._prices)
+
+    @property
+    def start(self) -> Optional[int]:
+        return self._timestamps[0] if len(self) else None
+
+    @property
+    def end(self) -> Optional[int]:
+        return self._timestamps[-1] if len(self) else None
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self._timestamps, self._prices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError("PriceSeries slices must have step 1")
+            return self._view(self._timestamps[index], self._prices[index])
+        return self._timestamps[index], self._prices[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"PriceSeries(len={len(self)}, start={self.start}, end={self.end})"
+
+    # ==================== Lookups ====================
+
+    def index(self, timestamp: int, mode: str = "prev") -> Optional[int]:
+        """
+        Position of the point matching timestamp, or None if there is none.
+
+        mode 'prev' takes the last point at or before timestamp, 'next' the first
+        point at or after it, and 'nearest' the closer of the two (earlier on ties).
+        """
+        if mode not in _MODES:
+            raise ValueError(f"mode must be one of {list(_MODES)}, got '{mode}'")
+        ts = self._timestamps
+        n = len(ts)
+        if mode == "prev":
+            i = bisect_right(ts, timestamp) - 1
+            return i if i >= 0 else None
+        i = bisect_left(ts, timestamp)
+        if mode == "next":
+            return i if i < n else None
+        if i == n:
+            return n - 1 if n else None
+        if i == 0 or ts[i] == timestamp:
+            return i
+        return i - 1 if timestamp - ts[i - 1] <= ts[i] - timestamp else i
+
+    def at(self, timestamp: int, mode: str = "prev") -> Optional[float]:
+        """Price of the point selected by index(timestamp, mode), or None."""
+        i = self.index(timestamp, mode)
+        return self._prices[i] if i is not None else None
+
+    def between(self, start: int, end: int) -> "PriceSeries":
+        """Points with start <= timestamp <= end, as a view sharing this series' buffers."""
+        lo = bisect_left(self._timestamps, start)
+        hi = bisect_right(self._timestamps, end)
+        return self._view(self._timestamps[lo:hi], self._prices[lo:hi])
+
+    # ==================== Combining ====================
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Union of two series in one linear pass; other's price wins on equal timestamps."""
+        a_ts, a_px = self._timestamps, self._prices
+        b_ts, b_px = other._timestamps, other._prices
+        ts = array("q")
+        values = array("d")
+        i = j = 0
+        while i < len(a_ts) and j < len(b_ts):
+            if a_ts[i] < b_ts[j]:
+                ts.append(a_ts[i])
+                values.append(a_px[i])
+                i += 1
+            else:
+                if a_ts[i] == b_ts[j]:
+                    i += 1
+                ts.append(b_ts[j])
+                values.append(b_px[j])
+                j += 1
+        ts.extend(a_ts[i:])
+        values.extend(a_px[i:])
+        ts.extend(b_ts[j:])
+        values.extend(b_px[j:])
+        return self._view(memoryview(ts), memoryview(values))
+
+    def to_points(self) -> List[Dict[str, Any]]:
+        """Back to ``[{"timestamp": ..., "price": ...}, ...]`` points."""
+        return [{"timestamp": t, "price": p} for t, p in self]
+
+
+class AlignedSeries(NamedTuple):
+    """Several series sampled on one grid: one float column per series, NaN where missing."""
+
+    timestamps: array
+    columns: Tuple[str, ...]
+    values: Tuple[array, ...]
+
+    def column(self, name: str) -> array:
+        """The values of one series."""
+        return self.values[self.columns.index(name)]
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Yield (timestamp, value, value, ...) tuples, one per grid point."""
+        return zip(self.timestamps, *self.values)
+
+    def to_points(self) -> List[Dict[str, Any]]:
+        """``[{"timestamp": ..., <name>: value or None, ...}, ...]`` points."""
+        return [
+            {"timestamp": row[0], **{
+                name: None if math.isnan(v) else v for name, v in zip(self.columns, row[1:])
+            }}
+            for row in self.rows()
+        ]
+
+
+def align(
+    series: Mapping[str, PriceSeries],
+    grid: Sequence[int],
+    mode: str = "prev",
+    tolerance: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> AlignedSeries:
+    """
+    As-of join several series onto a sorted timestamp grid.
+
+    Each grid point takes the point chosen by ``mode`` (as in PriceSeries.at):
+    'prev' for the last point at or before it, 'next' for the first at or after
+    it, 'nearest' for the closer one — so slightly drifting timestamps (e.g.
+    DefiLlama's) still land on the intended grid point. Each column is filled
+    in a single merge pass over the grid, O(len(series) + len(grid)).
+
+    Args:
+        series: Column name -> PriceSeries
+        grid: Strictly increasing UNIX timestamps, e.g. range(start, end, 3600)
+        mode: 'prev', 'next' or 'nearest' (default: 'prev')
+        tolerance: Max seconds between a grid point and the point used; farther is missing
+        limit: Max consecutive grid points that may reuse one point after its first
+            use (forward-fill limit); None fills without limit
+
+    Returns:
+        AlignedSeries with the grid timestamps and one column per series (NaN = missing)
+
+    Example:
+        >>> grid = range(1609459200, 1612137600, 3600)
+        >>> aligned = align({'eth': eth, 'eurusd': eurusd}, grid, tolerance=3600)
+        >>> aligned.column('eth')[0]
+        736.42
+    """
+    if mode not in _MODES:
+        raise ValueError(f"mode must be one of {list(_MODES)}, got '{mode}'")
+    if tolerance is not None and tolerance < 0:
+        raise ValueError(f"tolerance must be non-negative, got {tolerance}")
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must be non-negative, got {limit}")
+    timestamps = array("q", grid)
+    if any(timestamps[i] >= timestamps[i + 1] for i in range(len(timestamps) - 1)):
+        raise ValueError("grid must be strictly increasing")
+
+    columns = tuple(series)
+    values = tuple(
+        _asof_column(series[name], timestamps, mode, tolerance, limit) for name in columns
+    )
+    return AlignedSeries(timestamps, columns, values)
+
+
+def _asof_column(
+    series: PriceSeries,
+    grid: array,
+    mode: str,
+    tolerance: Optional[int],
+    limit: Optional[int],
+) -> array:
+    """Fill one column by walking the grid and the series together."""
+    ts, px = series._timestamps, series._prices
+    n = len(ts)
+    out = array("d", [math.nan]) * len(grid)
+    at_or_before = 0  # count of points with ts <= g
+    before = 0  # count of points with ts < g
+    last_used = -1
+    reuses = 0
+    for k, g in enumerate(grid):
+        while at_or_before < n and ts[at_or_before] <= g:
+            at_or_before += 1
+        while before < n and ts[before] < g:
+            before += 1
+
+        prev_i = at_or_before - 1
+        next_i = before if before < n else -1
+        if mode == "prev":
+            i = prev_i
+        elif mode == "next":
+            i = next_i
+        else:
+            next_closer = next_i >= 0 and ts[prev_i] != g and ts[next_i] - g < g - ts[prev_i]
+            i = next_i if prev_i < 0 or next_closer else prev_i
+        if i < 0 or (tolerance is not None and abs(g - ts[i]) > tolerance):
+            continue
+
+        if i == last_used:
+            reuses += 1
+            if limit is not None and reuses > limit:
+                continue
+        else:
+            last_used, reuses = i, 0
+        out[k] = px[i]
+    return out
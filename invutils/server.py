@@ -0,0 +1,148 @@
+"""Local price-serving proxy: one process owns caching, coalescing and rate limits."""
+
+import json
+import logging
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from . import prices
+from .config import SERVER_HOST, SERVER_PORT
+from .utils import (
+    circuit_stats,
+    coalescer,
+    get_concurrency_limiter,
+    get_rate_limiter,
+    get_response_cache,
+    get_scheduler,
+    priority_scope,
+)
+
+logger = logging.getLogger(__name__)
+
+# Functions exposed over the proxy, unwrapped so the server never forwards to itself
+FUNCTIONS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    name: getattr(getattr(prices, name), "__wrapped__", getattr(prices, name))
+    for name in prices.__all__
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """POST /<function> with JSON kwargs → JSON envelope; GET /health and /stats."""
+
+    server_version = "invutils"
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._reply(200, _stats())
+        else:
+            self._reply(404, {"error": {"type": "NotFound", "message": self.path}})
+
+    def do_POST(self) -> None:
+        func = FUNCTIONS.get(self.path.lstrip("/"))
+        if func is None:
+            self._reply(404, {"error": {"type": "NotFound", "message": self.path}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            kwargs = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(kwargs, dict):
+                raise ValueError("request body must be a JSON object")
+        except ValueError as e:
+            self._reply(400, {"error": {"type": "ValueError", "message": str(e)}})
+            return
+        try:
+            with priority_scope(self.headers.get("X-Invutils-Priority", "interactive")):
+                result = func(**kwargs)
+        except (TypeError, ValueError) as e:
+            self._reply(400, {"error": {"type": type(e).__name__, "message": str(e)}})
+            return
+        self._reply(200, result)
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def _stats() -> Dict[str, Any]:
+    limits = {}
+    concurrency = {}
+    queues = {}
+    for name in ("coingecko", "defillama", "twelvedata"):
+        limiter = get_rate_limiter(name)
+        if limiter is not None:
+            limits[name] = limiter.stats()
+        controller = get_concurrency_limiter(name)
+        if controller is not None:
+            concurrency[name] = controller.stats()
+        if limiter is not None or controller is not None:
+            queues[name] = get_scheduler(name).stats()
+    cache = get_response_cache()
+    return {
+        "coalescing": coalescer.stats(),
+        "rate_limits": limits,
+        "concurrency": concurrency,
+        "queues": queues,
+        "circuits": circuit_stats(),
+        "cache_entries": len(cache) if cache is not None else None,
+    }
+
+
+def make_server(
+    host: str = SERVER_HOST, port: int = SERVER_PORT, unix_socket: Optional[str] = None
+) -> socketserver.BaseServer:
+    """
+    Build (but do not start) the proxy server.
+
+    Args:
+        host: Interface to bind for TCP (ignored with unix_socket)
+        port: TCP port, 0 for an ephemeral port
+        unix_socket: Path of a Unix domain socket to listen on instead of TCP
+    """
+    if unix_socket is not None:
+        if Path(unix_socket).exists():
+            Path(unix_socket).unlink()
+        return _UnixHTTPServer(unix_socket, _Handler)
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(
+    host: str = SERVER_HOST, port: int = SERVER_PORT, unix_socket: Optional[str] = None
+) -> None:
+    """Run the proxy until interrupted."""
+    server = make_server(host, port, unix_socket)
+    address: Any = unix_socket or server.server_address
+    logger.info("invutils proxy listening on %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_socket and Path(unix_socket).exists():
+            Path(unix_socket).unlink()
@@ -1,5 +1,94 @@
 """Utility functions for invutils package."""
 
-from .helpers import handle_api_request
+from .breaker import CircuitBreaker, circuit_stats, get_circuit_breaker, set_circuit_breaker
+from .cache import ResponseCache
+from .cassette import Cassette
+from .concurrency import AdaptiveConcurrency, get_concurrency_limiter, set_adaptive_concurrency
+from .deadline import Deadline, current_deadline, deadline_scope, deadlined, in_caller_context
+from .faults import FaultInjector, replay_transport
+from .hedge import Hedger, get_hedger, set_hedger
+from .helpers import (
+    ApiRequest,
+    coalescer,
+    get_cassette,
+    get_response_cache,
+    get_transport,
+    handle_api_request,
+    handle_api_request_async,
+    set_cassette,
+    set_response_cache,
+    set_transport,
+    spare_token,
+)
+from .keypool import KeyPool, NoKeyAvailable
+from .negcache import (
+    NegativeCache,
+    get_negative_cache,
+    known_empty,
+    mark_empty,
+    set_negative_cache,
+)
+from .proxy import ProxyError, ProxyUnavailable, get_proxy, proxied, set_proxy
+from .ratelimit import RateLimiter, get_rate_limiter, set_rate_limit
+from .scheduler import (
+    RequestScheduler,
+    current_priority,
+    get_scheduler,
+    priority_scope,
+    set_scheduler,
+)
+from .singleflight import SingleFlight
 
-__all__ = ["handle_api_request"]
+__all__ = [
+    "AdaptiveConcurrency",
+    "ApiRequest",
+    "Cassette",
+    "CircuitBreaker",
+    "Deadline",
+    "FaultInjector",
+    "Hedger",
+    "KeyPool",
+    "NegativeCache",
+    "NoKeyAvailable",
+    "ProxyError",
+    "ProxyUnavailable",
+    "RateLimiter",
+    "RequestScheduler",
+    "ResponseCache",
+    "SingleFlight",
+    "circuit_stats",
+    "coalescer",
+    "current_deadline",
+    "current_priority",
+    "deadline_scope",
+    "deadlined",
+    "get_cassette",
+    "get_circuit_breaker",
+    "get_concurrency_limiter",
+    "get_hedger",
+    "get_negative_cache",
+    "get_proxy",
+    "get_rate_limiter",
+    "get_response_cache",
+    "get_scheduler",
+    "get_transport",
+    "handle_api_request",
+    "handle_api_request_async",
+    "in_caller_context",
+    "known_empty",
+    "mark_empty",
+    "priority_scope",
+    "proxied",
+    "replay_transport",
+    "set_adaptive_concurrency",
+    "set_cassette",
+    "set_circuit_breaker",
+    "set_hedger",
+    "set_negative_cache",
+    "set_proxy",
+    "set_rate_limit",
+    "set_response_cache",
+    "set_scheduler",
+    "set_transport",
+    "spare_token",
+]
@@ -0,0 +1,218 @@
+"""Per-endpoint circuit breakers: fail fast while an endpoint is down."""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+from ..config import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    COINGECKO_ENDPOINTS,
+    DEFILLAMA_ENDPOINTS,
+    TWELVEDATA_ENDPOINTS,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Endpoint URL templates ('%s' = id or timestamp) -> endpoint name, e.g. 'price_chart'
+_ENDPOINTS: Tuple[Tuple[Pattern[str], str], ...] = tuple(
+    (re.compile(re.escape(template).replace("%s", "[^/]+") + "$"), name)
+    for endpoints in (COINGECKO_ENDPOINTS, DEFILLAMA_ENDPOINTS, TWELVEDATA_ENDPOINTS)
+    for name, template in endpoints.items()
+)
+
+
+def endpoint_name(url: str) -> str:
+    """The configured endpoint a URL belongs to ('price_chart'), else the URL's path."""
+    base = url.split("?", 1)[0]
+    for pattern, name in _ENDPOINTS:
+        if pattern.match(base):
+            return name
+    return urlparse(url).path or "/"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one provider endpoint.
+
+    Closed, requests pass and ``failure_threshold`` consecutive failures
+    (5xx, timeout, connection error) open it. Open, requests fail locally
+    without being sent. After ``cooldown`` seconds it turns half-open and lets
+    ``half_open_max`` probe requests through: a probe that gets an answer
+    closes it, a failed one opens it for another cooldown. Each transition is
+    logged once.
+
+    Args:
+        name: Label used in log messages (e.g. 'defillama price_chart')
+        failure_threshold: Consecutive failures that open the circuit
+        cooldown: Seconds the circuit stays open before probing
+        half_open_max: Probe requests allowed at once while half-open
+
+    Example:
+        >>> set_circuit_breaker('defillama', failure_threshold=3, cooldown=60)
+        >>> circuit_stats()['defillama']['price_chart']['state']
+        'closed'
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        half_open_max: int = 1,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError(f"failure_threshold must be positive, got {failure_threshold}")
+        if cooldown < 0:
+            raise ValueError(f"cooldown must be non-negative, got {cooldown}")
+        if half_open_max < 1:
+            raise ValueError(f"half_open_max must be positive, got {half_open_max}")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_max = half_open_max
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open' (an expired open circuit reads as half-open)."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str, reason: str) -> None:
+        level = logging.INFO if state == CLOSED else logging.WARNING
+        logger.log(level, "circuit %s: %s -> %s (%s)", self.name, self._state, state, reason)
+        self._state = state
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now.
+
+        A True answer while half-open reserves a probe; the caller must report
+        its outcome with record().
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self._rejected += 1
+                    return False
+                self._transition(HALF_OPEN, f"{self.cooldown:g}s cooldown over, probing")
+                self._probes = 0
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max:
+                    self._rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, ok: Optional[bool]) -> None:
+        """
+        Report an allowed request's outcome: True answered, False failed.
+
+        None (e.g. cut short by the caller's deadline) frees a probe without a verdict.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                if ok:
+                    self._failures = 0
+                    self._transition(CLOSED, "probe answered")
+                elif ok is False:
+                    self._open("probe failed")
+                return
+            if ok:
+                self._failures = 0
+            elif ok is False and self._state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._open(f"{self._failures} consecutive failures")
+
+    def _open(self, reason: str) -> None:
+        self._transition(OPEN, f"{reason}; failing fast for {self.cooldown:g}s")
+        self._opened_at = time.monotonic()
+        self._opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """State, consecutive failures, times opened, requests failed fast, seconds until a probe."""
+        with self._lock:
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(self.cooldown - (time.monotonic() - self._opened_at), 0.0)
+            return {
+                "state": HALF_OPEN if self._state == OPEN and retry_in == 0 else self._state,
+                "failures": self._failures,
+                "opened": self._opened,
+                "rejected": self._rejected,
+                "retry_in": retry_in,
+            }
+
+
+# Provider -> breaker settings, and (provider, endpoint) -> breaker
+_settings: Dict[str, Dict[str, Any]] = {}
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def set_circuit_breaker(
+    api_name: str,
+    failure_threshold: Optional[int] = BREAKER_FAILURE_THRESHOLD,
+    cooldown: float = BREAKER_COOLDOWN,
+    half_open_max: int = 1,
+) -> None:
+    """
+    Give every endpoint of api_name its own breaker, or remove them with failure_threshold=None.
+
+    Breakers are created per endpoint on first use, with these settings.
+    """
+    if failure_threshold is not None:
+        # Validate now rather than on the first request
+        CircuitBreaker(api_name, failure_threshold, cooldown, half_open_max)
+    with _breakers_lock:
+        for key in [key for key in _breakers if key[0] == api_name]:
+            del _breakers[key]
+        if failure_threshold is None:
+            _settings.pop(api_name, None)
+            return
+        _settings[api_name] = {
+            "failure_threshold": failure_threshold,
+            "cooldown": cooldown,
+            "half_open_max": half_open_max,
+        }
+
+
+def get_circuit_breaker(api_name: str, url: str) -> Optional[CircuitBreaker]:
+    """Return the breaker for the endpoint url belongs to, if api_name has breakers."""
+    settings = _settings.get(api_name)
+    if settings is None:
+        return None
+    key = (api_name, endpoint_name(url))
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(" ".join(key), **settings)
+        return breaker
+
+
+def circuit_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Provider -> endpoint -> breaker stats, for endpoints used so far."""
+    with _breakers_lock:
+        breakers = list(_breakers.items())
+    stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (api_name, endpoint), breaker in breakers:
+        stats.setdefault(api_name, {})[endpoint] = breaker.stats()
+    return stats
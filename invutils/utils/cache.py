@@ -0,0 +1,156 @@
+"""Cross-process HTTP response cache backed by SQLite."""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Hashable, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from ..config import CACHE_DEFAULT_TTL, CACHE_STALE_TTL, CACHE_TTLS
+
+# How long a worker holds the right to refresh a stale entry
+_REFRESH_LEASE = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    refresh_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+class CacheEntry(NamedTuple):
+    """A cached raw response body with its validators."""
+
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Raw-response cache shared by every process that opens the same file.
+
+    Entries are fresh for the TTL of their endpoint, then servable as stale for
+    ``stale_ttl`` more seconds while a single worker refreshes them in the
+    background (stale-while-revalidate). The database runs in WAL mode so
+    readers in other processes are never blocked by a writer.
+
+    Args:
+        path: SQLite database file (shared across processes)
+        ttls: Per-endpoint TTLs in seconds, keyed by URL path fragment
+            (e.g. {'/simple/price': 30}). The longest matching fragment wins.
+            A TTL of 0 disables caching for that endpoint.
+        default_ttl: TTL for URLs that match no fragment
+        stale_ttl: Seconds past expiry during which a stale body may be served
+
+    Example:
+        >>> from invutils.utils import ResponseCache, set_response_cache
+        >>> set_response_cache(ResponseCache('/tmp/invutils-cache.sqlite'))
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = CACHE_DEFAULT_TTL,
+        stale_ttl: float = CACHE_STALE_TTL,
+    ) -> None:
+        self.path = path
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, url: str) -> float:
+        """Return the TTL configured for the endpoint a URL belongs to."""
+        path = urlparse(url).path
+        matches = [fragment for fragment in self.ttls if fragment in path]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the stored entry for key regardless of age, or None."""
+        row = self._connect().execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+            (_serialize(key),),
+        ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def set(
+        self,
+        key: Hashable,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store a response body, replacing any previous entry and releasing its refresh lease."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (_serialize(key), body, etag, last_modified, time.time()),
+        )
+
+    def touch(self, key: Hashable) -> None:
+        """Mark an entry as freshly validated (after a 304 Not Modified)."""
+        self._connect().execute(
+            "UPDATE responses SET stored_at = ?, refresh_until = 0 WHERE key = ?",
+            (time.time(), _serialize(key)),
+        )
+
+    def claim_refresh(self, key: Hashable, lease: float = _REFRESH_LEASE) -> bool:
+        """
+        Atomically claim the right to refresh a stale entry.
+
+        Returns True for exactly one caller across all processes until the
+        entry is rewritten or the lease expires.
+        """
+        now = time.time()
+        cur = self._connect().execute(
+            "UPDATE responses SET refresh_until = ? WHERE key = ? AND refresh_until < ?",
+            (now + lease, _serialize(key), now),
+        )
+        return cur.rowcount == 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove one entry."""
+        self._connect().execute("DELETE FROM responses WHERE key = ?", (_serialize(key),))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._connect().execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        return int(self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+
+def _serialize(key: Hashable) -> str:
+    return json.dumps(key, separators=(",", ":"), default=str)
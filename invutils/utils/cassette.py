@@ -0,0 +1,104 @@
+"""Archive of raw provider responses, for recording and offline replay."""
+
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .cache import _serialize
+
+_MODES = ("record", "replay")
+
+
+class Cassette:
+    """
+    Raw provider responses keyed by request, kept in a gzip-compressed JSON Lines file.
+
+    Keys are the same (provider, url, params) identity used for coalescing
+    and the response cache, so credentials are never stored. In 'record'
+    mode every response received through handle_api_request is added (the
+    latest one per key wins); in 'replay' mode requests are answered from the
+    archive without touching the network. Install with set_cassette, or use
+    ``invutils.replay.record`` / ``invutils.replay.replay``.
+
+    Args:
+        path: Archive file (e.g. 'run.jsonl.gz'); loaded when it exists
+        mode: 'record' or 'replay'
+        strict: In replay mode, fail requests missing from the archive instead of sending them
+
+    Example:
+        >>> cassette = Cassette('run.jsonl.gz', mode='record')
+        >>> set_cassette(cassette)
+        >>> llama_price_chart('coingecko:bitcoin', 1609459200, 365)
+        >>> cassette.save()
+    """
+
+    def __init__(self, path: str, mode: str = "replay", strict: bool = True) -> None:
+        if mode not in _MODES:
+            raise ValueError(f"mode must be one of {list(_MODES)}, got '{mode}'")
+        if mode == "replay" and not Path(path).exists():
+            raise FileNotFoundError(f"no cassette at {path}")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self._lock = threading.Lock()
+        # Serialized key -> (key, status, body)
+        self._entries: Dict[str, Tuple[Any, int, str]] = {}
+        self._recorded = 0
+        self._hits = 0
+        self._misses = 0
+        if Path(path).exists():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    row = json.loads(line)
+                    self._entries[_serialize(row["key"])] = (
+                        row["key"], row["status"], row["body"]
+                    )
+
+    def record(self, key: Hashable, status: int, body: str) -> None:
+        """Store the response for key (replacing an earlier one)."""
+        with self._lock:
+            self._entries[_serialize(key)] = (key, status, body)
+            self._recorded += 1
+
+    def lookup(self, key: Hashable) -> Optional[Tuple[int, str]]:
+        """(status, body) recorded for key, or None."""
+        with self._lock:
+            entry = self._entries.get(_serialize(key))
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry[1], entry[2]
+
+    def entries(self) -> Iterator[Tuple[Any, int, str]]:
+        """Every (key, status, body) in the archive."""
+        with self._lock:
+            entries: List[Tuple[Any, int, str]] = list(self._entries.values())
+        return iter(entries)
+
+    def save(self) -> None:
+        """Write the archive (atomically, so a crash never leaves a truncated file)."""
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=9) as f:
+            for key, status, body in self.entries():
+                f.write(
+                    json.dumps({"key": key, "status": status, "body": body}, separators=(",", ":"))
+                    + "\n"
+                )
+        Path(tmp).replace(self.path)
+
+    def stats(self) -> Dict[str, int]:
+        """Entries held, responses recorded this session, replay hits and misses."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "recorded": self._recorded,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,147 @@
+"""Per-provider adaptive concurrency: additive increase, multiplicative decrease."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AdaptiveConcurrency:
+    """
+    Limit on requests in flight to one provider that follows its real capacity.
+
+    Each healthy response raises the limit by ``1 / limit`` (about +1 per
+    round of ``limit`` requests). A 429, a 5xx, a timeout or connection error,
+    or a latency above ``latency_factor`` times the smoothed baseline cuts it
+    to ``limit * backoff``. Cuts are at most one per ``cooldown`` seconds,
+    because the requests already in flight answer from the same overload.
+
+    Args:
+        initial: Starting limit
+        min_limit: Lowest the limit may fall to
+        max_limit: Highest the limit may rise to
+        backoff: Factor applied to the limit on overload
+        latency_factor: Latency (relative to baseline) counted as a spike
+        smoothing: Weight of each new latency in the baseline average
+        cooldown: Minimum seconds between two cuts
+
+    Example:
+        >>> set_adaptive_concurrency('coingecko', AdaptiveConcurrency(initial=2, max_limit=16))
+        >>> get_concurrency_limiter('coingecko').stats()['limit']
+        2
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        latency_factor: float = 2.0,
+        smoothing: float = 0.1,
+        cooldown: float = 1.0,
+    ) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(
+                f"limits must satisfy 1 <= min_limit <= initial <= max_limit, "
+                f"got {min_limit}, {initial}, {max_limit}"
+            )
+        if not 0 < backoff < 1:
+            raise ValueError(f"backoff must be between 0 and 1, got {backoff}")
+        if latency_factor <= 1:
+            raise ValueError(f"latency_factor must be greater than 1, got {latency_factor}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self._cond = threading.Condition()
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._last_cut = float("-inf")
+        self._increases = 0
+        self._decreases = 0
+        self._overloads = 0
+        self._waited = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        with self._cond:
+            return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a slot is free; return False if timeout elapses first."""
+        start = time.monotonic()
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._in_flight += 1
+            self._waited += time.monotonic() - start
+            return True
+
+    def release(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """
+        Free a slot and adjust the limit from the response's latency and outcome.
+
+        With latency None the slot is freed without feedback (nothing was learned).
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if latency is None:
+                self._cond.notify_all()
+                return
+            spike = self._baseline is not None and latency > self._baseline * self.latency_factor
+            if not overloaded:
+                # Every answered request moves the baseline, so a lasting shift is absorbed
+                if self._baseline is None:
+                    self._baseline = latency
+                else:
+                    self._baseline += self.smoothing * (latency - self._baseline)
+            if overloaded:
+                self._overloads += 1
+            if overloaded or spike:
+                now = time.monotonic()
+                if now - self._last_cut >= self.cooldown:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_cut = now
+                    self._decreases += 1
+            elif self._limit < self.max_limit:
+                before = int(self._limit)
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+                if int(self._limit) > before:
+                    self._increases += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Current limit, requests in flight, limit raises and cuts, overloads, seconds waited."""
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "overloads": self._overloads,
+                "waited": self._waited,
+                "baseline_latency": self._baseline or 0.0,
+            }
+
+
+_controllers: Dict[str, AdaptiveConcurrency] = {}
+
+
+def set_adaptive_concurrency(api_name: str, controller: Optional[AdaptiveConcurrency]) -> None:
+    """Gate requests to api_name through controller, or remove the gate with None."""
+    if controller is None:
+        _controllers.pop(api_name, None)
+    else:
+        _controllers[api_name] = controller
+
+
+def get_concurrency_limiter(api_name: str) -> Optional[AdaptiveConcurrency]:
+    """Return the controller configured for api_name, if any."""
+    return _controllers.get(api_name)
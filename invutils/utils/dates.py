@@ -0,0 +1,74 @@
+"""Date formatting and parsing shared by the provider wrappers, series, backfills and FX."""
+
+import logging
+import sys
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, Optional
+
+if sys.version_info >= (3, 9):
+    from zoneinfo import ZoneInfo
+else:
+    from backports.zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+
+def format_utc(ts: int) -> str:
+    """'YYYY-MM-DD HH:MM:SS' for a UNIX timestamp, in UTC (as sent with timezone='UTC')."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def zone(name: Optional[str]) -> tzinfo:
+    """tzinfo for an IANA name (e.g. a response's exchange timezone), falling back to UTC."""
+    if not name or name.upper() == "UTC":
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (KeyError, ValueError):
+        # Not an IANA name (ZoneInfoNotFoundError is a KeyError)
+        logger.warning("unknown timezone '%s', reading datetimes as UTC", name)
+        return timezone.utc
+
+
+class EpochParser:
+    """
+    Convert Twelve Data datetime strings in one timezone to UNIX seconds.
+
+    Values are fixed-layout ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'), so each
+    distinct date is parsed once and the time of day is read by slicing; the
+    UTC offset is cached per local hour so DST changes are honoured.
+    Date-only values (daily and longer bars) map to UTC midnight, like the
+    daily points of the other providers.
+
+    Args:
+        tz_name: Timezone of the datetimes ('UTC' or an IANA name; None = UTC)
+    """
+
+    def __init__(self, tz_name: Optional[str] = None) -> None:
+        self._tz = zone(tz_name)
+        self._days: Dict[str, int] = {}
+        self._offsets: Dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        day = self._days.get(value[:10])
+        if day is None:
+            day = int(
+                datetime.strptime(value[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+            )
+            self._days[value[:10]] = day
+        if len(value) == 10:
+            return day
+        if len(value) != 19:
+            # Not the usual layout; take the slow path
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=self._tz)
+            return int(parsed.timestamp())
+
+        hour = value[:13]
+        offset = self._offsets.get(hour)
+        if offset is None:
+            local = datetime.strptime(hour, "%Y-%m-%d %H").replace(tzinfo=self._tz)
+            offset = int(local.utcoffset().total_seconds())  # type: ignore[union-attr]
+            self._offsets[hour] = offset
+        return day + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19]) - offset
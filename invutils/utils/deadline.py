@@ -0,0 +1,105 @@
+"""Total time budgets that follow a call through pagination, fallbacks and threads."""
+
+import contextvars
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Dict[str, Any]])
+
+_current: "contextvars.ContextVar[Optional[Deadline]]" = contextvars.ContextVar(
+    "invutils_deadline", default=None
+)
+
+
+class Deadline:
+    """
+    A point in (monotonic) time after which no more requests should be sent.
+
+    Example:
+        >>> deadline = Deadline(5.0)
+        >>> deadline.timeout(10)   # per-request timeout shrinks to what is left
+        4.99...
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, cap: float) -> float:
+        """A request timeout of at most cap that does not outlive the deadline."""
+        return min(cap, self.remaining())
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the call in progress in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run the block under a total budget of seconds (None keeps any outer deadline).
+
+    Nested scopes never extend an outer deadline. Threads do not inherit the
+    scope; submit work with ``contextvars.copy_context().run`` to pass it on.
+    """
+    outer = _current.get()
+    if seconds is None:
+        yield outer
+        return
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def deadlined(func: F) -> F:
+    """
+    Validate func's ``deadline`` argument and run it under that budget.
+
+    Every request made by func (and by calls it makes) uses a timeout shrunk
+    to the time left, and none is sent once the deadline has passed.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        deadline = signature.bind(*args, **kwargs).arguments.get("deadline")
+        if deadline is not None:
+            if isinstance(deadline, bool) or not isinstance(deadline, (int, float)):
+                raise TypeError(f"deadline must be a number, got {type(deadline).__name__}")
+            if deadline <= 0:
+                raise ValueError(f"deadline must be positive, got {deadline}")
+        with deadline_scope(deadline):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def in_caller_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap func so pool threads run it in (a copy of) the caller's context.
+
+    Executor threads do not inherit context variables, so without this a
+    deadline would stop at ThreadPoolExecutor.map.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
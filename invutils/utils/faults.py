@@ -0,0 +1,178 @@
+"""Fault injection for resilience and throughput testing (see set_transport)."""
+
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from .cache import _serialize
+from .cassette import Cassette
+from .helpers import ApiRequest
+
+Transport = Callable[..., requests.Response]
+
+# Fault name -> the handle_api_request branch it exercises
+FAULTS = {
+    "timeout": "Timeout Error",
+    "reset": "Connection Error",
+    "throttle": "HTTP Error 429",
+    "server_error": "HTTP Error 5xx",
+    "truncated": "Response Error",
+    "invalid_json": "Response Error",
+}
+
+
+def _response(
+    url: str, status: int, body: bytes, headers: Optional[Dict[str, str]] = None
+) -> requests.Response:
+    """A requests.Response built locally, as if received from url."""
+    res = requests.Response()
+    res.url = url
+    res.status_code = status
+    res.reason = "Injected" if status >= 400 else "OK"
+    res.encoding = "utf-8"
+    res._content = body
+    res.headers.update(headers or {})
+    return res
+
+
+class FaultInjector:
+    """
+    Transport wrapper that makes a share of requests slow or failing.
+
+    Every request is delayed by ``latency`` plus up to ``jitter`` seconds,
+    then at most one fault is drawn from the configured rates:
+
+    - ``timeout``: hangs for the request timeout (or ``hang``), then raises Timeout
+    - ``reset``: raises ConnectionError (connection reset by peer)
+    - ``throttle``: answers 429 with ``Retry-After: retry_after``
+    - ``server_error``: answers ``error_status`` (default 503)
+    - ``truncated``: sends the request and cuts its body in half
+    - ``invalid_json``: sends the request and replaces its body with an HTML error page
+
+    Each maps to one ``except`` branch of handle_api_request (see FAULTS).
+    Install with ``set_transport``; wrap ``replay_transport(path)`` instead
+    of the network to run against recorded payloads in CI.
+
+    Args:
+        transport: Transport faults are injected into (default: requests.get)
+        rates: Fault name -> probability per request (sum at most 1)
+        latency: Seconds added to every request
+        jitter: Extra seconds added, uniformly drawn from [0, jitter]
+        hang: Seconds a timed-out request hangs (default: its timeout)
+        retry_after: Retry-After seconds sent with injected 429s
+        error_status: Status of injected server errors
+        seed: Seed for a reproducible fault sequence
+
+    Example:
+        >>> injector = FaultInjector(rates={'throttle': 0.05, 'timeout': 0.01}, latency=0.2)
+        >>> set_transport(injector)
+        >>> llama_price_chart('coingecko:bitcoin', 1609459200, 2000)
+        >>> injector.stats()['requests']
+        4
+    """
+
+    def __init__(
+        self,
+        transport: Optional[Transport] = None,
+        rates: Optional[Dict[str, float]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        hang: Optional[float] = None,
+        retry_after: float = 1.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        rates = dict(rates or {})
+        unknown = sorted(set(rates) - set(FAULTS))
+        if unknown:
+            raise ValueError(f"rates must be among {list(FAULTS)}, got {unknown}")
+        if any(rate < 0 for rate in rates.values()) or sum(rates.values()) > 1:
+            raise ValueError(f"rates must be non-negative and sum to at most 1, got {rates}")
+        if latency < 0 or jitter < 0:
+            raise ValueError(f"latency and jitter must be non-negative, got {latency}, {jitter}")
+        if not 500 <= error_status <= 599:
+            raise ValueError(f"error_status must be a 5xx status, got {error_status}")
+        self.transport = transport
+        self.rates = rates
+        self.latency = latency
+        self.jitter = jitter
+        self.hang = hang
+        self.retry_after = retry_after
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, **dict.fromkeys(FAULTS, 0)}
+
+    def _draw(self) -> Tuple[Optional[str], float]:
+        """(fault or None, delay) for the next request."""
+        with self._lock:
+            self._counts["requests"] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            roll = self._random.random()
+            for name, rate in self.rates.items():
+                if roll < rate:
+                    self._counts[name] += 1
+                    return name, delay
+                roll -= rate
+            return None, delay
+
+    def __call__(self, url: str, **kwargs: Any) -> requests.Response:
+        fault, delay = self._draw()
+        if delay:
+            time.sleep(delay)
+        if fault == "timeout":
+            hang = self.hang if self.hang is not None else kwargs.get("timeout") or 0
+            time.sleep(hang)
+            raise requests.exceptions.ReadTimeout(f"injected timeout after {hang}s")
+        if fault == "reset":
+            raise requests.exceptions.ConnectionError(
+                ConnectionResetError(104, "Connection reset by peer (injected)")
+            )
+        if fault == "throttle":
+            return _response(
+                url,
+                429,
+                b'{"status":429,"error":"Too Many Requests"}',
+                {"Retry-After": f"{self.retry_after:g}"},
+            )
+        if fault == "server_error":
+            return _response(url, self.error_status, b"<html>Service Unavailable</html>")
+
+        res = (self.transport or requests.get)(url, **kwargs)
+        if fault == "truncated":
+            res._content = res.content[: len(res.content) // 2]
+        elif fault == "invalid_json":
+            res._content = b"<html><body>502 Bad Gateway</body></html>"
+        return res
+
+    def stats(self) -> Dict[str, int]:
+        """Requests seen and how many got each fault."""
+        with self._lock:
+            return dict(self._counts)
+
+
+def replay_transport(path: str) -> Transport:
+    """
+    A transport answering from a recorded archive (see invutils.replay).
+
+    It stands in for the network when FaultInjector runs in CI: recorded
+    statuses and bodies are served as-is and requests that were not recorded
+    get a 404.
+    """
+    responses: Dict[str, Tuple[int, str]] = {}
+    for key, status, body in Cassette(path, mode="replay").entries():
+        # Archive keys are (provider, url, params); the transport sees only url and params
+        responses[_serialize((key[1], key[2]))] = (status, body)
+
+    def transport(
+        url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any
+    ) -> requests.Response:
+        key = _serialize(ApiRequest(url, params).key())
+        status, body = responses.get(key, (404, json.dumps({"error": "not recorded"})))
+        return _response(url, status, body.encode("utf-8"))
+
+    return transport
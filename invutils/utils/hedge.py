@@ -0,0 +1,178 @@
+"""Hedged calls: send a backup when the primary is slower than usual."""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Hedger:
+    """
+    Run a call and, if it has not answered within the rolling ``percentile``
+    latency, start a backup call and take the first good answer.
+
+    The losing call is abandoned — its result is discarded; a blocking HTTP
+    request cannot be interrupted, so it runs on until its own timeout.
+    Hedges are paid for from a budget that earns ``budget`` hedges per call
+    (up to ``burst`` saved), so hedging adds at most that fraction of traffic.
+
+    Args:
+        percentile: Latency percentile used as the hedge delay (default p95)
+        budget: Hedges allowed per call on average
+        burst: Hedges that may be saved up
+        initial_delay: Delay used until ``min_samples`` latencies are known
+        min_delay: Lower bound on the delay
+        max_delay: Upper bound on the delay
+        window: Latencies kept for the percentile
+        min_samples: Latencies needed before the percentile is trusted
+
+    Example:
+        >>> hedger = Hedger(percentile=0.95, budget=0.05)
+        >>> hedger.run(lambda: fetch('primary'), lambda: fetch('backup'))
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget: float = 0.1,
+        burst: float = 10.0,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.01,
+        max_delay: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError(f"percentile must be between 0 and 1, got {percentile}")
+        if budget < 0:
+            raise ValueError(f"budget must be non-negative, got {budget}")
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._tokens = burst
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._skipped = 0
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        value = samples[min(len(samples) - 1, int(len(samples) * self.percentile))]
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def _record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def run(
+        self,
+        primary: Callable[[], Any],
+        backup: Callable[[], Any],
+        ok: Callable[[Any], bool] = lambda result: result is not None,
+        can_hedge: Optional[Callable[[], bool]] = None,
+    ) -> Any:
+        """
+        Return the first good result of primary, or of backup if it was started.
+
+        ``can_hedge`` is consulted before starting the backup (e.g. to check a
+        rate limiter has a token to spare); the budget is only spent if it allows.
+        """
+        with self._lock:
+            self._calls += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+
+        results: queue.Queue[Tuple[str, Any]] = queue.Queue()
+
+        def launch(tag: str, fn: Callable[[], Any]) -> None:
+            def target() -> None:
+                started = time.monotonic()
+                try:
+                    result = fn()
+                except Exception as e:
+                    logger.error("hedged %s call raised: %s", tag, e)
+                    result = None
+                if tag == "primary":
+                    self._record(time.monotonic() - started)
+                results.put((tag, result))
+
+            # Copy the caller's context so a deadline applies to both calls
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(target,), daemon=True).start()
+
+        launch("primary", primary)
+        try:
+            return results.get(timeout=self.delay())[1]
+        except queue.Empty:
+            pass
+
+        if (can_hedge is not None and not can_hedge()) or not self._take_token():
+            with self._lock:
+                self._skipped += 1
+            return results.get()[1]
+
+        with self._lock:
+            self._hedged += 1
+        launch("hedge", backup)
+        tag, result = results.get()
+        if not ok(result):
+            # First answer was bad; the other one may still be good
+            tag, result = results.get()
+        if tag == "hedge" and ok(result):
+            with self._lock:
+                self._hedge_wins += 1
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Calls, hedges sent, hedges that won, hedges skipped for budget, and current delay."""
+        with self._lock:
+            counts = {
+                "calls": self._calls,
+                "hedged": self._hedged,
+                "hedge_wins": self._hedge_wins,
+                "skipped": self._skipped,
+            }
+        return {**counts, "delay": self.delay()}
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def set_hedger(api_name: str, hedger: Optional[Hedger]) -> None:
+    """Use hedger for api_name's hedged requests (None restores the default)."""
+    with _hedgers_lock:
+        if hedger is None:
+            _hedgers.pop(api_name, None)
+        else:
+            _hedgers[api_name] = hedger
+
+
+def get_hedger(api_name: str) -> Hedger:
+    """The hedger for api_name, created with default settings on first use."""
+    with _hedgers_lock:
+        hedger = _hedgers.get(api_name)
+        if hedger is None:
+            hedger = _hedgers[api_name] = Hedger()
+        return hedger
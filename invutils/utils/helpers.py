@@ -1,13 +1,234 @@
 """Helper utilities for invutils package."""
 
+import asyncio
+import contextvars
+import json
 import logging
-from typing import Any, Callable, Dict, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 
 import requests
 
+from ..config import DEFAULT_TIMEOUT
+from .breaker import get_circuit_breaker
+from .cache import CacheEntry, ResponseCache
+from .cassette import Cassette
+from .concurrency import AdaptiveConcurrency, get_concurrency_limiter
+from .deadline import Deadline, current_deadline
+from .hedge import get_hedger
+from .keypool import KeyPool, NoKeyAvailable
+from .ratelimit import RateLimiter, get_rate_limiter
+from .scheduler import current_priority, get_scheduler
+from .singleflight import SingleFlight
+
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Query parameters that carry credentials — excluded from request keys
+_SECRET_PARAMS = frozenset({"apikey", "api_key", "x_cg_demo_api_key"})
+
+# Process-wide coalescing of identical in-flight requests
+coalescer = SingleFlight()
+
+# A dispatched request's parsed result and the HTTP status it came with
+_Answer = Tuple[Optional[Dict[str, Any]], Optional[int]]
+
+# Optional shared response cache (see set_response_cache)
+_response_cache: Optional[ResponseCache] = None
+
+# Optional cassette recording or replaying responses (see set_cassette)
+_cassette: Optional[Cassette] = None
+
+# Raised by Response.json() for a body that is not JSON
+_JSONDecodeError = getattr(requests.exceptions, "JSONDecodeError", json.JSONDecodeError)
+
+# Optional replacement for requests.get used by every ApiRequest (see set_transport)
+_transport: Optional[Callable[..., requests.Response]] = None
+
+
+class ApiRequest:
+    """
+    A GET request that knows its own identity.
+
+    Calling the instance performs the request, so it can be passed anywhere a
+    ``request_func`` is expected. Unlike a bare lambda, it exposes the URL and
+    params, which lets ``handle_api_request`` coalesce identical requests.
+
+    Args:
+        url: Fully formatted endpoint URL
+        params: Query parameters
+        headers: Request headers (e.g. API key headers)
+        timeout: Per-request timeout in seconds
+        hedge: Send a duplicate if this request is slower than usual (see Hedger)
+        keys: Pool to take the API key from on every send (see KeyPool)
+        key_param: Query parameter the pooled key is sent in
+        key_header: Header the pooled key is sent in (instead of key_param)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge: bool = False,
+        keys: Optional[KeyPool] = None,
+        key_param: str = "apikey",
+        key_header: Optional[str] = None,
+    ) -> None:
+        self.url = url
+        self.params = dict(params or {})
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.hedge = hedge
+        self.keys = keys
+        self.key_param = key_param
+        self.key_header = key_header
+        # HTTP status of the last response received for this request, if any
+        self.status_code: Optional[int] = None
+
+    def __call__(self) -> requests.Response:
+        deadline = current_deadline()
+        if self.keys is None:
+            return self._get(self.params, self.headers, deadline)
+        key = self.keys.acquire(timeout=deadline.remaining() if deadline is not None else None)
+        while True:
+            if key is None:
+                raise NoKeyAvailable(f"no usable key in {self.keys!r}")
+            if self.key_header is not None:
+                res = self._get(self.params, {**self.headers, self.key_header: key}, deadline)
+            else:
+                res = self._get({**self.params, self.key_param: key}, self.headers, deadline)
+            status = _key_status(res)
+            self.keys.report(key, status, _retry_after(res))
+            if status not in (401, 403, 429):
+                return res
+            # That key is benched now; resend with another if one is ready
+            key = self.keys.acquire(timeout=0)
+            if key is None:
+                return res
+
+    def _get(
+        self, params: Dict[str, Any], headers: Dict[str, str], deadline: Optional[Deadline]
+    ) -> requests.Response:
+        transport = _transport or requests.get
+        return transport(
+            self.url,
+            params=params or None,
+            headers=headers or None,
+            timeout=deadline.timeout(self.timeout) if deadline is not None else self.timeout,
+        )
+
+    def with_headers(self, headers: Dict[str, str]) -> "ApiRequest":
+        """Return a copy of this request with extra headers merged in."""
+        return ApiRequest(
+            self.url,
+            self.params,
+            {**self.headers, **headers},
+            self.timeout,
+            self.hedge,
+            self.keys,
+            self.key_param,
+            self.key_header,
+        )
+
+    def key(self) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        """Normalized (url, params) identity, ignoring credentials and param order."""
+        params = tuple(
+            sorted((k, str(v)) for k, v in self.params.items() if k not in _SECRET_PARAMS)
+        )
+        return (self.url, params)
+
+    def __repr__(self) -> str:
+        return f"ApiRequest({self.url!r}, params={dict(self.key()[1])!r})"
+
+
+def _retry_after(res: requests.Response) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, if the response has one."""
+    try:
+        return float(res.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _key_status(res: requests.Response) -> int:
+    """
+    The status a pooled key earned: the HTTP status, or the error code of a 200 body.
+
+    Twelve Data reports an exhausted quota (429) or a bad key (401/403) in the
+    body of an HTTP 200, so the body code must bench the key as well.
+    """
+    if res.status_code != 200:
+        return res.status_code
+    try:
+        body = res.json()
+    except ValueError:
+        return res.status_code
+    code = body.get("code") if isinstance(body, dict) else None
+    return code if code in (401, 403, 429) else res.status_code
+
+
+def _error_body(result: Any) -> bool:
+    """
+    True for a parsed 200 body that reports an error.
+
+    Twelve Data answers failures with HTTP 200 and {"code": 4xx, "status": "error"}.
+    """
+    if not isinstance(result, dict):
+        return False
+    code = result.get("code")
+    return result.get("status") == "error" or (isinstance(code, int) and code >= 400)
+
+
+def request_key(api_name: str, request_func: Callable[[], requests.Response]) -> Optional[Hashable]:
+    """Return the (provider, url, params) key for an ApiRequest, or None for opaque callables."""
+    if isinstance(request_func, ApiRequest):
+        return (api_name,) + request_func.key()
+    return None
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Install (or remove, with None) the response cache used by handle_api_request.
+
+    Every process that installs a ResponseCache on the same file shares its entries.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the installed response cache, if any."""
+    return _response_cache
+
+
+def set_transport(transport: Optional[Callable[..., requests.Response]]) -> None:
+    """
+    Send every ApiRequest through transport instead of requests.get (None restores it).
+
+    transport is called like ``requests.get(url, params=..., headers=..., timeout=...)``
+    and returns a requests.Response (or raises a requests exception), e.g. a FaultInjector.
+    """
+    global _transport
+    _transport = transport
+
+
+def get_transport() -> Optional[Callable[..., requests.Response]]:
+    """Return the installed transport, if any."""
+    return _transport
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """Install (or remove, with None) a cassette that records or replays ApiRequest responses."""
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the installed cassette, if any."""
+    return _cassette
+
 
 def handle_api_request(
     api_name: str,
@@ -20,6 +241,22 @@ def handle_api_request(
     This function wraps API requests to provide unified error handling across
     all API calls. It catches common request exceptions and logs them appropriately.
 
+    When request_func is an ApiRequest, concurrent calls for the same
+    (provider, url, params) are coalesced into one upstream request and share
+    its result; a waiting caller gives up when its own deadline passes.
+    Coalescing counters are available via ``coalescer.stats()``.
+    If a response cache is installed (set_response_cache), ApiRequests are
+    served from it according to its per-endpoint TTLs. ApiRequests created
+    with hedge=True are duplicated (outside coalescing) when the first send is
+    slower than the provider's rolling p95 — see ``get_hedger(api_name)``.
+    Under a deadline (see deadline_scope), nothing is sent once it has passed
+    and the request timeout and rate-limit wait shrink to the time left.
+    With circuit breakers installed (set_circuit_breaker), a request to an
+    endpoint whose circuit is open returns None at once without being sent;
+    cached responses are still served. A recording cassette (set_cassette)
+    stores every raw response received; a replaying one answers ApiRequests
+    from its archive, skipping coalescing, caches, quotas and the network.
+
     Args:
         api_name: Name of the API for logging (e.g., 'CoinGecko', 'DefiLlama')
         request_func: Function that makes the API request and returns Response object
@@ -31,38 +268,351 @@ def handle_api_request(
     Example:
         >>> result = handle_api_request(
         ...     'CoinGecko',
-        ...     lambda: requests.get(url, params=params, timeout=10),
+        ...     ApiRequest(url, params=params, timeout=10),
         ...     10
         ... )
     """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired():
+        logger.warning(f"{api_name} Deadline Error: deadline passed, request not sent")
+        return None
+    key = request_key(api_name, request_func)
+    if key is None or not isinstance(request_func, ApiRequest):
+        return _execute_request(api_name, request_func, timeout)
+    # Only ApiRequests have a key; the keyed paths below read their url and headers
+    request = request_func
+    cassette = _cassette
+    if cassette is not None and cassette.mode == "replay":
+        answered, replayed = _replay(cassette, api_name, request, key)
+        if answered:
+            return replayed
+
+    def dispatch() -> _Answer:
+        # The HTTP status travels with the result so coalesced callers see it too
+        return _dispatch(api_name, request, timeout, key), request.status_code
+
+    def join() -> Optional[_Answer]:
+        # A follower waits on the leader no longer than its own deadline allows
+        try:
+            answer: _Answer = coalescer.do(
+                key, dispatch, timeout=deadline.remaining() if deadline is not None else None
+            )
+        except TimeoutError:
+            logger.error(f"{api_name} Deadline Error: no response before the deadline")
+            return None
+        return answer
+
+    answer: Optional[_Answer]
+    if request.hedge:
+        answer = get_hedger(api_name).run(
+            join,
+            dispatch,
+            ok=lambda answer: answer is not None and answer[0] is not None,
+            can_hedge=lambda: spare_token(api_name),
+        )
+    else:
+        answer = join()
+    if answer is None:
+        return None
+    result, request.status_code = answer
+    return result
+
+
+def _replay(
+    cassette: Cassette, api_name: str, request: ApiRequest, key: Hashable
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """(True, result) when the cassette answers the request; (False, None) to send it."""
+    entry = cassette.lookup(key)
+    if entry is None:
+        if not cassette.strict:
+            return False, None
+        logger.error(f"{api_name} Replay Error: {request!r} not in cassette {cassette.path}")
+        return True, None
+    status, body = entry
+    request.status_code = status
+    if status != 200:
+        # A recorded failure fails again
+        logger.error(f"{api_name} HTTP Error {status}: replayed from {cassette.path}")
+        return True, None
+    try:
+        return True, json.loads(body)
+    except ValueError as e:
+        logger.error(f"{api_name} Response Error: Invalid or unexpected response format - {e}")
+        return True, None
+
+
+def _record(api_name: str, request: ApiRequest, res: requests.Response) -> None:
+    """Add a received response to the recording cassette, if one is installed."""
+    cassette = _cassette
+    if cassette is not None and cassette.mode == "record" and res.status_code != 304:
+        cassette.record(request_key(api_name, request), res.status_code, res.text)
+
+
+def spare_token(api_name: str) -> bool:
+    """True if a hedge would not have to wait on api_name's rate limiter."""
+    limiter = get_rate_limiter(api_name)
+    return limiter is None or limiter.stats()["available"] >= 1
+
+
+async def handle_api_request_async(
+    api_name: str, request_func: Callable[[], requests.Response], timeout: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Asyncio counterpart of handle_api_request.
+
+    The blocking request runs in the loop's default executor. Identical
+    ApiRequests awaited concurrently on the same loop share one call. Under a
+    deadline the await gives up (returning None) when it passes; the blocking
+    request itself cannot be interrupted and finishes in the background.
+    """
+    loop = asyncio.get_event_loop()
+    key = request_key(api_name, request_func)
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired():
+        logger.warning(f"{api_name} Deadline Error: deadline passed, request not sent")
+        return None
+    request = request_func if isinstance(request_func, ApiRequest) else None
+    cassette = _cassette
+    if (
+        key is not None
+        and request is not None
+        and cassette is not None
+        and cassette.mode == "replay"
+    ):
+        answered, result = _replay(cassette, api_name, request, key)
+        if answered:
+            return result
+
+    def dispatch() -> _Answer:
+        if key is None or request is None:
+            return _execute_request(api_name, request_func, timeout), None
+        # The HTTP status travels with the result so coalesced callers see it too
+        return _dispatch(api_name, request, timeout, key), request.status_code
+
+    def run() -> "asyncio.Future[_Answer]":
+        # Executor threads do not inherit context; pass the deadline along
+        context = contextvars.copy_context()
+        return loop.run_in_executor(None, lambda: context.run(dispatch))
+
+    call = run() if key is None else coalescer.do_async(key, run)
+    try:
+        if deadline is None:
+            result, status = await call
+        else:
+            # shield() so giving up does not cancel a call other waiters share
+            result, status = await asyncio.wait_for(asyncio.shield(call), deadline.remaining())
+    except asyncio.TimeoutError:
+        logger.error(f"{api_name} Deadline Error: no response before the deadline")
+        return None
+    if request is not None:
+        request.status_code = status
+    return result
+
+
+def _dispatch(
+    api_name: str, request: ApiRequest, timeout: int, key: Hashable
+) -> Optional[Dict[str, Any]]:
+    """Route a keyed request through the response cache when one is installed."""
+    cache = _response_cache
+    if cache is None:
+        return _execute_request(api_name, request, timeout)
+    return _cached_request(cache, api_name, request, timeout, key)
+
+
+def _cached_request(
+    cache: ResponseCache, api_name: str, request: ApiRequest, timeout: int, key: Hashable
+) -> Optional[Dict[str, Any]]:
+    """Serve from cache when fresh or stale-but-servable, otherwise fetch and store."""
+    ttl = cache.ttl_for(request.url)
+    if ttl <= 0:
+        return _execute_request(api_name, request, timeout)
+
+    entry = cache.get(key)
+    if entry is not None:
+        age = time.time() - entry.stored_at
+        if age <= ttl + cache.stale_ttl:
+            if age > ttl and cache.claim_refresh(key):
+                threading.Thread(
+                    target=_revalidate,
+                    args=(cache, api_name, request, timeout, key, entry),
+                    daemon=True,
+                ).start()
+            cached: Dict[str, Any] = json.loads(entry.body)
+            return cached
+
+    return _revalidate(cache, api_name, request, timeout, key, entry)
+
+
+def _revalidate(
+    cache: ResponseCache,
+    api_name: str,
+    request: ApiRequest,
+    timeout: int,
+    key: Hashable,
+    entry: Optional[CacheEntry],
+) -> Optional[Dict[str, Any]]:
+    """Fetch with conditional headers; keep the entry on 304, replace it on 200."""
+    conditional = request.with_headers(entry.validators()) if entry is not None else request
+    sent: Dict[str, requests.Response] = {}
+
+    def send() -> Any:
+        res = conditional()
+        request.status_code = res.status_code
+        _record(api_name, request, res)
+        sent["response"] = res
+        if entry is not None and res.status_code == 304:
+            return _NotModified(entry.body)
+        return res
+
+    result = _execute_request(api_name, send, timeout, request.url)
+    res = sent.get("response")
+    if result is None or res is None:
+        return result
+    if res.status_code == 304:
+        cache.touch(key)
+    elif res.status_code == 200 and not _error_body(result):
+        cache.set(key, res.text, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+    return result
+
+
+class _NotModified:
+    """Stand-in response that replays a cached body after a 304."""
+
+    status_code = 200
+
+    def __init__(self, body: str) -> None:
+        self.text = body
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def _execute_request(
+    api_name: str,
+    request_func: Callable[[], requests.Response],
+    timeout: int,
+    url: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Perform one request and map every failure mode to None.
+
+    ``url`` names the endpoint for its circuit breaker when request_func is
+    not an ApiRequest. While that circuit is open nothing is sent.
+    """
+    if url is None and isinstance(request_func, ApiRequest):
+        url = request_func.url
+    breaker = get_circuit_breaker(api_name, url) if url is not None else None
+    if breaker is not None and not breaker.allow():
+        # Logged once when the circuit opened, not per request
+        logger.debug(f"{api_name} Circuit Open: {url} not sent")
+        return None
+    limiter = get_rate_limiter(api_name)
+    slots = get_concurrency_limiter(api_name)
+    deadline = current_deadline()
+    if (limiter is not None or slots is not None) and not _admit(
+        api_name, limiter, slots, deadline
+    ):
+        if breaker is not None:
+            breaker.record(None)
+        return None
+
+    started = time.monotonic()
+    result, outcome = _send(api_name, request_func, timeout)
+    # Cut short by our own deadline: says nothing about the provider
+    cut_short = deadline is not None and deadline.expired()
+    if slots is not None:
+        if cut_short:
+            slots.release(None)
+        else:
+            slots.release(time.monotonic() - started, outcome in ("overload", "down"))
+    if breaker is not None:
+        breaker.record(None if cut_short else outcome != "down")
+    return result
+
+
+def _admit(
+    api_name: str,
+    limiter: Optional[RateLimiter],
+    slots: Optional[AdaptiveConcurrency],
+    deadline: Optional[Deadline],
+) -> bool:
+    """
+    Wait (in priority order) for a concurrency slot and a rate-limit token.
+
+    Only the caller whose turn it is waits on the slot and token, so a new
+    interactive request is next in line rather than behind every queued bulk one.
+    """
+    scheduler = get_scheduler(api_name)
+    if not scheduler.wait_turn(
+        current_priority(), timeout=deadline.remaining() if deadline is not None else None
+    ):
+        logger.error(f"{api_name} Deadline Error: still queued at the deadline")
+        return False
+    remaining = deadline.remaining if deadline is not None else lambda: None
+    try:
+        # A slot is taken before a token, so no token is spent while waiting for a slot
+        if slots is not None and not slots.acquire(timeout=remaining()):
+            logger.error(f"{api_name} Deadline Error: no concurrency slot before the deadline")
+            return False
+        if limiter is not None and not limiter.acquire(timeout=remaining()):
+            logger.error(f"{api_name} Deadline Error: no rate-limit token before the deadline")
+            if slots is not None:
+                slots.release(None)
+            return False
+        return True
+    finally:
+        scheduler.end_turn()
+
+
+def _send(
+    api_name: str, request_func: Callable[[], requests.Response], timeout: int
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Return (parsed response or None, outcome).
+
+    The outcome is 'ok', 'overload' (429), 'down' (5xx, timeout or connection
+    error) or 'error' (any other failure, which says nothing about the provider's health).
+    """
     try:
         res = request_func()
+        if isinstance(request_func, ApiRequest):
+            request_func.status_code = res.status_code
+            _record(api_name, request_func, res)
         res.raise_for_status()
-        return res.json()
+        return res.json(), "ok"
 
     except requests.exceptions.HTTPError as e:
         # Server returned error status (400, 404, 500, etc.)
-        logger.error(f"{api_name} HTTP Error {e.response.status_code}: {e}")
-        return None
+        status = e.response.status_code
+        logger.error(f"{api_name} HTTP Error {status}: {e}")
+        if status == 429:
+            return None, "overload"
+        return None, "down" if status >= 500 else "error"
 
     except requests.exceptions.Timeout:
         # Request took longer than timeout seconds
         logger.error(f"{api_name} Timeout Error: Request took longer than {timeout}s")
-        return None
+        return None, "down"
 
     except requests.exceptions.ConnectionError as e:
         # Network problem (DNS failure, refused connection, etc.)
         logger.error(f"{api_name} Connection Error: Could not connect to API - {e}")
-        return None
+        return None, "down"
+
+    except _JSONDecodeError as e:
+        # Body is not JSON (requests >= 2.27 raises this as a RequestException)
+        logger.error(f"{api_name} Response Error: Invalid or unexpected response format - {e}")
+        return None, "error"
 
     except requests.exceptions.RequestException as e:
         # Catch-all for any other requests errors
         logger.error(f"{api_name} Request Error: {e}")
-        return None
+        return None, "error"
 
     except (ValueError, KeyError) as e:
         # JSON decode error or missing expected key
         logger.error(f"{api_name} Response Error: Invalid or unexpected response format - {e}")
-        return None
-
-
+        return None, "error"
@@ -0,0 +1,183 @@
+"""Pools of API keys for one provider, used in rotation."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+
+from .ratelimit import RateLimiter
+
+_DAY = 86400
+
+
+class NoKeyAvailable(requests.exceptions.RequestException):
+    """Every key in a pool is benched, out of quota, or out of rate-limit tokens."""
+
+
+class _PooledKey:
+    """One key's rate limiter, daily usage and bench state."""
+
+    def __init__(self, key: str, limiter: Optional[RateLimiter]) -> None:
+        self.key = key
+        self.limiter = limiter
+        self.day = 0
+        self.used_today = 0
+        self.requests = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.benched_until = 0.0
+        # Benched for a 401/403: a bad key is not waited for
+        self.revoked = False
+
+
+class KeyPool:
+    """
+    Spread requests to one provider across several API keys.
+
+    Each request takes the least-used key today that is not benched, is under
+    its daily quota and has a rate-limit token. A key answering 429 is benched
+    for ``bench`` seconds (or the response's Retry-After), one answering
+    401/403 for ``auth_bench`` seconds, and the request is resent at once with
+    another key when one is ready. Pass the pool wherever an ``api_key`` is
+    accepted.
+
+    Pooled keys are limited per key; a provider-wide ``set_rate_limit`` would
+    cap the whole pool at that rate.
+
+    Args:
+        keys: API keys (at least one, no duplicates)
+        calls: Requests allowed per key every ``period`` seconds (None = unlimited)
+        period: Rate-limit period in seconds
+        daily_quota: Requests allowed per key per UTC day (None = unlimited)
+        bench: Seconds a key is benched after a 429 without Retry-After
+        auth_bench: Seconds a key is benched after a 401 or 403
+
+    Example:
+        >>> pool = KeyPool(['key-1', 'key-2', 'key-3'], calls=30, period=60)
+        >>> gecko_price_current('bitcoin', api_key=pool)
+        >>> pool.stats()[0]['requests']
+        1
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        calls: Optional[float] = None,
+        period: float = 60.0,
+        daily_quota: Optional[int] = None,
+        bench: float = 60.0,
+        auth_bench: float = 3600.0,
+    ) -> None:
+        if isinstance(keys, str) or not keys:
+            raise ValueError("keys must be a non-empty sequence of API keys")
+        for key in keys:
+            if not isinstance(key, str) or not key.strip():
+                raise ValueError("keys cannot contain empty or non-string values")
+        if len(set(keys)) != len(keys):
+            raise ValueError("keys cannot contain duplicates")
+        if daily_quota is not None and daily_quota < 1:
+            raise ValueError(f"daily_quota must be positive, got {daily_quota}")
+        self.daily_quota = daily_quota
+        self.bench = bench
+        self.auth_bench = auth_bench
+        self._lock = threading.Lock()
+        self._keys = [
+            _PooledKey(key, RateLimiter(calls, period) if calls is not None else None)
+            for key in keys
+        ]
+        self._by_key = {pooled.key: pooled for pooled in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"KeyPool({len(self._keys)} keys)"
+
+    @staticmethod
+    def _used(pooled: _PooledKey, today: int) -> int:
+        return pooled.used_today if pooled.day == today else 0
+
+    def _quota_left(self, pooled: _PooledKey, today: int) -> Optional[int]:
+        if self.daily_quota is None:
+            return None
+        return self.daily_quota - self._used(pooled, today)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Take a key for one request, waiting up to timeout for a bench or rate limit to clear.
+
+        Returns None at once when every key is out of quota or benched for
+        authentication errors, since waiting would not help.
+        """
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                today = int(time.time() // _DAY)
+                # Monotonic time at which a waiting key could next be used
+                ready: List[float] = []
+                for pooled in sorted(self._keys, key=lambda k: self._used(k, today)):
+                    quota_left = self._quota_left(pooled, today)
+                    if quota_left is not None and quota_left <= 0:
+                        continue
+                    if pooled.benched_until > now:
+                        if not pooled.revoked:
+                            ready.append(pooled.benched_until)
+                        continue
+                    if pooled.limiter is not None and not pooled.limiter.try_acquire():
+                        tokens = pooled.limiter.stats()["available"]
+                        ready.append(now + (1 - tokens) / pooled.limiter.rate)
+                        continue
+                    if pooled.day != today:
+                        pooled.day, pooled.used_today = today, 0
+                    pooled.used_today += 1
+                    pooled.requests += 1
+                    return pooled.key
+            if not ready:
+                return None
+            delay = min(ready) - time.monotonic()
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            time.sleep(max(delay, 0.001))
+
+    def report(self, key: str, status_code: int, retry_after: Optional[float] = None) -> None:
+        """Record the HTTP status a request made with key received; bench it on 429/401/403."""
+        with self._lock:
+            pooled = self._by_key.get(key)
+            if pooled is None:
+                return
+            now = time.monotonic()
+            if status_code == 429:
+                pooled.throttled += 1
+                pooled.revoked = False
+                bench = retry_after if retry_after is not None else self.bench
+                pooled.benched_until = now + bench
+            elif status_code in (401, 403):
+                pooled.rejected += 1
+                pooled.revoked = True
+                pooled.benched_until = now + self.auth_bench
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Per key, in pool order: the key's last four characters, requests made,
+        requests today, quota left today, 429s, 401/403s and seconds left benched.
+        """
+        with self._lock:
+            now = time.monotonic()
+            today = int(time.time() // _DAY)
+            return [
+                {
+                    "key": "..." + pooled.key[-4:],
+                    "requests": pooled.requests,
+                    "used_today": self._used(pooled, today),
+                    "quota_left": self._quota_left(pooled, today),
+                    "throttled": pooled.throttled,
+                    "rejected": pooled.rejected,
+                    "benched_for": max(pooled.benched_until - now, 0.0),
+                }
+                for pooled in self._keys
+            ]
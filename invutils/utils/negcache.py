@@ -0,0 +1,126 @@
+"""Negative cache for ids known to return no data."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import NEGATIVE_CACHE_MAX_ENTRIES, NEGATIVE_CACHE_TTL
+
+_Key = Tuple[str, str, str]
+
+
+class NegativeCache:
+    """
+    Remember (provider, id, range) combinations that came back empty.
+
+    Only genuine "no data" answers are recorded (a successful response without
+    the id, or an HTTP 404) — never timeouts or connection errors — so a
+    transient outage cannot blacklist an id. An entry with an empty range
+    marks the id itself as unknown and covers every range.
+
+    When ``max_entries`` is reached, expired entries are swept; if none have
+    expired, the entry closest to expiry is dropped.
+
+    Args:
+        ttl: Seconds an entry short-circuits calls before the id is tried again
+        max_entries: Upper bound on the number of entries held
+
+    Example:
+        >>> from invutils.utils import NegativeCache, set_negative_cache
+        >>> set_negative_cache(NegativeCache(ttl=6 * 3600))
+    """
+
+    def __init__(
+        self, ttl: float = NEGATIVE_CACHE_TTL, max_entries: int = NEGATIVE_CACHE_MAX_ENTRIES
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[_Key, float] = {}
+        self._hits = 0
+
+    def add(self, provider: str, id: str, range: str = "") -> None:
+        """Record that id has no data for range ('' = for any range)."""
+        now = time.time()
+        key = (provider, id, range)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._sweep(now)
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[min(self._entries, key=self._entries.__getitem__)]
+            self._entries[key] = now + self.ttl
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries (caller holds the lock)."""
+        for key in [k for k, expires_at in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+    def contains(self, provider: str, id: str, range: str = "") -> bool:
+        """True if id is known to have no data for range (counts as a hit)."""
+        now = time.time()
+        with self._lock:
+            for key in {(provider, id, range), (provider, id, "")}:
+                expires_at = self._entries.get(key)
+                if expires_at is None:
+                    continue
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._hits += 1
+                return True
+            return False
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """List live entries as dicts with provider, id, range and expires_at."""
+        now = time.time()
+        with self._lock:
+            return [
+                {"provider": p, "id": i, "range": r, "expires_at": int(exp)}
+                for (p, i, r), exp in self._entries.items()
+                if exp > now
+            ]
+
+    def clear(self, provider: Optional[str] = None, id: Optional[str] = None) -> int:
+        """Remove all entries, or only those matching provider and/or id; return how many."""
+        with self._lock:
+            doomed = [
+                key for key in self._entries
+                if (provider is None or key[0] == provider) and (id is None or key[1] == id)
+            ]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry count and the number of calls short-circuited."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits}
+
+
+_negative_cache: Optional[NegativeCache] = None
+
+
+def set_negative_cache(cache: Optional[NegativeCache]) -> None:
+    """Install (or remove, with None) the negative cache consulted by the price functions."""
+    global _negative_cache
+    _negative_cache = cache
+
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    """Return the installed negative cache, if any."""
+    return _negative_cache
+
+
+def known_empty(provider: str, id: str, range: str = "") -> bool:
+    """True if the installed negative cache holds (provider, id, range)."""
+    cache = _negative_cache
+    return cache is not None and cache.contains(provider, id, range)
+
+
+def mark_empty(provider: str, id: str, range: str = "") -> None:
+    """Record (provider, id, range) in the installed negative cache, if any."""
+    cache = _negative_cache
+    if cache is not None:
+        cache.add(provider, id, range)
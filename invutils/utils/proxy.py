@@ -0,0 +1,179 @@
+"""Client side of the invutils price-serving proxy (see ``invutils serve``)."""
+
+import functools
+import http.client
+import inspect
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from ..config import DEFAULT_TIMEOUT
+from .deadline import current_deadline
+from .scheduler import DEFAULT_PRIORITY, current_priority
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Dict[str, Any]])
+
+# Proxy base URL: 'http://host:port' or 'unix:///path/to/socket'
+_proxy_url: Optional[str] = os.environ.get("INVUTILS_PROXY_URL") or None
+
+# Exception types the server may ask the client to re-raise
+_ERRORS = {"TypeError": TypeError, "ValueError": ValueError}
+
+
+class ProxyUnavailable(Exception):
+    """The call was not sent: the proxy could not be reached or the arguments cannot be sent."""
+
+
+class ProxyError(Exception):
+    """The call was sent to the proxy but failed or its reply was lost (it may have run)."""
+
+
+def set_proxy(url: Optional[str]) -> None:
+    """
+    Route public price functions through a running ``invutils serve`` daemon.
+
+    Args:
+        url: 'http://127.0.0.1:8765', 'unix:///run/invutils.sock', or None to call providers
+            directly. Defaults to the INVUTILS_PROXY_URL environment variable.
+    """
+    global _proxy_url
+    _proxy_url = url or None
+
+
+def get_proxy() -> Optional[str]:
+    """Return the configured proxy URL, if any."""
+    return _proxy_url
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
+
+
+def call_proxy(
+    url: str,
+    function: str,
+    kwargs: Dict[str, Any],
+    timeout: float = DEFAULT_TIMEOUT * 6,
+    priority: str = DEFAULT_PRIORITY,
+) -> Dict[str, Any]:
+    """
+    Invoke a price function on the proxy and return its envelope.
+
+    ``priority`` is sent as the X-Invutils-Priority header; the server queues
+    the call's requests in that class.
+
+    Raises:
+        TypeError / ValueError: Re-raised from the server's input validation
+        ProxyUnavailable: Proxy unreachable, or kwargs not JSON-serializable (nothing was sent)
+        ProxyError: The call was sent but timed out, failed or got a malformed reply
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        conn: http.client.HTTPConnection = _UnixHTTPConnection(parsed.path, timeout)
+    elif parsed.scheme == "http":
+        conn = http.client.HTTPConnection(
+            parsed.hostname or "127.0.0.1", parsed.port, timeout=timeout
+        )
+    else:
+        raise ProxyUnavailable(f"unsupported proxy scheme '{parsed.scheme}'")
+
+    try:
+        body = json.dumps(kwargs)
+    except TypeError as e:
+        # e.g. a KeyPool, which only exists in this process
+        raise ProxyUnavailable(f"arguments cannot be sent to proxy {url}: {e}") from e
+    try:
+        try:
+            # Connection refused or unreachable: nothing was sent
+            conn.connect()
+        except OSError as e:
+            raise ProxyUnavailable(f"proxy {url} unavailable: {e}") from e
+        try:
+            conn.request(
+                "POST",
+                f"/{function}",
+                body=body,
+                headers={"Content-Type": "application/json", "X-Invutils-Priority": priority},
+            )
+            res = conn.getresponse()
+            payload = json.loads(res.read())
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise ProxyError(f"proxy {url} failed after the call was sent: {e}") from e
+    finally:
+        conn.close()
+
+    if res.status == 200 and isinstance(payload, dict):
+        return payload
+    error = payload.get("error", {}) if isinstance(payload, dict) else {}
+    exc_type = _ERRORS.get(str(error.get("type")))
+    if exc_type is not None:
+        raise exc_type(error.get("message", ""))
+    raise ProxyError(f"proxy {url} returned HTTP {res.status}: {error.get('message')}")
+
+
+def proxied(func: F) -> F:
+    """
+    Forward calls to the proxy when one is configured.
+
+    Without a proxy the wrapped function runs unchanged. If the proxy cannot
+    be reached the call falls back to a direct request. Once the call has been
+    sent it is never repeated directly, since that would bypass the proxy's
+    quotas and the proxy may still be running it; a failure then returns an
+    error envelope. A deadline (the
+    function's own, or the time left on an enclosing one) is forwarded so the
+    server stops on time, and bounds the wait for the proxy's reply.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        url = _proxy_url
+        if url is None:
+            return func(*args, **kwargs)
+        arguments = dict(signature.bind(*args, **kwargs).arguments)
+        timeout: float = DEFAULT_TIMEOUT * 6
+        deadline = arguments.get("deadline")
+        # Bad values are left for the server's validation to reject
+        if deadline is None or (
+            isinstance(deadline, (int, float)) and not isinstance(deadline, bool)
+        ):
+            outer = current_deadline()
+            if outer is not None and "deadline" in signature.parameters:
+                budget = max(outer.remaining(), 0.001)
+                deadline = arguments["deadline"] = min(deadline or budget, budget)
+            if deadline is not None and deadline > 0:
+                timeout = min(timeout, deadline + 1.0)
+        try:
+            return call_proxy(
+                url, func.__name__, arguments, timeout=timeout, priority=current_priority()
+            )
+        except ProxyUnavailable as e:
+            logger.warning("%s; calling %s directly", e, func.__name__)
+            return func(*args, **kwargs)
+        except ProxyError as e:
+            logger.error("%s: %s", func.__name__, e)
+            return {
+                "source": func.__module__.rsplit(".", 1)[-1],
+                "fetched_at": int(time.time()),
+                "status": "error",
+                "count": 0,
+                "data": [],
+            }
+
+    return wrapper  # type: ignore[return-value]
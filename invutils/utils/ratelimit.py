@@ -0,0 +1,99 @@
+"""Per-provider token-bucket rate limiting."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing ``calls`` requests every ``period`` seconds.
+
+    Tokens refill continuously; up to ``burst`` (default: ``calls``) may be spent
+    at once. ``acquire`` blocks until a token is available.
+
+    Args:
+        calls: Requests allowed per period
+        period: Period length in seconds
+        burst: Bucket capacity (defaults to calls)
+
+    Example:
+        >>> limiter = RateLimiter(30, 60)   # CoinGecko Demo: 30 calls/minute
+        >>> limiter.acquire()
+        True
+    """
+
+    def __init__(self, calls: float, period: float = 60.0, burst: Optional[float] = None) -> None:
+        if calls <= 0:
+            raise ValueError(f"calls must be positive, got {calls}")
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+        self.rate = calls / period
+        self.capacity = float(burst if burst is not None else calls)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._waited = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._acquired += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; return False if timeout elapses first."""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._acquired += 1
+                    self._waited += time.monotonic() - start
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def stats(self) -> Dict[str, float]:
+        """Return tokens available, total acquisitions and total seconds spent waiting."""
+        with self._lock:
+            self._refill()
+            return {
+                "available": self._tokens,
+                "acquired": self._acquired,
+                "waited": self._waited,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def set_rate_limit(
+    api_name: str, calls: Optional[float], period: float = 60.0, burst: Optional[float] = None
+) -> None:
+    """Limit requests to api_name to calls per period, or remove the limit with calls=None."""
+    if calls is None:
+        _limiters.pop(api_name, None)
+    else:
+        _limiters[api_name] = RateLimiter(calls, period, burst)
+
+
+def get_rate_limiter(api_name: str) -> Optional[RateLimiter]:
+    """Return the limiter configured for api_name, if any."""
+    return _limiters.get(api_name)
@@ -0,0 +1,145 @@
+"""Priority classes and weighted fair queuing for requests waiting on a provider's quota."""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..config import PRIORITY_WEIGHTS
+
+DEFAULT_PRIORITY = "interactive"
+
+_current: "contextvars.ContextVar[str]" = contextvars.ContextVar(
+    "invutils_priority", default=DEFAULT_PRIORITY
+)
+
+
+def current_priority() -> str:
+    """The priority class of requests made in this context."""
+    return _current.get()
+
+
+@contextmanager
+def priority_scope(name: str) -> Iterator[str]:
+    """
+    Make requests in the block wait in priority class name (e.g. 'bulk').
+
+    Like deadline_scope, the class follows pool threads and hedges that copy
+    the caller's context, and is forwarded to an ``invutils serve`` proxy.
+    """
+    if name not in PRIORITY_WEIGHTS:
+        raise ValueError(f"priority must be one of {sorted(PRIORITY_WEIGHTS)}, got '{name}'")
+    token = _current.set(name)
+    try:
+        yield name
+    finally:
+        _current.reset(token)
+
+
+class RequestScheduler:
+    """
+    Order the callers waiting for one provider's rate-limit token or concurrency slot.
+
+    Waiters are served by weighted fair queuing: each gets a virtual finish
+    tag ``max(now, last tag of its class) + 1 / weight``, and the smallest tag
+    goes next. With weights 10:1, a backlog of bulk requests yields one turn
+    in eleven to bulk, and a new interactive request waits behind at most the
+    caller already at the head rather than behind the whole bulk queue.
+
+    Args:
+        weights: Class name -> weight (default: PRIORITY_WEIGHTS)
+
+    Example:
+        >>> set_scheduler('coingecko', RequestScheduler({'interactive': 20, 'bulk': 1}))
+        >>> get_scheduler('coingecko').stats()['bulk']['queued']
+        0
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None) -> None:
+        self.weights = dict(weights or PRIORITY_WEIGHTS)
+        for name, weight in self.weights.items():
+            if weight <= 0:
+                raise ValueError(f"weight for '{name}' must be positive, got {weight}")
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._finish = dict.fromkeys(self.weights, 0.0)
+        self._vtime = 0.0
+        self._busy = False
+        self._stats = {
+            name: {"queued": 0, "granted": 0, "timed_out": 0, "waited": 0.0, "max_wait": 0.0}
+            for name in self.weights
+        }
+
+    def wait_turn(self, priority: str, timeout: Optional[float] = None) -> bool:
+        """
+        Block until it is this caller's turn; False if timeout elapses first.
+
+        A caller that got its turn must call end_turn once it holds (or gave up on)
+        the token or slot it was waiting for.
+        """
+        if priority not in self.weights:
+            raise ValueError(f"priority must be one of {sorted(self.weights)}, got '{priority}'")
+        start = time.monotonic()
+        with self._cond:
+            tag = max(self._vtime, self._finish[priority]) + 1.0 / self.weights[priority]
+            self._finish[priority] = tag
+            entry = (tag, next(self._seq), priority)
+            heapq.heappush(self._queue, entry)
+            stats = self._stats[priority]
+            stats["queued"] += 1
+            while self._busy or self._queue[0] is not entry:
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    stats["queued"] -= 1
+                    stats["timed_out"] += 1
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(remaining)
+            heapq.heappop(self._queue)
+            self._busy = True
+            self._vtime = tag
+            waited = time.monotonic() - start
+            stats["queued"] -= 1
+            stats["granted"] += 1
+            stats["waited"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            return True
+
+    def end_turn(self) -> None:
+        """Let the next waiter go."""
+        with self._cond:
+            self._busy = False
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per class: queue depth now, turns granted, timeouts, total and max seconds waited."""
+        with self._cond:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def set_scheduler(api_name: str, scheduler: Optional[RequestScheduler]) -> None:
+    """Use scheduler for api_name (None restores the default)."""
+    with _schedulers_lock:
+        if scheduler is None:
+            _schedulers.pop(api_name, None)
+        else:
+            _schedulers[api_name] = scheduler
+
+
+def get_scheduler(api_name: str) -> RequestScheduler:
+    """The scheduler for api_name, created with PRIORITY_WEIGHTS on first use."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(api_name)
+        if scheduler is None:
+            scheduler = _schedulers[api_name] = RequestScheduler()
+        return scheduler
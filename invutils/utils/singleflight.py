@@ -0,0 +1,124 @@
+"""Single-flight coalescing of identical in-flight requests."""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """Result slot shared by the leader and the waiters of one in-flight call."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers arriving
+    while it is still running wait and receive the same result (or exception).
+    Once the call finishes the key is forgotten, so later calls run again —
+    this is coalescing, not caching.
+
+    Example:
+        >>> flight = SingleFlight()
+        >>> flight.do(("coingecko", url, params), lambda: fetch())
+        >>> flight.stats()
+        {'executed': 1, 'coalesced': 0, 'in_flight': 0}
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Tuple[int, Hashable], asyncio.Future[Any]] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run func once per key across concurrent threads and share its result.
+
+        A waiter gives up after timeout seconds (None waits for the leader) and
+        raises TimeoutError; the leader's call carries on for the others.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise TimeoutError(f"no result for {key!r} within {timeout}s")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func once per key within the running event loop and share its result."""
+        loop = asyncio.get_event_loop()
+        slot = (id(loop), key)
+
+        with self._lock:
+            future = self._futures.get(slot)
+            if future is None:
+                future = loop.create_future()
+                self._futures[slot] = future
+                self._executed += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            # shield() so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[slot]
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters: calls executed, calls coalesced, and keys currently in flight."""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls) + len(self._futures),
+            }
+
+    def reset_stats(self) -> None:
+        """Zero the executed/coalesced counters."""
+        with self._lock:
+            self._executed = 0
+            self._coalesced = 0
@@ -0,0 +1,194 @@
+"""Unit tests for invutils.backfill module."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from invutils.backfill import BackfillJob, Unit, fetch_unit
+
+ETH = "ethereum:0x0000000000000000000000000000000000000000"
+DAY = 86400
+START = 1609459200
+
+
+def ok(count=1):
+    return {"status": "success", "count": count, "data": [{"timestamp": 0, "price": 1.0}] * count}
+
+
+class TestPlanning:
+    """Test suite for unit planning."""
+
+    def test_defillama_windows_match_page_size(self, tmp_path):
+        """Test that DefiLlama units are one 500-point page each."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+
+        added = job.add_defillama([ETH], START, START + 1200 * DAY, period="1d")
+
+        assert added == 3
+        unit = job.claim("w")
+        assert (unit.start, unit.end) == (START, START + 500 * DAY)
+
+    def test_adding_twice_is_idempotent(self, tmp_path):
+        """Test that re-planning on restart does not duplicate units."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        job.add_defillama([ETH, "bsc:0x1"], START, START + 10 * DAY)
+        assert job.add_defillama([ETH, "bsc:0x1"], START, START + 10 * DAY) == 0
+        assert job.progress()["pending"] == 2
+
+    def test_twelvedata_windows(self, tmp_path):
+        """Test that Twelve Data units are sized to 5000 bars."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        assert job.add_twelvedata(["AAPL"], START, START + 6000 * 300, interval="5min") == 2
+
+    def test_invalid_range(self, tmp_path):
+        """Test that an empty range is rejected."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        with pytest.raises(ValueError, match="end must be after start"):
+            job.add_defillama([ETH], START, START)
+
+    def test_invalid_period(self, tmp_path):
+        """Test that unknown periods are rejected."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        with pytest.raises(ValueError, match="period must be one of"):
+            job.add_defillama([ETH], START, START + DAY, period="2m")
+
+
+class TestExecution:
+    """Test suite for claiming, checkpointing and resuming."""
+
+    def test_run_checkpoints_every_unit(self, tmp_path):
+        """Test that run processes all units and marks them done."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        job.add_defillama([ETH], START, START + 1200 * DAY)
+        stored = []
+
+        completed = job.run(lambda unit, _points: stored.append(unit), fetch=lambda _u: ok())
+
+        assert completed == 3
+        assert [u.start for u in stored] == [START, START + 500 * DAY, START + 1000 * DAY]
+        assert job.progress() == {"pending": 0, "claimed": 0, "done": 3, "failed": 0}
+
+    def test_resume_after_crash(self, tmp_path):
+        """Test that a restarted job skips completed units and resumes from the first gap."""
+        path = str(tmp_path / "job.sqlite")
+        job = BackfillJob(path)
+        job.add_defillama([ETH], START, START + 1500 * DAY)
+
+        def crash_on_third(unit, points):
+            if unit.start == START + 1000 * DAY:
+                raise KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            job.run(crash_on_third, fetch=lambda _u: ok())
+
+        # New process: the crashed unit's claim has expired
+        resumed = BackfillJob(path, lease=0)
+        seen = []
+        resumed.run(lambda unit, _points: seen.append(unit.start), fetch=lambda _u: ok())
+
+        assert seen == [START + 1000 * DAY]
+        assert resumed.progress()["done"] == 3
+
+    def test_active_claims_are_not_stolen(self, tmp_path):
+        """Test that a unit claimed by a live worker is not handed to another."""
+        path = str(tmp_path / "job.sqlite")
+        BackfillJob(path).add_defillama([ETH], START, START + DAY)
+        assert BackfillJob(path).claim("a") is not None
+        assert BackfillJob(path).claim("b") is None
+
+    def test_concurrent_workers_do_not_duplicate(self, tmp_path):
+        """Test that parallel workers on one job process each unit exactly once."""
+        path = str(tmp_path / "job.sqlite")
+        BackfillJob(path).add_defillama([f"ethereum:0x{i:040x}" for i in range(20)],
+                                        START, START + 1000 * DAY)
+        seen = []
+        lock = threading.Lock()
+
+        def sink(unit, points):
+            with lock:
+                seen.append(unit.seq)
+
+        workers = [
+            threading.Thread(target=BackfillJob(path).run, args=(sink,),
+                             kwargs={"fetch": lambda _u: ok(), "worker": f"w{i}"})
+            for i in range(4)
+        ]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join(timeout=30)
+
+        assert len(seen) == 40
+        assert len(set(seen)) == 40
+
+    def test_failed_units_retried_then_skipped(self, tmp_path):
+        """Test that provider errors are retried up to max_attempts."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"), max_attempts=2)
+        job.add_defillama([ETH], START, START + DAY)
+        calls = []
+
+        def fetch(unit):
+            calls.append(unit)
+            return {"status": "error", "count": 0, "data": []}
+
+        assert job.run(lambda _u, _p: None, fetch=fetch) == 0
+        assert len(calls) == 2
+        assert len(job.failed_units()) == 1
+
+        job.reset_failed()
+        assert job.progress()["pending"] == 1
+
+    def test_empty_window_is_done(self, tmp_path):
+        """Test that a window answered with no points is checkpointed, not retried."""
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        job.add_defillama([ETH], START, START + DAY)
+        calls = []
+
+        def fetch(unit):
+            calls.append(unit)
+            return {"status": "error", "missing_windows": [], "count": 0, "data": []}
+
+        assert job.run(lambda _u, _p: None, fetch=fetch) == 1
+        assert len(calls) == 1
+        assert job.progress()["done"] == 1
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_twelvedata_no_data_is_done(self, mock_handle_api, tmp_path):
+        """Test that Twelve Data's no-data answer for a window marks the unit done."""
+        mock_handle_api.return_value = {
+            "code": 400,
+            "message": "No data is available on the specified dates. Try setting different "
+                       "start/end dates.",
+            "status": "error",
+        }
+        job = BackfillJob(str(tmp_path / "job.sqlite"))
+        job.add_twelvedata(["AAPL"], START, START + DAY)
+
+        assert job.run(lambda _u, _p: None, api_key="k") == 1
+        assert job.progress()["done"] == 1
+
+
+class TestFetchUnit:
+    """Test suite for the default unit fetcher."""
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_defillama_unit(self, mock_handle_api, mock_llama_price_chart_response):
+        """Test that a DefiLlama unit maps to one llama_price_chart page."""
+        mock_handle_api.return_value = mock_llama_price_chart_response
+
+        result = fetch_unit(Unit(1, "defillama", ETH, START, START + 3 * DAY, "1d"))
+
+        assert result["span"] == 3
+        assert mock_handle_api.call_count == 1
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_twelvedata_unit(self, mock_handle_api, mock_twelvedata_price_historical_response):
+        """Test that a Twelve Data unit requests its date window."""
+        mock_handle_api.return_value = mock_twelvedata_price_historical_response
+
+        fetch_unit(Unit(1, "twelvedata", "AAPL", START, START + DAY, "1day"), api_key="k")
+
+        params = mock_handle_api.call_args[0][1].params
+        assert params["start_date"] == "2021-01-01 00:00:00"
+        assert params["end_date"] == "2021-01-01 23:59:59"
+        assert params["timezone"] == "UTC"
@@ -0,0 +1,159 @@
+"""Unit tests for invutils.batch and the invutils fetch command."""
+
+import csv
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from invutils.batch import Job, fetch_job, read_manifest, run_batch
+from invutils.cli import main
+
+LLAMA_ID = "ethereum:0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """CSV manifest with one job per provider."""
+    path = tmp_path / "manifest.csv"
+    path.write_text(
+        "provider,id,range,interval,start\n"
+        "coingecko,bitcoin,30,,\n"
+        f"defillama,{LLAMA_ID},3,1d,1640908800\n"
+        "twelvedata,AAPL,3,1day,\n"
+    )
+    return str(path)
+
+
+class TestManifest:
+    """Test suite for manifest parsing and job dispatch."""
+
+    def test_read_csv(self, manifest):
+        """Test that CSV rows become Jobs with typed fields."""
+        jobs = list(read_manifest(manifest))
+        assert [j.provider for j in jobs] == ["coingecko", "defillama", "twelvedata"]
+        assert jobs[1].start == 1640908800
+        assert jobs[0].interval is None
+
+    def test_read_jsonl(self, tmp_path):
+        """Test that JSON Lines manifests are accepted."""
+        path = tmp_path / "m.jsonl"
+        path.write_text(json.dumps({"provider": "CoinGecko", "id": "bitcoin", "range": 7}) + "\n")
+        assert list(read_manifest(str(path))) == [Job("coingecko", "bitcoin", "7")]
+
+    def test_unknown_provider(self):
+        """Test that unknown providers are rejected."""
+        with pytest.raises(ValueError, match="unknown provider"):
+            fetch_job(Job("binance", "BTCUSDT"))
+
+    def test_defillama_requires_start(self):
+        """Test that DefiLlama jobs need start and span."""
+        with pytest.raises(ValueError, match="needs start"):
+            fetch_job(Job("defillama", LLAMA_ID, "3"))
+
+
+class TestRunBatch:
+    """Test suite for concurrent batch execution."""
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    @patch("invutils.prices.defillama.handle_api_request")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_streams_rows_per_job(self, mock_gecko, mock_llama, mock_td, manifest,
+                                  mock_gecko_price_historical_response,
+                                  mock_llama_price_chart_response,
+                                  mock_twelvedata_price_historical_response):
+        """Test that every job's points reach the writer tagged with provider and id."""
+        mock_gecko.return_value = mock_gecko_price_historical_response
+        mock_llama.return_value = mock_llama_price_chart_response
+        mock_td.return_value = mock_twelvedata_price_historical_response
+        batches = []
+
+        stats = run_batch(
+            read_manifest(manifest), batches.append, workers=2, api_keys={"twelvedata": "k"}
+        )
+
+        assert stats.done == 3
+        assert stats.failed == 0
+        assert stats.points == 9
+        assert len(batches) == 3
+        rows = [row for batch in batches for row in batch]
+        assert {row["provider"] for row in rows} == {"coingecko", "defillama", "twelvedata"}
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_failures_counted_not_raised(self, mock_gecko):
+        """Test that failing and invalid jobs are reported without stopping the batch."""
+        mock_gecko.return_value = None
+        jobs = [Job("coingecko", "bitcoin", "30"), Job("twelvedata", "AAPL")]
+
+        stats = run_batch(jobs, lambda _rows: None)
+
+        assert stats.done == 2
+        assert stats.failed == 2
+
+    @patch("invutils.batch.fetch_job")
+    def test_limited_provider_does_not_hold_the_pool(self, mock_fetch):
+        """Test that jobs for other providers run while a limited provider's jobs queue."""
+        lock = threading.Lock()
+        running = {"twelvedata": 0, "defillama": 0}
+        peak = dict(running)
+        started = []
+
+        def fetch(job, _api_keys):
+            with lock:
+                started.append(job.provider)
+                running[job.provider] += 1
+                peak[job.provider] = max(peak[job.provider], running[job.provider])
+            time.sleep(0.02)
+            with lock:
+                running[job.provider] -= 1
+            return {"source": job.provider, "status": "success", "count": 0, "data": []}
+
+        mock_fetch.side_effect = fetch
+        jobs = [Job("twelvedata", f"T{i}") for i in range(20)]
+        jobs += [Job("defillama", f"coingecko:d{i}", "10", "1d", 1609459200) for i in range(8)]
+
+        stats = run_batch(jobs, lambda _rows: None, workers=4)
+
+        assert stats.done == 28
+        assert peak["twelvedata"] == 1
+        assert started.index("defillama") < 3
+        with pytest.raises(ValueError, match="provider limit for defillama must be at least 1"):
+            run_batch(jobs, lambda _rows: None, provider_limits={"defillama": 0})
+
+
+class TestFetchCommand:
+    """Test suite for the invutils fetch CLI."""
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_csv_output(self, mock_gecko, mock_llama, tmp_path,
+                        mock_gecko_price_historical_response, mock_llama_price_chart_response):
+        """Test writing a CSV file from a manifest."""
+        mock_gecko.return_value = mock_gecko_price_historical_response
+        mock_llama.return_value = mock_llama_price_chart_response
+        manifest = tmp_path / "m.json"
+        manifest.write_text(json.dumps([
+            {"provider": "coingecko", "id": "bitcoin", "range": 30},
+            {"provider": "defillama", "id": LLAMA_ID, "range": 3, "start": 1640908800},
+        ]))
+        out = tmp_path / "out.csv"
+
+        code = main(["fetch", str(manifest), "-o", str(out), "-q"])
+
+        assert code == 0
+        with out.open(newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 6
+        assert rows[0]["timestamp"]
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_exit_code_on_failure(self, mock_gecko, tmp_path, capsys):
+        """Test that any failed job makes the command exit non-zero."""
+        mock_gecko.return_value = None
+        manifest = tmp_path / "m.jsonl"
+        manifest.write_text('{"provider": "coingecko", "id": "nope"}\n')
+
+        assert main(["fetch", str(manifest), "-q"]) == 1
+        assert "1 failed" in capsys.readouterr().err
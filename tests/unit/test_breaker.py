@@ -0,0 +1,154 @@
+"""Unit tests for invutils.utils.breaker module."""
+
+import logging
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from invutils.prices.defillama import llama_price_chart
+from invutils.utils import (
+    ApiRequest,
+    CircuitBreaker,
+    circuit_stats,
+    handle_api_request,
+    set_circuit_breaker,
+)
+from invutils.utils.breaker import endpoint_name
+
+_START = 1609459200
+
+
+class TestCircuitBreaker:
+    """Test suite for breaker states and transitions."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record(False)
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.stats()["rejected"] == 1
+        assert breaker.stats()["retry_in"] > 50
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        breaker.record(False)
+        breaker.record(True)
+        breaker.record(False)
+        assert breaker.state == "closed"
+        assert breaker.stats()["failures"] == 1
+
+    def test_half_open_probe_closes(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0.02)
+        breaker.record(False)
+        time.sleep(0.03)
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # one probe at a time
+        breaker.record(True)
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0.02)
+        breaker.record(False)
+        time.sleep(0.03)
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == "open"
+        assert breaker.stats()["opened"] == 2
+
+    def test_probe_without_verdict_is_freed(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+        breaker.record(False)
+        assert breaker.allow()
+        breaker.record(None)
+        assert breaker.allow()
+
+    def test_transition_logged_once(self, caplog):
+        breaker = CircuitBreaker("llama chart", failure_threshold=2, cooldown=60)
+        with caplog.at_level(logging.INFO, logger="invutils.utils.breaker"):
+            for _ in range(10):
+                if breaker.allow():
+                    breaker.record(False)
+        assert len(caplog.records) == 1
+        assert "closed -> open" in caplog.records[0].getMessage()
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match="failure_threshold must be positive"):
+            CircuitBreaker(failure_threshold=0)
+        with pytest.raises(ValueError, match="cooldown must be non-negative"):
+            set_circuit_breaker("breaker-test", cooldown=-1)
+
+    def test_endpoint_names(self):
+        assert endpoint_name("https://coins.llama.fi/chart/ethereum:0xabc") == "price_chart"
+        gecko = "https://api.coingecko.com/api/v3/coins/bitcoin"
+        assert endpoint_name(f"{gecko}/market_chart") == "price_chart"
+        assert endpoint_name(f"{gecko}/market_chart/range") == "price_range"
+        assert endpoint_name("https://x/other?a=1") == "/other"
+
+
+class TestBreakerRequests:
+    """Test suite for breakers applied by handle_api_request."""
+
+    @pytest.fixture(autouse=True)
+    def breakers(self):
+        set_circuit_breaker("breaker-test", failure_threshold=2, cooldown=60)
+        yield
+        set_circuit_breaker("breaker-test", None)
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_open_circuit_fails_fast(self, mock_get):
+        mock_get.side_effect = requests.exceptions.Timeout()
+
+        results = [handle_api_request("breaker-test", ApiRequest("https://x/down"), 10)
+                   for _ in range(5)]
+
+        assert results == [None] * 5
+        assert mock_get.call_count == 2
+        stats = circuit_stats()["breaker-test"]["/down"]
+        assert stats["state"] == "open"
+        assert stats["rejected"] == 3
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_endpoints_break_separately(self, mock_get):
+        mock_get.side_effect = requests.exceptions.ConnectionError()
+        for _ in range(3):
+            handle_api_request("breaker-test", ApiRequest("https://x/down"), 10)
+
+        mock_get.side_effect = None
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"ok": 1}))
+        assert handle_api_request("breaker-test", ApiRequest("https://x/up"), 10) == {"ok": 1}
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_client_errors_do_not_trip(self, mock_get):
+        response = Mock(status_code=404)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        mock_get.return_value = response
+
+        for _ in range(4):
+            handle_api_request("breaker-test", ApiRequest("https://x/missing"), 10)
+
+        assert mock_get.call_count == 4
+        assert circuit_stats()["breaker-test"]["/missing"]["state"] == "closed"
+
+
+class TestBreakerPagination:
+    """Test suite for paginated calls against an endpoint that is down."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_llama_chart_stops_sending_when_open(self, mock_get):
+        """Test that chunks after the circuit opens are missing without being requested."""
+        mock_get.side_effect = requests.exceptions.Timeout()
+        set_circuit_breaker("defillama", failure_threshold=2, cooldown=60)
+        try:
+            result = llama_price_chart("ethereum:0xbreaker", _START, 2500)
+        finally:
+            set_circuit_breaker("defillama", None)
+
+        assert mock_get.call_count == 2
+        assert result["status"] == "error"
+        assert len(result["missing_windows"]) == 5
@@ -0,0 +1,169 @@
+"""Unit tests for invutils.utils.cache module."""
+
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.utils.cache import ResponseCache
+from invutils.utils.helpers import ApiRequest, handle_api_request, set_response_cache
+
+
+def make_response(status=200, body='{"bitcoin": {"usd": 1.0}}', headers=None):
+    response = Mock()
+    response.status_code = status
+    response.text = body
+    response.headers = headers or {}
+    response.raise_for_status = Mock()
+    response.json.side_effect = lambda: json.loads(body)
+    return response
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    """Install a fresh on-disk cache for the duration of a test."""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    set_response_cache(cache)
+    yield cache
+    set_response_cache(None)
+
+
+class TestResponseCache:
+    """Test suite for the ResponseCache store."""
+
+    def test_set_and_get(self, tmp_path):
+        """Test that a stored body and validators are returned."""
+        cache = ResponseCache(str(tmp_path / "c.sqlite"))
+        cache.set(("coingecko", "u", ()), "{}", etag='"abc"', last_modified="Mon")
+
+        entry = cache.get(("coingecko", "u", ()))
+
+        assert entry.body == "{}"
+        assert entry.validators() == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon"}
+        assert len(cache) == 1
+
+    def test_shared_between_instances(self, tmp_path):
+        """Test that two handles on the same file (as in two processes) share entries."""
+        path = str(tmp_path / "c.sqlite")
+        ResponseCache(path).set("k", "body")
+        assert ResponseCache(path).get("k").body == "body"
+
+    def test_wal_mode(self, tmp_path):
+        """Test that the database runs in WAL journal mode."""
+        cache = ResponseCache(str(tmp_path / "c.sqlite"))
+        mode = cache._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_ttl_longest_fragment_wins(self, tmp_path):
+        """Test per-endpoint TTL resolution."""
+        cache = ResponseCache(
+            str(tmp_path / "c.sqlite"), ttls={"/price": 10, "/simple/price": 30}, default_ttl=5
+        )
+        assert cache.ttl_for("https://api.coingecko.com/api/v3/simple/price") == 30
+        assert cache.ttl_for("https://api.twelvedata.com/price") == 10
+        assert cache.ttl_for("https://example.com/other") == 5
+
+    def test_claim_refresh_is_exclusive(self, tmp_path):
+        """Test that only one caller wins the refresh lease."""
+        path = str(tmp_path / "c.sqlite")
+        ResponseCache(path).set("k", "body")
+        assert ResponseCache(path).claim_refresh("k") is True
+        assert ResponseCache(path).claim_refresh("k") is False
+
+    def test_clear(self, tmp_path):
+        """Test that clear removes every entry."""
+        cache = ResponseCache(str(tmp_path / "c.sqlite"))
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestCachedRequests:
+    """Test handle_api_request with a response cache installed."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_fresh_entry_skips_upstream(self, mock_get, response_cache):
+        """Test that a second identical request is served from cache."""
+        mock_get.return_value = make_response()
+        request = ApiRequest("https://api.coingecko.com/api/v3/simple/price", {"ids": "bitcoin"})
+
+        first = handle_api_request("coingecko", request, 10)
+        second = handle_api_request("coingecko", request, 10)
+
+        assert first == second == {"bitcoin": {"usd": 1.0}}
+        assert mock_get.call_count == 1
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_errors_are_not_cached(self, mock_get, response_cache):
+        """Test that failed responses are not stored."""
+        mock_get.return_value = make_response(body="not json")
+        request = ApiRequest("https://api.coingecko.com/api/v3/simple/price", {"ids": "x"})
+
+        assert handle_api_request("coingecko", request, 10) is None
+        assert len(response_cache) == 0
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_in_body_errors_are_not_cached(self, mock_get, response_cache):
+        """Test that a 200 carrying a Twelve Data error body is not served again."""
+        body = '{"code": 429, "message": "API credits exhausted", "status": "error"}'
+        mock_get.return_value = make_response(body=body)
+        request = ApiRequest("https://api.twelvedata.com/price", {"symbol": "AAPL"})
+
+        handle_api_request("twelvedata", request, 10)
+        handle_api_request("twelvedata", request, 10)
+
+        assert mock_get.call_count == 2
+        assert len(response_cache) == 0
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_expired_entry_revalidated_with_etag(self, mock_get, response_cache):
+        """Test that an expired entry sends If-None-Match and reuses the body on 304."""
+        request = ApiRequest("https://coins.llama.fi/chart/x", {"span": 10})
+        key = ("defillama",) + request.key()
+        response_cache.set(key, '{"coins": {}}', etag='"v1"')
+        # Age the entry past TTL + stale window so the refresh is synchronous
+        response_cache._connect().execute("UPDATE responses SET stored_at = 0")
+        mock_get.return_value = make_response(status=304, body="")
+
+        result = handle_api_request("defillama", request, 10)
+
+        assert result == {"coins": {}}
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert time.time() - response_cache.get(key).stored_at < 5
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_stale_entry_served_while_refreshing(self, mock_get, response_cache):
+        """Test stale-while-revalidate: the stale body returns at once and is refreshed."""
+        request = ApiRequest("https://coins.llama.fi/chart/x", {"span": 10})
+        key = ("defillama",) + request.key()
+        response_cache.set(key, '{"v": 1}')
+        ttl = response_cache.ttl_for(request.url)
+        response_cache._connect().execute(
+            "UPDATE responses SET stored_at = ?", (time.time() - ttl - 1,)
+        )
+        mock_get.return_value = make_response(body='{"v": 2}')
+
+        result = handle_api_request("defillama", request, 10)
+        assert result == {"v": 1}
+
+        # Wait for the background refresh to land
+        for _ in range(200):
+            if response_cache.get(key).body == '{"v": 2}':
+                break
+            time.sleep(0.01)
+        assert response_cache.get(key).body == '{"v": 2}'
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_zero_ttl_disables_caching(self, mock_get, tmp_path):
+        """Test that endpoints with TTL 0 always go upstream."""
+        set_response_cache(ResponseCache(str(tmp_path / "c.sqlite"), ttls={"/": 0}))
+        try:
+            mock_get.return_value = make_response()
+            request = ApiRequest("https://api.coingecko.com/api/v3/simple/price", {"ids": "b"})
+            handle_api_request("coingecko", request, 10)
+            handle_api_request("coingecko", request, 10)
+            assert mock_get.call_count == 2
+        finally:
+            set_response_cache(None)
@@ -4,7 +4,17 @@ from unittest.mock import patch
 
 import pytest
 
-from invutils.prices.coingecko import gecko_price_chart, gecko_price_current, gecko_price_historical
+from invutils.prices.coingecko import (
+    _id_batches,
+    _range_windows,
+    clear_incremental_cache,
+    gecko_price_chart,
+    gecko_price_current,
+    gecko_price_historical,
+    gecko_price_range,
+)
+
+DAY = 86400
 
 
 class TestGeckoPriceCurrent:
@@ -198,6 +208,57 @@ class TestGeckoPriceCurrent:
         assert result["fetched_at"] > 1640000000  # After 2021
 
 
+class TestGeckoPriceCurrentBatching:
+    """Test suite for id-list splitting in gecko_price_current."""
+
+    def test_batches_deduplicated_and_bounded(self):
+        """Test that ids are stripped, de-duplicated and packed under the size limit."""
+        batches = _id_batches("a, b,a,,c", max_chars=3)
+        assert batches == [["a", "b"], ["c"]]
+        assert all(len(",".join(b)) <= 3 for b in batches)
+
+    def test_small_list_single_batch(self):
+        """Test that ordinary lists stay a single request."""
+        assert _id_batches("bitcoin,ethereum") == [["bitcoin", "ethereum"]]
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_large_list_fanned_out_and_merged(self, mock_handle_api):
+        """Test that 1,500 ids are split into several requests and merged."""
+        ids = [f"coin-number-{i}" for i in range(1500)]
+
+        def respond(api_name, request, timeout):
+            assert len(request.url) + len(request.params["ids"]) < 8000
+            return {coin: {"usd": 1.0} for coin in request.params["ids"].split(",")}
+
+        mock_handle_api.side_effect = respond
+
+        result = gecko_price_current(",".join(ids + ids[:10]))
+
+        assert mock_handle_api.call_count > 1
+        assert result["count"] == 1500
+        assert result["failed_ids"] == []
+        assert {d["coin_id"] for d in result["data"]} == set(ids)
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_failed_batch_reported(self, mock_handle_api):
+        """Test that one failing batch does not fail the whole call."""
+        ids = [f"coin-number-{i}" for i in range(600)]
+
+        def respond(api_name, request, timeout):
+            batch = request.params["ids"].split(",")
+            if "coin-number-0" in batch:
+                return None
+            return {coin: {"usd": 1.0} for coin in batch}
+
+        mock_handle_api.side_effect = respond
+
+        result = gecko_price_current(",".join(ids))
+
+        assert result["status"] == "success"
+        assert "coin-number-0" in result["failed_ids"]
+        assert result["count"] + len(result["failed_ids"]) == 600
+
+
 class TestGeckoPriceChart:
     """Test suite for gecko_price_chart function."""
 
@@ -411,3 +472,290 @@ class TestGeckoPriceHistoricalAlias:
         assert via_new["status"] == via_alias["status"]
         assert via_new["coin_id"] == via_alias["coin_id"]
         assert via_new["count"] == via_alias["count"]
+
+
+class TestGeckoPriceChartFields:
+    """Test suite for gecko_price_chart(fields=...)."""
+
+    def test_fields_must_be_sequence(self):
+        """Test that a bare string is rejected."""
+        with pytest.raises(TypeError, match="fields must be a list or tuple"):
+            gecko_price_chart("bitcoin", fields="volume")
+
+    def test_unknown_field(self):
+        """Test that unknown field names are rejected."""
+        with pytest.raises(ValueError, match="fields must be among"):
+            gecko_price_chart("bitcoin", fields=("price", "supply"))
+
+    def test_empty_fields(self):
+        """Test that an empty field list is rejected."""
+        with pytest.raises(ValueError, match="fields cannot be empty"):
+            gecko_price_chart("bitcoin", fields=())
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_all_fields_from_one_request(self, mock_handle_api, mock_gecko_price_historical_response):
+        """Test that market caps and volumes come from the same single response."""
+        mock_handle_api.return_value = mock_gecko_price_historical_response
+
+        result = gecko_price_chart("bitcoin", fields=("price", "market_cap", "volume"))
+
+        mock_handle_api.assert_called_once()
+        assert result["data"][0] == {
+            "timestamp": 1640908800,
+            "price": 44500.0,
+            "market_cap": 840000000000,
+            "volume": 30000000000,
+        }
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_fields_aligned_on_timestamp(self, mock_handle_api):
+        """Test that a column missing a timestamp yields None rather than misalignment."""
+        mock_handle_api.return_value = {
+            "prices": [[1000, 1.0], [2000, 2.0]],
+            "total_volumes": [[2000, 20.0]],
+        }
+
+        result = gecko_price_chart("bitcoin", fields=["volume", "market_cap"])
+
+        assert result["data"] == [
+            {"timestamp": 1, "volume": None, "market_cap": None},
+            {"timestamp": 2, "volume": 20.0, "market_cap": None},
+        ]
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_default_shape_unchanged(self, mock_handle_api, mock_gecko_price_historical_response):
+        """Test that the default output keeps only timestamp and price."""
+        mock_handle_api.return_value = mock_gecko_price_historical_response
+        result = gecko_price_chart("bitcoin")
+        assert set(result["data"][0]) == {"timestamp", "price"}
+
+
+class TestGeckoPriceRange:
+    """Test suite for gecko_price_range function."""
+
+    # ==================== Input Validation Tests ====================
+
+    def test_invalid_start_type(self):
+        """Test that non-integer start raises TypeError."""
+        with pytest.raises(TypeError, match="start must be an integer"):
+            gecko_price_range("bitcoin", "1609459200", 1640995200)
+
+    def test_end_before_start(self):
+        """Test that an empty range raises ValueError."""
+        with pytest.raises(ValueError, match="end must be after start"):
+            gecko_price_range("bitcoin", 1640995200, 1609459200)
+
+    def test_invalid_granularity(self):
+        """Test that unknown granularities raise ValueError."""
+        with pytest.raises(ValueError, match="granularity must be one of"):
+            gecko_price_range("bitcoin", 1609459200, 1640995200, granularity="minutely")
+
+    # ==================== Windowing Tests ====================
+
+    def test_hourly_year_split_into_90_day_windows(self):
+        """Test that a year of hourly data needs five windows of at most 90 days."""
+        windows = _range_windows(0, 365 * DAY, "hourly")
+        assert len(windows) == 5
+        assert all(b - a <= 90 * DAY for a, b in windows)
+        assert windows[-1] == (360 * DAY, 365 * DAY)
+
+    def test_short_tail_window_stretched_backwards(self):
+        """Test that a tail shorter than a day overlaps its neighbour to stay hourly."""
+        windows = _range_windows(0, 90 * DAY + 3600, "hourly")
+        assert windows[-1] == (90 * DAY + 3600 - 2 * DAY, 90 * DAY + 3600)
+
+    def test_daily_short_range_stretched_past_90_days(self):
+        """Test that short daily ranges are widened so the provider returns daily points."""
+        assert _range_windows(100 * DAY, 130 * DAY, "daily") == [(39 * DAY, 130 * DAY)]
+
+    # ==================== Request Tests ====================
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_merges_windows_in_order_without_duplicates(self, mock_handle_api):
+        """Test that overlapping window results are de-duplicated and sorted."""
+
+        def respond(api_name, request, timeout):
+            lo, hi = request.params["from"], request.params["to"]
+            # Hourly points including both window edges, in milliseconds
+            return {"prices": [[ts * 1000, float(ts)] for ts in range(lo, hi + 1, 3600)]}
+
+        mock_handle_api.side_effect = respond
+
+        result = gecko_price_range("bitcoin", 3600, 200 * DAY, granularity="hourly")
+
+        timestamps = [p["timestamp"] for p in result["data"]]
+        assert result["status"] == "success"
+        assert mock_handle_api.call_count == 3
+        assert timestamps == sorted(set(timestamps))
+        assert timestamps[0] == 3600
+        assert timestamps[-1] == 200 * DAY
+        assert result["missing_windows"] == []
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_uses_range_endpoint(self, mock_handle_api, mock_gecko_price_historical_response):
+        """Test that requests go to /market_chart/range with from/to params."""
+        mock_handle_api.return_value = mock_gecko_price_historical_response
+
+        result = gecko_price_range("bitcoin", 1640900000, 1641100000, granularity="auto")
+
+        request = mock_handle_api.call_args[0][1]
+        assert request.url.endswith("/coins/bitcoin/market_chart/range")
+        assert request.params["from"] == 1640900000
+        assert result["count"] == 3
+        assert result["data"][0] == {"timestamp": 1640908800, "price": 44500.0}
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_failed_window_reported(self, mock_handle_api):
+        """Test that a failing window is listed in missing_windows."""
+
+        def respond(api_name, request, timeout):
+            if request.params["from"] == 3600:
+                return None
+            return {"prices": [[request.params["to"] * 1000, 1.0]]}
+
+        mock_handle_api.side_effect = respond
+
+        result = gecko_price_range("bitcoin", 3600, 100 * DAY)
+
+        assert result["status"] == "success"
+        assert result["missing_windows"] == [[3600, 3600 + 90 * DAY]]
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_all_windows_fail(self, mock_handle_api):
+        """Test error envelope when nothing could be fetched."""
+        mock_handle_api.return_value = None
+
+        result = gecko_price_range("bitcoin", 1609459200, 1640995200)
+
+        assert result["status"] == "error"
+        assert result["count"] == 0
+        assert len(result["missing_windows"]) == 5
+
+
+class TestGeckoPriceChartIncremental:
+    """Test suite for gecko_price_chart(incremental=True)."""
+
+    NOW = 1700000000
+
+    @pytest.fixture(autouse=True)
+    def _clear(self):
+        clear_incremental_cache()
+        yield
+        clear_incremental_cache()
+
+    def daily(self, start, n, open_point=True):
+        """n closed daily points from start, plus an open point at NOW."""
+        prices = [[(start + i * DAY) * 1000, float(i)] for i in range(n)]
+        if open_point:
+            prices.append([self.NOW * 1000, 999.0])
+        return {"prices": prices}
+
+    @patch("invutils.prices.coingecko.time.time")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_first_call_fetches_full_series(self, mock_handle_api, mock_time):
+        """Test that the first incremental call behaves like a normal call."""
+        mock_time.return_value = self.NOW
+        mock_handle_api.return_value = self.daily(self.NOW - 364 * DAY, 364)
+
+        result = gecko_price_chart("bitcoin", days=365, incremental=True)
+
+        assert result["count"] == 365
+        assert mock_handle_api.call_args[0][1].params == {"vs_currency": "usd", "days": 365}
+
+    @patch("invutils.prices.coingecko.time.time")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_second_call_requests_only_delta(self, mock_handle_api, mock_time):
+        """Test that a refresh asks for a few daily points and replaces the open point."""
+        mock_time.return_value = self.NOW
+        first_day = self.NOW - self.NOW % DAY - 363 * DAY
+        mock_handle_api.return_value = self.daily(first_day, 364)
+        gecko_price_chart("bitcoin", days=365, incremental=True)
+
+        later = self.NOW + DAY
+        mock_time.return_value = later
+        mock_handle_api.return_value = {
+            "prices": [
+                [(first_day + 363 * DAY) * 1000, 363.0],
+                [(first_day + 364 * DAY) * 1000, 364.0],
+                [later * 1000, 1000.0],
+            ]
+        }
+
+        result = gecko_price_chart("bitcoin", days=365, incremental=True)
+
+        params = mock_handle_api.call_args[0][1].params
+        assert params["interval"] == "daily"
+        assert params["days"] <= 3
+        prices = [p["price"] for p in result["data"]]
+        assert 999.0 not in prices  # old open point replaced
+        assert prices[-3:] == [363.0, 364.0, 1000.0]
+        timestamps = [p["timestamp"] for p in result["data"]]
+        assert timestamps == sorted(set(timestamps))
+        assert timestamps[0] >= later - 365 * DAY
+
+    @patch("invutils.prices.coingecko.time.time")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_hourly_delta_requests_at_least_two_days(self, mock_handle_api, mock_time):
+        """Test that hourly refreshes never drop into 5-minutely granularity."""
+        mock_time.return_value = self.NOW
+        mock_handle_api.return_value = {
+            "prices": [[(self.NOW - h * 3600) * 1000, 1.0] for h in range(720, -1, -1)]
+        }
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+
+        params = mock_handle_api.call_args[0][1].params
+        assert params == {"vs_currency": "usd", "days": 2}
+
+    @patch("invutils.prices.coingecko.time.time")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_longer_range_fetches_in_full(self, mock_handle_api, mock_time):
+        """Test that asking for more days than the remembered series covers refetches."""
+        mock_time.return_value = self.NOW
+        mock_handle_api.return_value = {
+            "prices": [[(self.NOW - h * 3600) * 1000, 1.0] for h in range(720, -1, -1)]
+        }
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+
+        mock_handle_api.return_value = {
+            "prices": [[(self.NOW - h * 3600) * 1000, 1.0] for h in range(2160, -1, -1)]
+        }
+        result = gecko_price_chart("bitcoin", days=90, incremental=True)
+
+        assert mock_handle_api.call_args[0][1].params == {"vs_currency": "usd", "days": 90}
+        assert result["data"][0]["timestamp"] == self.NOW - 90 * DAY
+
+        # The 90-day series now covers a later 30-day call
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+        assert mock_handle_api.call_args[0][1].params == {"vs_currency": "usd", "days": 2}
+
+    @patch("invutils.prices.coingecko.time.time")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_stale_hourly_series_refetched_in_full(self, mock_handle_api, mock_time):
+        """Test that an hourly delta longer than 90 days (which would be daily) is not used."""
+        mock_time.return_value = self.NOW
+        mock_handle_api.return_value = {
+            "prices": [[(self.NOW - h * 3600) * 1000, 1.0] for h in range(720, -1, -1)]
+        }
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+
+        mock_time.return_value = self.NOW + 100 * DAY
+        gecko_price_chart("bitcoin", days=30, incremental=True)
+
+        assert mock_handle_api.call_args[0][1].params == {"vs_currency": "usd", "days": 30}
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_series_keyed_by_currency(self, mock_handle_api):
+        """Test that different vs_currency values do not share a series."""
+        mock_handle_api.return_value = {"prices": [[1000, 1.0], [2000, 2.0]]}
+        gecko_price_chart("bitcoin", vs_currency="usd", days="max", incremental=True)
+        gecko_price_chart("bitcoin", vs_currency="eur", days="max", incremental=True)
+
+        assert "interval" not in mock_handle_api.call_args[0][1].params
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_failed_refresh_returns_error(self, mock_handle_api):
+        """Test that a failing delta request yields the error envelope."""
+        mock_handle_api.return_value = None
+        result = gecko_price_chart("bitcoin", days=365, incremental=True)
+        assert result["status"] == "error"
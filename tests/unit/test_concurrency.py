@@ -0,0 +1,150 @@
+"""Unit tests for invutils.utils.concurrency module."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from invutils.utils import (
+    AdaptiveConcurrency,
+    ApiRequest,
+    get_concurrency_limiter,
+    handle_api_request,
+    set_adaptive_concurrency,
+)
+
+
+class TestAdaptiveConcurrency:
+    """Test suite for the AIMD limit."""
+
+    def test_additive_increase(self):
+        """Test that about one round of healthy responses raises the limit by one."""
+        controller = AdaptiveConcurrency(initial=4, max_limit=8)
+        for _ in range(5):
+            controller.acquire()
+            controller.release(0.1)
+        assert controller.limit == 5
+        assert controller.stats()["increases"] == 1
+
+    def test_multiplicative_decrease_on_overload(self):
+        controller = AdaptiveConcurrency(initial=8)
+        controller.acquire()
+        controller.release(0.1, overloaded=True)
+        assert controller.limit == 4
+        assert controller.stats()["overloads"] == 1
+
+    def test_latency_spike_cuts(self):
+        controller = AdaptiveConcurrency(initial=8, latency_factor=2.0)
+        controller.acquire()
+        controller.release(0.1)
+        controller.acquire()
+        controller.release(1.0)
+        assert controller.limit == 4
+
+    def test_cooldown_limits_cuts(self):
+        """Test that a burst of 429s from one overload cuts the limit once."""
+        controller = AdaptiveConcurrency(initial=16, cooldown=60)
+        for _ in range(3):
+            controller.acquire()
+            controller.release(0.1, overloaded=True)
+        assert controller.limit == 8
+        assert controller.stats()["decreases"] == 1
+
+    def test_bounds(self):
+        controller = AdaptiveConcurrency(initial=1, min_limit=1, max_limit=1, cooldown=0)
+        controller.acquire()
+        controller.release(0.1, overloaded=True)
+        assert controller.limit == 1
+        controller.acquire()
+        controller.release(0.1)
+        assert controller.limit == 1
+
+    def test_acquire_blocks_at_limit(self):
+        controller = AdaptiveConcurrency(initial=1, max_limit=1)
+        assert controller.acquire()
+        assert not controller.acquire(timeout=0.02)
+        threading.Timer(0.02, controller.release, args=(None,)).start()
+        assert controller.acquire(timeout=1.0)
+
+    def test_release_without_latency_keeps_limit(self):
+        controller = AdaptiveConcurrency(initial=4)
+        controller.acquire()
+        controller.release(None)
+        assert controller.stats() == {
+            "limit": 4, "in_flight": 0, "increases": 0, "decreases": 0,
+            "overloads": 0, "waited": pytest.approx(0, abs=0.01), "baseline_latency": 0.0,
+        }
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError, match="limits must satisfy"):
+            AdaptiveConcurrency(initial=10, max_limit=5)
+        with pytest.raises(ValueError, match="backoff must be between 0 and 1"):
+            AdaptiveConcurrency(backoff=1.5)
+
+
+class TestAdaptiveRequests:
+    """Test suite for controllers applied by handle_api_request."""
+
+    @pytest.fixture
+    def controller(self):
+        controller = AdaptiveConcurrency(initial=4, cooldown=0)
+        set_adaptive_concurrency("aimd-test", controller)
+        yield controller
+        set_adaptive_concurrency("aimd-test", None)
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_429_cuts_limit(self, mock_get, controller):
+        response = Mock(status_code=429)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        mock_get.return_value = response
+
+        assert handle_api_request("aimd-test", ApiRequest("https://x/a"), 10) is None
+        assert controller.limit == 2
+        assert controller.stats()["in_flight"] == 0
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_404_is_not_overload(self, mock_get, controller):
+        response = Mock(status_code=404)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        mock_get.return_value = response
+
+        handle_api_request("aimd-test", ApiRequest("https://x/b"), 10)
+
+        assert controller.stats()["overloads"] == 0
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_limit_caps_requests_in_flight(self, mock_get):
+        """Test that no more than the limit of requests run at once."""
+        controller = AdaptiveConcurrency(initial=2, max_limit=2)
+        set_adaptive_concurrency("aimd-test", controller)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def get(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.03)
+            with lock:
+                active[0] -= 1
+            return Mock(status_code=200, json=Mock(return_value={"ok": 1}))
+
+        mock_get.side_effect = get
+        threads = [
+            threading.Thread(
+                target=handle_api_request, args=("aimd-test", ApiRequest(f"https://x/{i}"), 10)
+            )
+            for i in range(6)
+        ]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=5)
+        finally:
+            set_adaptive_concurrency("aimd-test", None)
+
+        assert peak[0] == 2
+        assert get_concurrency_limiter("aimd-test") is None
@@ -0,0 +1,151 @@
+"""Unit tests for invutils.utils.deadline module."""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_range
+from invutils.prices.defillama import llama_price_chart
+from invutils.utils import (
+    ApiRequest,
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    get_rate_limiter,
+    handle_api_request,
+    handle_api_request_async,
+    set_rate_limit,
+)
+
+_DAY = 86400
+_START = 1609459200
+
+
+class TestDeadline:
+    """Test suite for Deadline and deadline_scope."""
+
+    def test_timeout_shrinks_to_remaining(self):
+        deadline = Deadline(0.5)
+        assert deadline.timeout(10) <= 0.5
+        assert deadline.timeout(0.1) == 0.1
+        assert not deadline.expired()
+
+    def test_expired(self):
+        deadline = Deadline(0.0)
+        assert deadline.expired()
+        assert deadline.remaining() == 0.0
+
+    def test_nested_scope_keeps_earlier_deadline(self):
+        with deadline_scope(1.0) as outer:
+            with deadline_scope(60.0) as inner:
+                assert inner is outer
+            with deadline_scope(None) as same:
+                assert same is outer
+        assert current_deadline() is None
+
+    def test_invalid_deadline(self):
+        with pytest.raises(TypeError, match="deadline must be a number"):
+            llama_price_chart("ethereum:0xabc", _START, 10, deadline="5")
+        with pytest.raises(ValueError, match="deadline must be positive"):
+            llama_price_chart("ethereum:0xabc", _START, 10, deadline=0)
+
+
+class TestDeadlineRequests:
+    """Test suite for deadlines applied by handle_api_request."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_expired_deadline_sends_nothing(self, mock_get):
+        with deadline_scope(0.001):
+            time.sleep(0.01)
+            assert handle_api_request("deadline-test", ApiRequest("https://x/a"), 10) is None
+        mock_get.assert_not_called()
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_request_timeout_clamped(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"ok": 1}))
+        with deadline_scope(2.0):
+            handle_api_request("deadline-test", ApiRequest("https://x/b", timeout=10), 10)
+        assert mock_get.call_args.kwargs["timeout"] <= 2.0
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_rate_limit_wait_bounded(self, mock_get):
+        """Test that waiting for a rate-limit token gives up at the deadline."""
+        set_rate_limit("deadline-test", 1, 3600)
+        try:
+            get_rate_limiter("deadline-test").try_acquire()
+            started = time.monotonic()
+            with deadline_scope(0.05):
+                result = handle_api_request("deadline-test", ApiRequest("https://x/c"), 10)
+        finally:
+            set_rate_limit("deadline-test", None)
+
+        assert result is None
+        assert time.monotonic() - started < 1.0
+        mock_get.assert_not_called()
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_async_gives_up_at_deadline(self, mock_get):
+        def slow(*args, **kwargs):
+            time.sleep(0.5)
+            return Mock(status_code=200, json=Mock(return_value={"ok": 1}))
+
+        mock_get.side_effect = slow
+
+        async def call():
+            started = time.monotonic()
+            with deadline_scope(0.05):
+                request = ApiRequest("https://x/d")
+                result = await handle_api_request_async("deadline-test", request, 10)
+            return result, time.monotonic() - started
+
+        # asyncio.run itself waits for the abandoned request's thread on exit
+        result, elapsed = asyncio.run(call())
+        assert result is None
+        assert elapsed < 0.4
+
+
+class TestDeadlinePagination:
+    """Test suite for partial results when a deadline passes mid-call."""
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_chart_returns_partial(self, mock_handle_api):
+        """Test that pages after the deadline are reported as one missing window."""
+        coin = "ethereum:0xabc"
+
+        def slow_page(api_name, request, timeout):
+            time.sleep(0.1)
+            ts = request.params["start"]
+            return {"coins": {coin: {"prices": [{"timestamp": ts, "price": 1.0}]}}}
+
+        mock_handle_api.side_effect = slow_page
+
+        result = llama_price_chart(coin, _START, 1500, deadline=0.05)
+
+        assert mock_handle_api.call_count == 1
+        assert result["status"] == "success"
+        assert result["count"] == 1
+        assert result["missing_windows"] == [[_START + 500 * _DAY, _START + 1499 * _DAY]]
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_chart_failed_page_is_missing(self, mock_handle_api):
+        mock_handle_api.return_value = None
+        result = llama_price_chart("ethereum:0xabc", _START, 10)
+        assert result["missing_windows"] == [[_START, _START + 9 * _DAY]]
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_deadline_reaches_pool_threads(self, mock_handle_api):
+        """Test that windows fetched concurrently run under the caller's deadline."""
+        seen = []
+
+        def record(api_name, request, timeout):
+            seen.append(current_deadline())
+            return {"prices": []}
+
+        mock_handle_api.side_effect = record
+
+        gecko_price_range("bitcoin", _START, _START + 365 * _DAY, deadline=30)
+
+        assert len(seen) > 1
+        assert all(deadline is not None for deadline in seen)
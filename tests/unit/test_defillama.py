@@ -478,7 +478,7 @@ class TestLlamaPriceChart:
 
         assert set(result.keys()) == {
             "source", "fetched_at", "status", "coin_id",
-            "start", "span", "period", "count", "data",
+            "start", "span", "period", "missing_windows", "count", "data",
         }
 
     # ==================== Pagination ====================
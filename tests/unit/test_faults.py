@@ -0,0 +1,142 @@
+"""Unit tests for invutils.utils.faults module."""
+
+import contextlib
+import json
+import logging
+import time
+
+import pytest
+
+from invutils.prices.defillama import llama_price_chart
+from invutils.replay import record
+from invutils.utils import (
+    ApiRequest,
+    FaultInjector,
+    KeyPool,
+    handle_api_request,
+    replay_transport,
+    set_transport,
+)
+from invutils.utils.faults import _response
+
+_START = 1609459200
+
+
+def ok_transport(url, **kwargs):
+    return _response(url, 200, b'{"ok": 1}')
+
+
+@pytest.fixture
+def transport():
+    """Install a transport for one test and always remove it afterwards."""
+    yield set_transport
+    set_transport(None)
+
+
+class TestFaultInjector:
+    """Test suite for injected faults and the handle_api_request branch each one reaches."""
+
+    @pytest.mark.parametrize("fault, message", [
+        ("timeout", "Timeout Error"),
+        ("reset", "Connection Error"),
+        ("throttle", "HTTP Error 429"),
+        ("server_error", "HTTP Error 503"),
+        ("truncated", "Response Error"),
+        ("invalid_json", "Response Error"),
+    ])
+    def test_fault_branches(self, transport, caplog, fault, message):
+        transport(FaultInjector(ok_transport, rates={fault: 1.0}, hang=0))
+        with caplog.at_level(logging.ERROR, logger="invutils.utils.helpers"):
+            assert handle_api_request("faults-test", ApiRequest("https://x/f"), 10) is None
+        assert message in caplog.text
+
+    def test_no_fault_passes_through(self, transport):
+        injector = FaultInjector(ok_transport, rates={"timeout": 0.0})
+        transport(injector)
+        assert handle_api_request("faults-test", ApiRequest("https://x/ok"), 10) == {"ok": 1}
+        stats = injector.stats()
+        assert stats.pop("requests") == 1
+        assert set(stats.values()) == {0}
+
+    def test_latency_is_added(self):
+        injector = FaultInjector(ok_transport, latency=0.05)
+        started = time.monotonic()
+        injector("https://x/slow")
+        assert time.monotonic() - started >= 0.05
+
+    def test_timeout_hangs_for_request_timeout(self):
+        injector = FaultInjector(ok_transport, rates={"timeout": 1.0})
+        started = time.monotonic()
+        with pytest.raises(Exception, match="injected timeout"):
+            injector("https://x/hang", timeout=0.05)
+        assert time.monotonic() - started >= 0.05
+
+    def test_seed_is_reproducible(self):
+        rates = {"reset": 0.3, "throttle": 0.3}
+        runs = []
+        for _ in range(2):
+            injector = FaultInjector(ok_transport, rates=rates, seed=7)
+            for _ in range(50):
+                with contextlib.suppress(Exception):
+                    injector("https://x/s")
+            runs.append(injector.stats())
+        assert runs[0] == runs[1]
+        assert runs[0]["reset"] > 0 and runs[0]["throttle"] > 0
+
+    def test_throttle_benches_pool_key(self, transport):
+        transport(FaultInjector(ok_transport, rates={"throttle": 1.0}, retry_after=30))
+        pool = KeyPool(["key-a"])
+
+        request = ApiRequest("https://x/pool", keys=pool)
+        assert handle_api_request("faults-test", request, 10) is None
+
+        assert pool.stats()[0]["throttled"] == 1
+        assert pool.acquire(timeout=0) is None
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match="rates must be among"):
+            FaultInjector(rates={"meteor": 0.1})
+        with pytest.raises(ValueError, match="sum to at most 1"):
+            FaultInjector(rates={"timeout": 0.6, "reset": 0.6})
+        with pytest.raises(ValueError, match="latency and jitter must be non-negative"):
+            FaultInjector(latency=-1)
+        with pytest.raises(ValueError, match="error_status must be a 5xx status"):
+            FaultInjector(error_status=404)
+
+
+class TestReplayTransport:
+    """Test suite for serving recorded payloads as a transport."""
+
+    def test_serves_recorded_payloads(self, transport, tmp_path):
+        archive = str(tmp_path / "run.jsonl.gz")
+        transport(ok_transport)
+        with record(archive):
+            handle_api_request("faults-test", ApiRequest("https://x/rec", {"a": 1}), 10)
+
+        transport(replay_transport(archive))
+        assert handle_api_request("faults-test", ApiRequest("https://x/rec", {"a": "1"}), 10) == {
+            "ok": 1
+        }
+        request = ApiRequest("https://x/other")
+        assert handle_api_request("faults-test", request, 10) is None
+        assert request.status_code == 404
+
+
+class TestFaultThroughput:
+    """Test suite for paginated calls under injected faults."""
+
+    def test_failed_chunks_are_missing_windows(self, transport, mock_llama_price_chart_response):
+        body = json.dumps(mock_llama_price_chart_response).encode("utf-8")
+        injector = FaultInjector(
+            lambda url, **_kwargs: _response(url, 200, body),
+            rates={"server_error": 0.4},
+            seed=3,
+        )
+        transport(injector)
+
+        result = llama_price_chart("ethereum:0xfaults", _START, 2500)
+
+        stats = injector.stats()
+        assert stats["requests"] == 5
+        assert 0 < stats["server_error"] < 5
+        assert len(result["missing_windows"]) == stats["server_error"]
@@ -0,0 +1,123 @@
+"""Unit tests for invutils.fx module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from invutils.fx import FxConverter, get_fx_converter, set_fx_converter
+from invutils.prices.coingecko import gecko_price_chart, gecko_price_current
+
+_HOUR = 3600
+
+
+@pytest.fixture
+def converter():
+    """Install an FxConverter for the duration of a test."""
+    conv = FxConverter("td-key")
+    set_fx_converter(conv)
+    yield conv
+    set_fx_converter(None)
+
+
+class TestFxConverter:
+    """Test suite for FxConverter rates and caching."""
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_rate_cached(self, mock_request, converter):
+        """Test that a current rate is fetched once per TTL."""
+        mock_request.return_value = {"price": "0.9"}
+        assert converter.rate("EUR") == 0.9
+        assert converter.rate("eur") == 0.9
+        assert mock_request.call_count == 1
+        assert mock_request.call_args[0][1].params["symbol"] == "USD/EUR"
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_inverted_pair(self, mock_request):
+        """Test that pairs quoted against USD are inverted."""
+        mock_request.return_value = {"price": "1.25"}
+        conv = FxConverter("td-key", pairs={"gbp": "GBP/USD"})
+        assert conv.rate("gbp") == pytest.approx(0.8)
+
+    def test_usd_is_identity(self, converter):
+        """Test that USD needs no request."""
+        assert converter.rate("usd") == 1.0
+        points = [{"timestamp": 1, "price": 2.0}]
+        assert converter.convert_points(points, "usd") is points
+
+    @patch("invutils.fx.FxConverter.series")
+    def test_convert_points_as_of(self, mock_series, converter):
+        """Test that each point uses the rate in force at its timestamp."""
+        from invutils.series import PriceSeries
+
+        mock_series.return_value = PriceSeries([0, 2 * _HOUR], [0.5, 0.25])
+        points = [{"timestamp": t * _HOUR, "price": 100.0, "volume": 10.0} for t in range(4)]
+        converted = converter.convert_points(points, "eur", fields=("price", "volume"))
+        assert [p["price"] for p in converted] == [50.0, 50.0, 25.0, 25.0]
+        assert converted[0]["volume"] == 5.0
+        assert points[0]["price"] == 100.0  # input untouched
+
+
+class TestGeckoFx:
+    """Test suite for the fx option on CoinGecko functions."""
+
+    def test_fx_without_converter(self):
+        """Test that fx=True without an installed converter is rejected."""
+        assert get_fx_converter() is None
+        with pytest.raises(ValueError, match="needs an FX converter"):
+            gecko_price_chart("bitcoin", vs_currency="eur", fx=True)
+
+    def test_fx_type(self):
+        with pytest.raises(TypeError, match="fx must be a boolean"):
+            gecko_price_current("bitcoin", fx="yes")
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_current_requests_usd_only(self, mock_gecko, mock_td, converter):
+        """Test that other currencies are derived from one USD request."""
+        mock_gecko.return_value = {"bitcoin": {"usd": 40000.0}}
+        mock_td.side_effect = lambda _api, req, _timeout: {
+            "USD/EUR": {"price": "0.9"}, "USD/JPY": {"price": "110"},
+        }[req.params["symbol"]]
+
+        result = gecko_price_current("bitcoin", vs_currencies="usd,eur,jpy", fx=True)
+
+        assert mock_gecko.call_args[0][1].params["vs_currencies"] == "usd"
+        assert {row["currency"]: row["price"] for row in result["data"]} == {
+            "usd": 40000.0, "eur": 36000.0, "jpy": 4400000.0,
+        }
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_chart_shares_usd_series(self, mock_gecko, mock_td, converter):
+        """Test that charts in several currencies reuse the USD series and FX series."""
+        base = 1700000000 - 1700000000 % _HOUR
+        mock_gecko.return_value = {
+            "prices": [[(base + i * _HOUR) * 1000, 100.0] for i in range(3)]
+        }
+        mock_td.return_value = {
+            "meta": {"exchange_timezone": "UTC"},
+            "values": [{"datetime": "2023-11-14 22:00:00", "open": "0.5", "high": "0.5",
+                        "low": "0.5", "close": "0.5"}],
+        }
+
+        eur = gecko_price_chart("bitcoin", vs_currency="eur", days=1, fx=True)
+        eur_again = gecko_price_chart("bitcoin", vs_currency="eur", days=1, fx=True)
+
+        assert mock_gecko.call_args[0][1].params["vs_currency"] == "usd"
+        assert mock_td.call_args[0][1].params["timezone"] == "UTC"
+        assert eur["currency"] == "eur"
+        assert [p["price"] for p in eur["data"]] == [50.0, 50.0, 50.0]
+        assert eur_again["data"] == eur["data"]
+        assert mock_td.call_count == 1
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_chart_without_fx_series_is_error(self, mock_gecko, mock_td, converter):
+        """Test that a missing FX series yields an error envelope."""
+        mock_gecko.return_value = {"prices": [[1700000000000, 100.0]]}
+        mock_td.return_value = None
+
+        result = gecko_price_chart("bitcoin", vs_currency="eur", days=1, fx=True)
+
+        assert result["status"] == "error"
+        assert result["data"] == []
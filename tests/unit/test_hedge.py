@@ -0,0 +1,180 @@
+"""Unit tests for invutils.utils.hedge module."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_current
+from invutils.prices.defillama import llama_price_historical
+from invutils.router import PriceRouter
+from invutils.utils import Hedger, get_hedger, set_hedger
+from invutils.utils.helpers import ApiRequest, handle_api_request
+
+
+def _slow(value, seconds):
+    def call():
+        time.sleep(seconds)
+        return value
+
+    return call
+
+
+class TestHedger:
+    """Test suite for Hedger delay, budget and winner selection."""
+
+    def test_delay_is_percentile_of_primary_latency(self):
+        hedger = Hedger(percentile=0.9, min_samples=10, min_delay=0.0)
+        for i in range(10):
+            hedger._record(i / 100)
+        assert hedger.delay() == pytest.approx(0.09)
+
+    def test_initial_delay_until_enough_samples(self):
+        hedger = Hedger(initial_delay=0.7, min_samples=5)
+        hedger._record(0.01)
+        assert hedger.delay() == 0.7
+
+    def test_fast_primary_is_not_hedged(self):
+        backup = Mock(return_value="backup")
+        hedger = Hedger(initial_delay=1.0)
+
+        assert hedger.run(lambda: "primary", backup) == "primary"
+        backup.assert_not_called()
+        assert hedger.stats()["hedged"] == 0
+
+    def test_slow_primary_loses_to_backup(self):
+        hedger = Hedger(initial_delay=0.02)
+
+        result = hedger.run(_slow("primary", 0.5), lambda: "backup")
+
+        assert result == "backup"
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_bad_first_answer_waits_for_other(self):
+        """Test that a failed backup does not beat a slow but good primary."""
+        hedger = Hedger(initial_delay=0.02)
+        assert hedger.run(_slow("primary", 0.1), lambda: None) == "primary"
+
+    def test_budget_limits_hedges(self):
+        """Test that hedges stop once the saved budget is spent."""
+        backup = Mock(return_value="backup")
+        hedger = Hedger(initial_delay=0.01, budget=0.0, burst=1)
+
+        hedger.run(_slow("primary", 0.05), backup)
+        hedger.run(_slow("primary", 0.05), backup)
+
+        assert backup.call_count == 1
+        assert hedger.stats()["skipped"] == 1
+
+    def test_can_hedge_veto(self):
+        backup = Mock(return_value="backup")
+        hedger = Hedger(initial_delay=0.01)
+
+        result = hedger.run(_slow("primary", 0.05), backup, can_hedge=lambda: False)
+
+        assert result == "primary"
+        backup.assert_not_called()
+
+    def test_invalid_percentile(self):
+        with pytest.raises(ValueError, match="percentile must be between 0 and 1"):
+            Hedger(percentile=1.5)
+
+
+class TestHedgedRequests:
+    """Test suite for hedge=True requests through handle_api_request."""
+
+    @pytest.fixture(autouse=True)
+    def fast_hedger(self):
+        set_hedger("hedge-test", Hedger(initial_delay=0.02))
+        yield
+        set_hedger("hedge-test", None)
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_duplicate_bypasses_coalescing(self, mock_get):
+        """Test that the hedge really reaches upstream rather than joining the slow call."""
+        fast, slow = Mock(), Mock()
+        fast.json.return_value = {"n": "fast"}
+        slow.json.return_value = {"n": "slow"}
+        release = threading.Event()
+        sends = []
+
+        def get(*args, **kwargs):
+            sends.append(1)
+            if len(sends) == 1:
+                release.wait(timeout=5)
+                return slow
+            return fast
+
+        mock_get.side_effect = get
+        request = ApiRequest("https://api.example/price", params={"ids": "x"}, hedge=True)
+
+        result = handle_api_request("hedge-test", request, 10)
+        release.set()
+
+        assert result == {"n": "fast"}
+        assert len(sends) == 2
+        assert get_hedger("hedge-test").stats()["hedge_wins"] == 1
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_unhedged_request_sent_once(self, mock_get):
+        response = Mock()
+        response.json.return_value = {"n": 1}
+
+        def get(*args, **kwargs):
+            time.sleep(0.05)
+            return response
+
+        mock_get.side_effect = get
+        assert handle_api_request("hedge-test", ApiRequest("https://api.example/p"), 10) == {"n": 1}
+        assert mock_get.call_count == 1
+
+    def test_with_headers_keeps_hedge(self):
+        assert ApiRequest("https://x", hedge=True).with_headers({"k": "v"}).hedge is True
+
+
+class TestPriceFunctionHedge:
+    """Test suite for the hedge option on price functions."""
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_gecko_current_marks_request(self, mock_request):
+        mock_request.return_value = {"bitcoin": {"usd": 1.0}}
+        gecko_price_current("bitcoin", hedge=True)
+        assert mock_request.call_args[0][1].hedge is True
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_historical_marks_request(self, mock_request):
+        mock_request.return_value = {"coins": {}}
+        llama_price_historical("coingecko:bitcoin", hedge=True)
+        assert mock_request.call_args[0][1].hedge is True
+
+    def test_hedge_type(self):
+        with pytest.raises(TypeError, match="hedge must be a boolean"):
+            gecko_price_current("bitcoin", hedge="yes")
+        with pytest.raises(TypeError, match="hedge must be a boolean"):
+            llama_price_historical("coingecko:bitcoin", hedge=1)
+
+
+class TestRouterHedge:
+    """Test suite for cross-provider hedging in PriceRouter."""
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_slow_provider_hedged_with_runner_up(self, mock_gecko, mock_llama):
+        def slow_gecko(*args, **kwargs):
+            time.sleep(0.3)
+            return {"source": "coingecko", "fetched_at": 0, "status": "success",
+                    "count": 1, "data": [{"price": 1.0}]}
+
+        mock_gecko.side_effect = slow_gecko
+        mock_llama.return_value = {"source": "defillama", "fetched_at": 0, "status": "success",
+                                   "count": 1, "data": [{"price": 1.0}]}
+        router = PriceRouter()
+        router._hedger = Hedger(initial_delay=0.02)
+
+        result = router.current("ethereum", hedge=True)
+
+        assert result["source"] == "defillama"
+        assert router.hedge_stats()["hedge_wins"] == 1
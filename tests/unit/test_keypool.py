@@ -0,0 +1,144 @@
+"""Unit tests for invutils.utils.keypool module."""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_current
+from invutils.prices.twelvedata import twelvedata_price_current
+from invutils.utils import ApiRequest, KeyPool, handle_api_request, set_proxy
+
+
+def _response(status, body=None, headers=None):
+    return Mock(status_code=status, headers=headers or {}, json=Mock(return_value=body or {}))
+
+
+class TestKeyPool:
+    """Test suite for key rotation, limits and benching."""
+
+    def test_spreads_across_keys(self):
+        pool = KeyPool(["key-a", "key-b"])
+        keys = [pool.acquire() for _ in range(4)]
+        assert sorted(keys) == ["key-a", "key-a", "key-b", "key-b"]
+
+    def test_per_key_rate_limit(self):
+        pool = KeyPool(["key-a", "key-b"], calls=1, period=3600)
+        assert {pool.acquire(), pool.acquire()} == {"key-a", "key-b"}
+        assert pool.acquire(timeout=0.02) is None
+
+    def test_daily_quota_does_not_wait(self):
+        pool = KeyPool(["key-a"], daily_quota=1)
+        assert pool.acquire() == "key-a"
+        started = time.monotonic()
+        assert pool.acquire() is None
+        assert time.monotonic() - started < 0.5
+        assert pool.stats()[0]["quota_left"] == 0
+
+    def test_429_benches_key(self):
+        pool = KeyPool(["key-a", "key-b"], bench=60)
+        pool.report("key-a", 429)
+        assert [pool.acquire() for _ in range(3)] == ["key-b"] * 3
+        assert pool.stats()[0]["throttled"] == 1
+        assert pool.stats()[0]["benched_for"] > 50
+
+    def test_retry_after_sets_bench(self):
+        pool = KeyPool(["key-a"], bench=3600)
+        pool.report("key-a", 429, retry_after=0.05)
+        assert pool.acquire(timeout=1.0) == "key-a"
+
+    def test_rejected_key_is_not_waited_for(self):
+        pool = KeyPool(["key-a"])
+        pool.report("key-a", 401)
+        assert pool.acquire() is None
+        assert pool.stats()[0]["rejected"] == 1
+
+    def test_stats_mask_keys(self):
+        pool = KeyPool(["secret-1234"])
+        assert pool.stats()[0]["key"] == "...1234"
+        assert "secret" not in repr(pool)
+
+    def test_invalid_keys(self):
+        with pytest.raises(ValueError, match="non-empty sequence"):
+            KeyPool("key-a")
+        with pytest.raises(ValueError, match="duplicates"):
+            KeyPool(["key-a", "key-a"])
+        with pytest.raises(ValueError, match="daily_quota must be positive"):
+            KeyPool(["key-a"], daily_quota=0)
+
+
+class TestPooledRequests:
+    """Test suite for requests sent with a key from a pool."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_resends_with_next_key_on_429(self, mock_get):
+        mock_get.side_effect = [_response(429), _response(200, {"ok": 1})]
+        pool = KeyPool(["key-a", "key-b"])
+
+        request = ApiRequest("https://x/pool", keys=pool)
+        result = handle_api_request("keypool-test", request, 10)
+
+        assert result == {"ok": 1}
+        sent = [call.kwargs["params"]["apikey"] for call in mock_get.call_args_list]
+        assert sorted(sent) == ["key-a", "key-b"]
+        assert sum(key["throttled"] for key in pool.stats()) == 1
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_in_body_codes_bench_keys(self, mock_get):
+        """Test that Twelve Data's HTTP 200 quota and bad-key bodies bench the key."""
+        mock_get.side_effect = [
+            _response(200, {"code": 429, "status": "error", "message": "run out of credits"}),
+            _response(200, {"code": 401, "status": "error", "message": "invalid api key"}),
+        ]
+        pool = KeyPool(["key-a", "key-b"])
+
+        request = ApiRequest("https://x/body", keys=pool)
+        handle_api_request("keypool-test", request, 10)
+
+        stats = pool.stats()
+        assert sum(key["throttled"] for key in stats) == 1
+        assert sum(key["rejected"] for key in stats) == 1
+        assert pool.acquire(timeout=0) is None
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_no_usable_key_sends_nothing(self, mock_get):
+        pool = KeyPool(["key-a"])
+        pool.report("key-a", 403)
+        request = ApiRequest("https://x/none", keys=pool)
+        assert handle_api_request("keypool-test", request, 10) is None
+        mock_get.assert_not_called()
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_gecko_batches_rotate_keys(self, mock_get):
+        mock_get.return_value = _response(200, {})
+        pool = KeyPool(["key-a", "key-b"])
+        ids = ",".join(f"coin-{i:04d}" for i in range(400))
+
+        gecko_price_current(ids, api_key=pool)
+
+        sent = {call.kwargs["headers"]["x-cg-demo-api-key"] for call in mock_get.call_args_list}
+        assert mock_get.call_count > 1
+        assert sent == {"key-a", "key-b"}
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_twelvedata_accepts_pool(self, mock_handle_api):
+        mock_handle_api.return_value = {"price": "129.41"}
+        pool = KeyPool(["key-a"])
+
+        result = twelvedata_price_current("AAPL", pool)
+
+        request = mock_handle_api.call_args.args[1]
+        assert result["status"] == "success"
+        assert request.keys is pool
+        assert "apikey" not in request.params
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_pool_is_not_sent_to_proxy(self, mock_handle_api):
+        """Test that a call with a KeyPool runs locally when a proxy is configured."""
+        mock_handle_api.return_value = {"price": "1.0"}
+        set_proxy("http://127.0.0.1:9")
+        try:
+            result = twelvedata_price_current("AAPL", KeyPool(["key-a"]))
+        finally:
+            set_proxy(None)
+        assert result["status"] == "success"
@@ -0,0 +1,181 @@
+"""Unit tests for invutils.utils.negcache module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_chart, gecko_price_current
+from invutils.prices.defillama import llama_price_chart, llama_price_historical
+from invutils.utils import ResponseCache, set_response_cache, set_transport
+from invutils.utils.faults import _response
+from invutils.utils.negcache import NegativeCache, get_negative_cache, set_negative_cache
+
+
+@pytest.fixture
+def negcache():
+    """Install a fresh negative cache for the duration of a test."""
+    cache = NegativeCache(ttl=60)
+    set_negative_cache(cache)
+    yield cache
+    set_negative_cache(None)
+
+
+class TestNegativeCache:
+    """Test suite for the NegativeCache container."""
+
+    def test_add_and_contains(self):
+        """Test that entries match on provider, id and range."""
+        cache = NegativeCache()
+        cache.add("defillama", "ethereum:0xdead", "1d:100:5")
+        assert cache.contains("defillama", "ethereum:0xdead", "1d:100:5")
+        assert not cache.contains("defillama", "ethereum:0xdead", "1d:100:6")
+        assert not cache.contains("coingecko", "ethereum:0xdead", "1d:100:5")
+
+    def test_empty_range_covers_every_range(self):
+        """Test that an unknown-id entry matches any range."""
+        cache = NegativeCache()
+        cache.add("coingecko", "not-a-coin")
+        assert cache.contains("coingecko", "not-a-coin", "usd:30")
+
+    @patch("invutils.utils.negcache.time")
+    def test_entries_expire(self, mock_time):
+        """Test that entries stop matching after the TTL."""
+        mock_time.time.return_value = 1000.0
+        cache = NegativeCache(ttl=10)
+        cache.add("coingecko", "x", "current")
+        mock_time.time.return_value = 1011.0
+        assert not cache.contains("coingecko", "x", "current")
+        assert cache.entries() == []
+
+    @patch("invutils.utils.negcache.time")
+    def test_full_cache_sweeps_expired_then_oldest(self, mock_time):
+        """Test that max_entries bounds the cache, expired entries going first."""
+        mock_time.time.return_value = 1000.0
+        cache = NegativeCache(ttl=10, max_entries=2)
+        cache.add("coingecko", "a", "current")
+        mock_time.time.return_value = 1005.0
+        cache.add("coingecko", "b", "current")
+        mock_time.time.return_value = 1011.0
+        cache.add("coingecko", "c", "current")
+        assert cache.stats()["entries"] == 2
+        assert not cache.contains("coingecko", "a", "current")
+
+        cache.add("coingecko", "d", "current")
+        assert cache.stats()["entries"] == 2
+        assert {e["id"] for e in cache.entries()} == {"c", "d"}
+
+        with pytest.raises(ValueError, match="max_entries must be at least 1"):
+            NegativeCache(max_entries=0)
+
+    def test_entries_and_clear(self):
+        """Test listing and selective clearing."""
+        cache = NegativeCache()
+        cache.add("coingecko", "a", "current")
+        cache.add("coingecko", "b", "current")
+        cache.add("defillama", "a", "1700000000")
+        assert {(e["provider"], e["id"]) for e in cache.entries()} == {
+            ("coingecko", "a"), ("coingecko", "b"), ("defillama", "a"),
+        }
+        assert cache.clear(id="a") == 2
+        assert cache.clear() == 1
+        assert cache.stats() == {"entries": 0, "hits": 0}
+
+    def test_install(self, negcache):
+        """Test that set_negative_cache installs the instance."""
+        assert get_negative_cache() is negcache
+
+
+class TestPriceFunctionsShortCircuit:
+    """Test that price functions record and skip known-empty ids."""
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_chart_empty_skips_pagination_and_fallback(self, mock_request, negcache):
+        """Test that a known-empty chart makes no requests on the second call."""
+        mock_request.return_value = {"coins": {}}
+        first = llama_price_chart("ethereum:0xdead", 1609459200, 1000, fallback_chain="arbitrum")
+        assert first["status"] == "error"
+        assert mock_request.call_count == 4  # two pages each for primary and fallback
+
+        second = llama_price_chart("ethereum:0xdead", 1609459200, 1000, fallback_chain="arbitrum")
+        assert second["status"] == "error"
+        assert mock_request.call_count == 4
+        assert negcache.stats()["hits"] == 2
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_chart_failure_not_recorded(self, mock_request, negcache):
+        """Test that a failed page does not mark the id as empty."""
+        mock_request.side_effect = [None, {"coins": {}}]
+        llama_price_chart("ethereum:0xdead", 1609459200, 1000)
+        assert negcache.entries() == []
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_historical_drops_missing_ids(self, mock_request, negcache):
+        """Test that ids absent from a response are left out of the next request."""
+        mock_request.return_value = {"coins": {"coingecko:ethereum": {"price": 2500.0}}}
+        llama_price_historical("coingecko:ethereum,coingecko:nope", 1700000000)
+        llama_price_historical("coingecko:ethereum,coingecko:nope", 1700000000)
+        second_url = mock_request.call_args_list[1][0][1].url
+        assert "coingecko:nope" not in second_url
+        assert "coingecko:ethereum" in second_url
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_current_uses_stable_range(self, mock_request, negcache):
+        """Test that current-price misses are keyed on 'current', not the call time."""
+        mock_request.return_value = {"coins": {}}
+        llama_price_historical("coingecko:nope")
+        assert [e["range"] for e in negcache.entries()] == ["current"]
+
+        llama_price_historical("coingecko:nope")
+        assert mock_request.call_count == 1
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_gecko_current_all_known_empty(self, mock_request, negcache):
+        """Test that a call for only known-empty ids makes no request."""
+        mock_request.return_value = {"bitcoin": {"usd": 45000.0}}
+        gecko_price_current("bitcoin,not-a-coin")
+        mock_request.reset_mock()
+        result = gecko_price_current("not-a-coin")
+        assert result["status"] == "error"
+        mock_request.assert_not_called()
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_gecko_chart_404_records_unknown_id(self, mock_request, negcache):
+        """Test that an HTTP 404 marks the id unknown for every range."""
+
+        def not_found(api_name, request, timeout):
+            request.status_code = 404
+            return None
+
+        mock_request.side_effect = not_found
+        gecko_price_chart("not-a-coin", days=30)
+        result = gecko_price_chart("not-a-coin", days=365)
+        assert result["status"] == "error"
+        assert mock_request.call_count == 1
+
+    def test_gecko_chart_404_recorded_through_response_cache(self, negcache, tmp_path):
+        """Test that a 404 fetched on the response-cache path still marks the id unknown."""
+        calls = []
+
+        def not_found(url, **_kwargs):
+            calls.append(url)
+            return _response(url, 404, b'{"error": "coin not found"}')
+
+        set_response_cache(ResponseCache(str(tmp_path / "cache.sqlite")))
+        set_transport(not_found)
+        try:
+            gecko_price_chart("not-a-coin", days=30)
+            gecko_price_chart("not-a-coin", days=30)
+        finally:
+            set_transport(None)
+            set_response_cache(None)
+
+        assert len(calls) == 1
+        assert negcache.contains("coingecko", "not-a-coin")
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_gecko_chart_timeout_not_recorded(self, mock_request, negcache):
+        """Test that transient failures are retried on the next call."""
+        mock_request.return_value = None
+        gecko_price_chart("bitcoin", days=30)
+        gecko_price_chart("bitcoin", days=30)
+        assert mock_request.call_count == 2
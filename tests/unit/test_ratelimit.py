@@ -0,0 +1,58 @@
+"""Unit tests for invutils.utils.ratelimit module."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.utils.helpers import handle_api_request
+from invutils.utils.ratelimit import RateLimiter, get_rate_limiter, set_rate_limit
+
+
+class TestRateLimiter:
+    """Test suite for the token-bucket RateLimiter."""
+
+    def test_invalid_arguments(self):
+        """Test that non-positive rates are rejected."""
+        with pytest.raises(ValueError, match="calls must be positive"):
+            RateLimiter(0, 60)
+        with pytest.raises(ValueError, match="period must be positive"):
+            RateLimiter(1, 0)
+
+    def test_burst_then_empty(self):
+        """Test that the bucket allows a burst and then refuses."""
+        limiter = RateLimiter(3, 60)
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_acquire_timeout(self):
+        """Test that acquire gives up after the timeout."""
+        limiter = RateLimiter(1, 60)
+        assert limiter.acquire() is True
+        assert limiter.acquire(timeout=0.01) is False
+
+    def test_acquire_waits_for_refill(self):
+        """Test that acquire blocks until a token refills."""
+        limiter = RateLimiter(100, 1, burst=1)
+        limiter.acquire()
+        assert limiter.acquire(timeout=1) is True
+        assert limiter.stats()["waited"] > 0
+
+    def test_registry_applied_by_handle_api_request(self):
+        """Test that a configured limit is consumed per upstream request."""
+        response = Mock()
+        response.json.return_value = {}
+        set_rate_limit("limited", 2, 60)
+        try:
+            handle_api_request("limited", lambda: response, 10)
+            assert get_rate_limiter("limited").stats()["acquired"] == 1
+        finally:
+            set_rate_limit("limited", None)
+        assert get_rate_limiter("limited") is None
+
+    @patch("invutils.utils.helpers.time")
+    def test_unlimited_provider_untouched(self, mock_time):
+        """Test that providers without a limit are not throttled."""
+        response = Mock()
+        response.json.return_value = {}
+        for _ in range(50):
+            handle_api_request("unlimited", lambda: response, 10)
+        mock_time.sleep.assert_not_called()
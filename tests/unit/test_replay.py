@@ -0,0 +1,153 @@
+"""Unit tests for invutils.replay and invutils.utils.cassette."""
+
+import gzip
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from invutils.cli import main
+from invutils.prices.defillama import llama_price_chart
+from invutils.prices.twelvedata import twelvedata_price_current
+from invutils.replay import record, replay, warm_cache
+from invutils.utils import (
+    ApiRequest,
+    Cassette,
+    ResponseCache,
+    handle_api_request,
+    set_response_cache,
+)
+
+LLAMA_ID = "ethereum:0x0000000000000000000000000000000000000000"
+_START = 1640908800
+
+
+def make_response(body, status=200):
+    response = Mock(status_code=status, text=json.dumps(body), headers={})
+    response.json.side_effect = lambda: json.loads(response.text)
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return str(tmp_path / "run.jsonl.gz")
+
+
+class TestRecordReplay:
+    """Test suite for recording responses and replaying them offline."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_round_trip(self, mock_get, archive, mock_llama_price_chart_response):
+        """Test that a replayed call returns the recorded data without the network."""
+        mock_get.return_value = make_response(mock_llama_price_chart_response)
+        with record(archive) as cassette:
+            recorded = llama_price_chart(LLAMA_ID, _START, 3)
+        assert cassette.stats()["recorded"] == 1
+
+        mock_get.reset_mock()
+        mock_get.side_effect = AssertionError("network used during replay")
+        with replay(archive) as cassette:
+            replayed = llama_price_chart(LLAMA_ID, _START, 3)
+
+        mock_get.assert_not_called()
+        assert replayed["data"] == recorded["data"]
+        assert cassette.stats()["hits"] == 1
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_recorded_failure_replays_as_failure(self, mock_get, archive):
+        mock_get.return_value = make_response({"error": "down"}, status=502)
+        with record(archive):
+            handle_api_request("defillama", ApiRequest("https://x/fail"), 10)
+
+        request = ApiRequest("https://x/fail")
+        with replay(archive):
+            assert handle_api_request("defillama", request, 10) is None
+        assert request.status_code == 502
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_strict_miss_is_not_sent(self, mock_get, archive):
+        Cassette(archive, mode="record").save()
+        with replay(archive) as cassette:
+            assert handle_api_request("defillama", ApiRequest("https://x/new"), 10) is None
+        mock_get.assert_not_called()
+        assert cassette.stats()["misses"] == 1
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_lenient_miss_is_sent(self, mock_get, archive):
+        Cassette(archive, mode="record").save()
+        mock_get.return_value = make_response({"ok": 1})
+        with replay(archive, strict=False):
+            assert handle_api_request("defillama", ApiRequest("https://x/new"), 10) == {"ok": 1}
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_archive_is_compressed_without_keys(self, mock_get, archive):
+        mock_get.return_value = make_response({"price": "129.41"})
+        with record(archive):
+            twelvedata_price_current("AAPL", "secret-api-key")
+
+        with gzip.open(archive, "rt") as f:
+            content = f.read()
+        assert "129.41" in content
+        assert "secret-api-key" not in content
+
+        with replay(archive):
+            assert twelvedata_price_current("AAPL", "another-key")["data"][0]["price"] == 129.41
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_recording_appends(self, mock_get, archive):
+        mock_get.return_value = make_response({"ok": 1})
+        with record(archive):
+            handle_api_request("defillama", ApiRequest("https://x/a"), 10)
+        with record(archive):
+            handle_api_request("defillama", ApiRequest("https://x/b"), 10)
+        assert len(Cassette(archive)) == 2
+
+    def test_invalid_cassettes(self, archive):
+        with pytest.raises(FileNotFoundError, match="no cassette"):
+            Cassette(archive)
+        with pytest.raises(ValueError, match="mode must be one of"):
+            Cassette(archive, mode="rewind")
+
+
+class TestWarmCache:
+    """Test suite for loading archived responses into the response cache."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_warmed_cache_serves_requests(self, mock_get, archive, tmp_path):
+        mock_get.return_value = make_response({"ok": 1})
+        with record(archive):
+            handle_api_request("defillama", ApiRequest("https://x/warm"), 10)
+        mock_get.reset_mock()
+
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        assert warm_cache(archive, cache) == 1
+        set_response_cache(cache)
+        try:
+            assert handle_api_request("defillama", ApiRequest("https://x/warm"), 10) == {"ok": 1}
+        finally:
+            set_response_cache(None)
+        mock_get.assert_not_called()
+
+
+class TestFetchReplay:
+    """Test suite for invutils fetch --record / --replay."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_fetch_replays_offline(self, mock_get, tmp_path, archive,
+                                   mock_llama_price_chart_response):
+        mock_get.return_value = make_response(mock_llama_price_chart_response)
+        manifest = tmp_path / "m.jsonl"
+        manifest.write_text(json.dumps(
+            {"provider": "defillama", "id": LLAMA_ID, "range": 3, "start": _START}
+        ) + "\n")
+
+        assert main(["fetch", str(manifest), "-o", str(tmp_path / "a.jsonl"), "-q",
+                     "--record", archive]) == 0
+        mock_get.side_effect = AssertionError("network used during replay")
+        assert main(["fetch", str(manifest), "-o", str(tmp_path / "b.jsonl"), "-q",
+                     "--replay", archive]) == 0
+
+        assert (tmp_path / "a.jsonl").read_text() == (tmp_path / "b.jsonl").read_text()
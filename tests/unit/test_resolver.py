@@ -0,0 +1,177 @@
+"""Unit tests for invutils.resolver module."""
+
+import json
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_current
+from invutils.prices.defillama import llama_price_historical
+from invutils.resolver import CoinResolver, resolve_ids, set_resolver
+
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+    {"id": "osmosis-allbtc", "symbol": "btc", "name": "Osmosis allBTC", "platforms": {}},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "platforms": {}},
+    {
+        "id": "dai",
+        "symbol": "dai",
+        "name": "Dai",
+        "platforms": {"ethereum": DAI, "arbitrum-one": DAI.upper().replace("0X", "0x"), "": ""},
+    },
+]
+MARKETS = ["bitcoin", "ethereum", "dai"]
+
+
+def seed(cache_dir, **lists):
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    for name, data in lists.items():
+        (Path(cache_dir) / f"{name}.json").write_text(json.dumps(data))
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    """Resolver whose CoinGecko lists are already cached on disk."""
+    seed(str(tmp_path), coingecko_coins=COINS, coingecko_markets=MARKETS)
+    return CoinResolver(cache_dir=str(tmp_path))
+
+
+class TestCoinResolver:
+    """Test suite for CoinResolver lookups."""
+
+    @patch("invutils.resolver.handle_api_request")
+    def test_uses_fresh_disk_cache(self, mock_handle_api, resolver):
+        """Test that cached lists are used without any request."""
+        assert resolver.gecko_id("ETH") == "ethereum"
+        mock_handle_api.assert_not_called()
+
+    def test_symbol_ranked_by_market_cap(self, resolver):
+        """Test that shared symbols resolve to the best-ranked coin."""
+        assert resolver.gecko_ids("btc") == ["bitcoin", "osmosis-allbtc"]
+        assert resolver.gecko_id("BTC") == "bitcoin"
+
+    def test_known_id_passes_through(self, resolver):
+        """Test that an existing CoinGecko id is not reinterpreted."""
+        assert resolver.gecko_id("dai") == "dai"
+
+    def test_prefer_overrides(self, tmp_path):
+        """Test that explicit preferences win over ranking."""
+        seed(str(tmp_path), coingecko_coins=COINS, coingecko_markets=MARKETS)
+        resolver = CoinResolver(cache_dir=str(tmp_path), prefer={"BTC": "osmosis-allbtc"})
+        assert resolver.gecko_id("btc") == "osmosis-allbtc"
+
+    def test_address_to_chains(self, resolver):
+        """Test that contract addresses index to DefiLlama chain prefixes, case-insensitively."""
+        assert resolver.chains(DAI.upper().replace("0X", "0x")) == ["ethereum", "arbitrum"]
+
+    def test_llama_id(self, resolver):
+        """Test DefiLlama id resolution."""
+        assert resolver.llama_id("eth") == "coingecko:ethereum"
+        assert resolver.llama_id("ethereum:0xabc") == "ethereum:0xabc"
+        assert resolver.llama_id("nope") is None
+
+    def test_unknown_symbols_left_untouched(self, resolver):
+        """Test that resolve keeps entries it cannot map."""
+        assert resolver.resolve("coingecko", "btc,mystery-coin") == "bitcoin,mystery-coin"
+
+    @patch("invutils.resolver.handle_api_request")
+    def test_downloads_and_caches_when_stale(self, mock_handle_api, tmp_path):
+        """Test that expired lists are downloaded once and written to disk."""
+        seed(str(tmp_path), coingecko_coins=[], coingecko_markets=[])
+        old = time.time() - 10
+        for name in ("coingecko_coins", "coingecko_markets"):
+            os.utime(tmp_path / f"{name}.json", (old, old))
+        mock_handle_api.side_effect = [COINS, [{"id": m} for m in MARKETS]]
+
+        resolver = CoinResolver(cache_dir=str(tmp_path), ttl=1)
+        assert resolver.gecko_id("eth") == "ethereum"
+        assert mock_handle_api.call_count == 2
+        assert json.loads((tmp_path / "coingecko_coins.json").read_text()) == COINS
+
+    @patch("invutils.resolver.handle_api_request")
+    def test_failed_download_keeps_stale_copy(self, mock_handle_api, tmp_path):
+        """Test that a failed refresh falls back to the stale cached list."""
+        seed(str(tmp_path), coingecko_coins=COINS, coingecko_markets=MARKETS)
+        mock_handle_api.return_value = None
+
+        resolver = CoinResolver(cache_dir=str(tmp_path), ttl=0)
+        assert resolver.gecko_id("eth") == "ethereum"
+
+    @patch("invutils.resolver.handle_api_request")
+    def test_lists_reloaded_after_ttl(self, mock_handle_api, tmp_path):
+        """Test that a long-lived resolver downloads its lists again once they expire."""
+        seed(str(tmp_path), coingecko_coins=[], coingecko_markets=[])
+        mock_handle_api.side_effect = [COINS, [{"id": m} for m in MARKETS]]
+
+        resolver = CoinResolver(cache_dir=str(tmp_path), ttl=0.1)
+        assert resolver.gecko_id("eth") is None
+        mock_handle_api.assert_not_called()
+
+        time.sleep(0.15)
+        assert resolver.gecko_id("eth") == "ethereum"
+        assert resolver.gecko_id("btc") == "bitcoin"
+        assert mock_handle_api.call_count == 2
+
+    @patch("invutils.resolver.handle_api_request")
+    def test_failed_first_load_is_retried(self, mock_handle_api, tmp_path):
+        """Test that lists that could not be loaded are downloaded again after the backoff."""
+        mock_handle_api.return_value = None
+
+        resolver = CoinResolver(cache_dir=str(tmp_path), retry=60)
+        assert resolver.gecko_id("eth") is None
+        assert resolver.gecko_id("eth") is None
+        assert mock_handle_api.call_count == 2
+
+        mock_handle_api.side_effect = [COINS, [{"id": m} for m in MARKETS]]
+        resolver._refresh_at = 0.0
+        assert resolver.gecko_id("eth") == "ethereum"
+        assert mock_handle_api.call_count == 4
+
+    def test_twelvedata_symbols(self, tmp_path):
+        """Test Twelve Data symbol canonicalization."""
+        seed(
+            str(tmp_path),
+            coingecko_coins=[],
+            coingecko_markets=[],
+            twelvedata_stocks=["AAPL"],
+            twelvedata_etf=["VTI"],
+            twelvedata_forex_pairs=["EUR/USD"],
+            twelvedata_cryptocurrencies=["BTC/USD"],
+        )
+        resolver = CoinResolver(cache_dir=str(tmp_path), twelvedata_api_key="k")
+        assert resolver.twelvedata_symbol("eur/usd") == "EUR/USD"
+        assert resolver.twelvedata_symbol("ZZZZ") is None
+
+
+class TestPriceFunctionsAcceptSymbols:
+    """Test that price functions resolve symbols when a resolver is installed."""
+
+    @pytest.fixture(autouse=True)
+    def _install(self, resolver):
+        set_resolver(resolver)
+        yield
+        set_resolver(None)
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_gecko_symbols(self, mock_handle_api, mock_gecko_price_current_response):
+        """Test that tickers are sent to CoinGecko as ids."""
+        mock_handle_api.return_value = mock_gecko_price_current_response
+        gecko_price_current("BTC,ETH")
+        assert mock_handle_api.call_args[0][1].params["ids"] == "bitcoin,ethereum"
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_llama_symbols(self, mock_handle_api):
+        """Test that tickers are sent to DefiLlama as coingecko:<id>."""
+        mock_handle_api.return_value = None
+        llama_price_historical("ETH", timestamp=1640908800)
+        assert mock_handle_api.call_args[0][1].url.endswith("/1640908800/coingecko:ethereum")
+
+    def test_no_resolver_is_noop(self):
+        """Test that ids are untouched when no resolver is installed."""
+        set_resolver(None)
+        assert resolve_ids("coingecko", "BTC") == "BTC"
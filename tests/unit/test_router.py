@@ -0,0 +1,231 @@
+"""Unit tests for invutils.router module."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from invutils.router import PriceRouter, ProviderHealth, consensus_price
+from invutils.utils import get_rate_limiter, set_rate_limit
+
+
+def _envelope(source, status="success", data=None):
+    data = data if data is not None else ([{"price": 1.0}] if status == "success" else [])
+    return {"source": source, "fetched_at": 0, "status": status, "count": len(data), "data": data}
+
+
+class TestProviderHealth:
+    """Test suite for rolling provider statistics."""
+
+    def test_error_rate_and_latency(self):
+        health = ProviderHealth(window=4)
+        health.record(0.2, True)
+        health.record(0.4, True)
+        health.record(5.0, False)
+        assert health.error_rate == pytest.approx(1 / 3)
+        assert health.latency == pytest.approx(0.3)
+
+    def test_window_forgets_old_calls(self):
+        health = ProviderHealth(window=2)
+        health.record(1.0, False)
+        health.record(1.0, True)
+        health.record(1.0, True)
+        assert health.error_rate == 0.0
+
+
+class TestPriceRouterIds:
+    """Test suite for per-provider id mapping."""
+
+    def test_gecko_id_maps_to_llama(self):
+        router = PriceRouter()
+        assert router.ids_for("ethereum") == {
+            "coingecko": "ethereum", "defillama": "coingecko:ethereum",
+        }
+
+    def test_address_goes_to_defillama_only(self):
+        router = PriceRouter()
+        assert router.ids_for("ethereum:0xabc") == {"defillama": "ethereum:0xabc"}
+
+    def test_twelvedata_needs_key(self):
+        providers = ("coingecko", "twelvedata")
+        assert "twelvedata" not in PriceRouter(providers).ids_for("x", {"twelvedata": "BTC/USD"})
+        keyed = PriceRouter(providers, api_keys={"twelvedata": "k"})
+        assert keyed.ids_for("x", {"twelvedata": "BTC/USD"})["twelvedata"] == "BTC/USD"
+
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError, match="providers must be among"):
+            PriceRouter(("coinbase",))
+
+
+class TestPriceRouterRouting:
+    """Test suite for provider choice and failover."""
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_fails_over(self, mock_gecko, mock_llama):
+        """Test that an error from the first provider moves on to the next."""
+        mock_gecko.return_value = _envelope("coingecko", "error")
+        mock_llama.return_value = _envelope("defillama")
+
+        result = PriceRouter().current("ethereum")
+
+        assert result["source"] == "defillama"
+        assert [a["provider"] for a in result["attempts"]] == ["coingecko", "defillama"]
+        mock_llama.assert_called_once_with("coingecko:ethereum")
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_unhealthy_provider_demoted(self, mock_gecko, mock_llama):
+        """Test that a failing provider is tried last on later calls."""
+        mock_gecko.return_value = _envelope("coingecko", "error")
+        mock_llama.return_value = _envelope("defillama")
+        router = PriceRouter()
+        router.current("ethereum")
+        mock_gecko.reset_mock()
+
+        result = router.current("ethereum")
+
+        assert [a["provider"] for a in result["attempts"]] == ["defillama"]
+        mock_gecko.assert_not_called()
+        assert router.health()["coingecko"]["error_rate"] == 1.0
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_throttled_provider_skipped_first(self, mock_gecko, mock_llama):
+        """Test that a provider with no rate-limit tokens left is ranked after one with tokens."""
+        mock_llama.return_value = _envelope("defillama")
+        set_rate_limit("coingecko", 1, 3600)
+        try:
+            get_rate_limiter("coingecko").try_acquire()
+            result = PriceRouter().current("ethereum")
+        finally:
+            set_rate_limit("coingecko", None)
+
+        assert result["source"] == "defillama"
+        mock_gecko.assert_not_called()
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_all_fail(self, mock_gecko, mock_llama):
+        mock_gecko.return_value = _envelope("coingecko", "error")
+        mock_llama.return_value = _envelope("defillama", "error")
+
+        result = PriceRouter().current("ethereum")
+
+        assert result["status"] == "error"
+        assert len(result["attempts"]) == 2
+
+    @patch("invutils.router.twelvedata_price_historical")
+    def test_chart_twelvedata_rows_get_price(self, mock_td):
+        mock_td.return_value = _envelope(
+            "twelvedata", data=[{"timestamp": 1609459200, "datetime": "2021-01-01", "close": 1.2}]
+        )
+        router = PriceRouter(("twelvedata",), api_keys={"twelvedata": "k"})
+
+        result = router.chart("EUR/USD", 1609459200, 1612137600, ids={"twelvedata": "EUR/USD"})
+
+        assert result["data"][0]["price"] == 1.2
+        assert mock_td.call_args.kwargs["epoch"] is True
+        assert mock_td.call_args.kwargs["timezone"] == "UTC"
+        assert mock_td.call_args.kwargs["start_date"] == "2021-01-01 00:00:00"
+        assert mock_td.call_args.kwargs["end_date"] == "2021-02-01 00:00:00"
+
+    @patch("invutils.router.twelvedata_price_historical")
+    def test_chart_twelvedata_long_range_is_windowed(self, mock_td):
+        hour = 3600
+        start, end = 1609459200, 1609459200 + 12000 * hour
+        no_data = {**_envelope("twelvedata", "error"), "message": "No data is available"}
+        mock_td.side_effect = [
+            no_data,
+            _envelope("twelvedata", data=[
+                {"timestamp": start + 5001 * hour, "close": 2.5},
+                {"timestamp": start + 5000 * hour, "close": 2.0},
+            ]),
+            _envelope("twelvedata", data=[{"timestamp": end, "close": 3.0}]),
+        ]
+        router = PriceRouter(("twelvedata",), api_keys={"twelvedata": "k"})
+
+        result = router.chart("EUR/USD", start, end, granularity="hourly",
+                              ids={"twelvedata": "EUR/USD"})
+
+        windows = [(c.kwargs["start_date"], c.kwargs["end_date"]) for c in mock_td.call_args_list]
+        assert windows == [
+            ("2021-01-01 00:00:00", "2021-07-28 07:00:00"),
+            ("2021-07-28 08:00:00", "2022-02-21 15:00:00"),
+            ("2022-02-21 16:00:00", "2022-05-16 00:00:00"),
+        ]
+        assert result["status"] == "success"
+        assert [p["price"] for p in result["data"]] == [2.0, 2.5, 3.0]
+        assert result["count"] == 3
+
+    @patch("invutils.router.llama_price_chart")
+    def test_chart_llama_span(self, mock_llama):
+        mock_llama.return_value = _envelope("defillama")
+        PriceRouter(("defillama",)).chart("ethereum", 0, 10 * 3600, granularity="hourly")
+        mock_llama.assert_called_once_with("coingecko:ethereum", 0, 11, period="1h")
+
+    def test_chart_invalid_granularity(self):
+        with pytest.raises(ValueError, match="granularity must be one of"):
+            PriceRouter().chart("ethereum", 0, 1, granularity="minutely")
+
+
+class TestConsensus:
+    """Test suite for the concurrent median price across providers."""
+
+    @patch("invutils.router.twelvedata_price_current")
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_median_spread_and_outliers(self, mock_gecko, mock_llama, mock_td):
+        mock_gecko.return_value = _envelope("coingecko", data=[{"price": 100.0}])
+        mock_llama.return_value = _envelope("defillama", data=[{"price": 101.0}])
+        mock_td.return_value = _envelope("twelvedata", data=[{"price": 110.0}])
+
+        result = consensus_price(
+            "ethereum", api_keys={"twelvedata": "k"}, ids={"twelvedata": "ETH/USD"}
+        )
+
+        assert result["status"] == "success"
+        assert result["median"] == 101.0
+        assert result["spread"] == pytest.approx(10 / 101)
+        assert result["outliers"] == ["twelvedata"]
+        assert [row["provider"] for row in result["data"]] == [
+            "coingecko", "defillama", "twelvedata",
+        ]
+        mock_td.assert_called_once_with("ETH/USD", "k")
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_deadline_drops_slow_provider(self, mock_gecko, mock_llama):
+        """Test that the call returns at the deadline rather than after the slowest provider."""
+
+        def slow(*args, **kwargs):
+            time.sleep(1.0)
+            return _envelope("defillama")
+
+        mock_gecko.return_value = _envelope("coingecko", data=[{"price": 100.0}])
+        mock_llama.side_effect = slow
+        router = PriceRouter()
+
+        started = time.monotonic()
+        result = router.consensus("ethereum", deadline=0.1)
+
+        assert time.monotonic() - started < 0.5
+        assert result["median"] == 100.0
+        assert result["missing"] == ["defillama"]
+        assert router.health()["defillama"]["error_rate"] == 1.0
+
+    @patch("invutils.router.llama_price_historical")
+    @patch("invutils.router.gecko_price_current")
+    def test_too_few_sources_is_error(self, mock_gecko, mock_llama):
+        mock_gecko.return_value = _envelope("coingecko", data=[{"price": 100.0}])
+        mock_llama.return_value = _envelope("defillama", "error")
+
+        result = PriceRouter().consensus("ethereum", min_sources=2)
+
+        assert result["status"] == "error"
+        assert result["missing"] == ["defillama"]
+        assert result["median"] == 100.0
+
+    def test_invalid_deadline(self):
+        with pytest.raises(ValueError, match="deadline must be positive"):
+            PriceRouter().consensus("ethereum", deadline=0)
@@ -0,0 +1,164 @@
+"""Unit tests for invutils.utils.scheduler module."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.batch import Job, run_batch
+from invutils.utils import (
+    ApiRequest,
+    RequestScheduler,
+    current_priority,
+    get_scheduler,
+    handle_api_request,
+    priority_scope,
+    set_rate_limit,
+    set_scheduler,
+)
+
+
+def _queue(scheduler, priority, order):
+    """Start a thread that waits for a turn, records it, and ends it."""
+
+    def wait():
+        scheduler.wait_turn(priority)
+        order.append(priority)
+        scheduler.end_turn()
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    return thread
+
+
+def _until(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestPriorityScope:
+    """Test suite for priority classes."""
+
+    def test_default_is_interactive(self):
+        assert current_priority() == "interactive"
+
+    def test_scope_sets_and_restores(self):
+        with priority_scope("bulk"):
+            assert current_priority() == "bulk"
+        assert current_priority() == "interactive"
+
+    def test_unknown_class(self):
+        with pytest.raises(ValueError, match="priority must be one of"), priority_scope("urgent"):
+            pass
+
+
+class TestRequestScheduler:
+    """Test suite for weighted fair queuing."""
+
+    def test_interactive_jumps_bulk_queue(self):
+        """Test that an interactive waiter goes before bulk waiters queued earlier."""
+        scheduler = RequestScheduler({"interactive": 10, "bulk": 1})
+        order = []
+        assert scheduler.wait_turn("bulk")  # hold the turn while the queue builds
+        threads = []
+        for _ in range(3):
+            threads.append(_queue(scheduler, "bulk", order))
+        _until(lambda: scheduler.stats()["bulk"]["queued"] == 3)
+        threads.append(_queue(scheduler, "interactive", order))
+        _until(lambda: scheduler.stats()["interactive"]["queued"] == 1)
+
+        scheduler.end_turn()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert order == ["interactive", "bulk", "bulk", "bulk"]
+
+    def test_weights_share_turns(self):
+        """Test that backlogged classes get turns in proportion to their weights."""
+        scheduler = RequestScheduler({"interactive": 2, "bulk": 1})
+        order = []
+        assert scheduler.wait_turn("bulk")
+        threads = []
+        for priority in ["bulk"] * 3 + ["interactive"] * 6:
+            threads.append(_queue(scheduler, priority, order))
+            _until(lambda: sum(s["queued"] for s in scheduler.stats().values()) == len(threads))
+
+        scheduler.end_turn()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert order[:6].count("interactive") == 4
+
+    def test_timeout_leaves_queue(self):
+        scheduler = RequestScheduler()
+        assert scheduler.wait_turn("bulk")
+        assert not scheduler.wait_turn("interactive", timeout=0.02)
+        stats = scheduler.stats()["interactive"]
+        assert stats["queued"] == 0
+        assert stats["timed_out"] == 1
+
+    def test_wait_metrics(self):
+        scheduler = RequestScheduler()
+        scheduler.wait_turn("interactive")
+        scheduler.end_turn()
+        stats = scheduler.stats()["interactive"]
+        assert stats["granted"] == 1
+        assert stats["max_wait"] >= 0.0
+
+    def test_invalid_weight(self):
+        with pytest.raises(ValueError, match="must be positive"):
+            RequestScheduler({"bulk": 0})
+
+
+class TestScheduledRequests:
+    """Test suite for priority order under a provider's rate limit."""
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_interactive_served_before_bulk_backlog(self, mock_get):
+        sent = []
+
+        def get(url, **kwargs):
+            sent.append(url)
+            return Mock(status_code=200, json=Mock(return_value={}))
+
+        mock_get.side_effect = get
+        set_rate_limit("sched-test", 20, 1, burst=1)
+        set_scheduler("sched-test", RequestScheduler())
+
+        def call(url, priority):
+            with priority_scope(priority):
+                handle_api_request("sched-test", ApiRequest(url), 10)
+
+        try:
+            threads = [
+                threading.Thread(target=call, args=(f"https://x/bulk{i}", "bulk"))
+                for i in range(6)
+            ]
+            for t in threads:
+                t.start()
+            _until(lambda: get_scheduler("sched-test").stats()["bulk"]["queued"] >= 4)
+            threads.append(threading.Thread(target=call, args=("https://x/quote", "interactive")))
+            threads[-1].start()
+            for t in threads:
+                t.join(timeout=5)
+        finally:
+            set_rate_limit("sched-test", None)
+            set_scheduler("sched-test", None)
+
+        assert sent.index("https://x/quote") <= 3
+
+    @patch("invutils.batch.fetch_job")
+    def test_batch_runs_as_bulk(self, mock_fetch):
+        seen = []
+
+        def fetch(job, api_keys):
+            seen.append(current_priority())
+            return {"source": job.provider, "status": "success", "count": 0, "data": []}
+
+        mock_fetch.side_effect = fetch
+        run_batch([Job("defillama", "coingecko:bitcoin", "10", "1d", 1609459200, None)],
+                  lambda _rows: None)
+
+        assert seen == ["bulk"]
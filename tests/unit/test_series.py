@@ -0,0 +1,185 @@
+"""Unit tests for invutils.series module."""
+
+import math
+
+import pytest
+
+from invutils.series import PriceSeries, align
+
+
+@pytest.fixture
+def series():
+    """Hourly series at 100, 200, ..., 500."""
+    return PriceSeries([100, 200, 300, 400, 500], [1.0, 2.0, 3.0, 4.0, 5.0])
+
+
+class TestPriceSeriesConstruction:
+    """Test suite for building a PriceSeries."""
+
+    def test_unsorted_input_sorted_last_duplicate_wins(self):
+        """Test that input is sorted and repeated timestamps keep the last value."""
+        s = PriceSeries([300, 100, 200, 100], [3.0, 1.0, 2.0, 1.5])
+        assert list(s) == [(100, 1.5), (200, 2.0), (300, 3.0)]
+
+    def test_length_mismatch(self):
+        """Test that mismatched lengths are rejected."""
+        with pytest.raises(ValueError, match="same length"):
+            PriceSeries([1, 2], [1.0])
+
+    def test_from_envelope(self):
+        """Test building from a chart envelope, skipping null prices."""
+        envelope = {
+            "status": "success",
+            "data": [
+                {"timestamp": 200, "price": 2.0},
+                {"timestamp": 100, "price": 1.0},
+                {"timestamp": 300, "price": None},
+            ],
+        }
+        s = PriceSeries.from_envelope(envelope)
+        assert list(s) == [(100, 1.0), (200, 2.0)]
+        assert s.to_points() == [{"timestamp": 100, "price": 1.0}, {"timestamp": 200, "price": 2.0}]
+
+    def test_from_points_other_field(self):
+        """Test building from a non-price column."""
+        s = PriceSeries.from_points([{"timestamp": 1, "price": 5.0, "volume": 7.0}], "volume")
+        assert s.at(1) == 7.0
+
+
+class TestPriceSeriesLookups:
+    """Test suite for at() / index() lookups."""
+
+    @pytest.mark.parametrize(
+        "ts,mode,expected",
+        [
+            (300, "prev", 3.0),
+            (350, "prev", 3.0),
+            (99, "prev", None),
+            (350, "next", 4.0),
+            (501, "next", None),
+            (340, "nearest", 3.0),
+            (360, "nearest", 4.0),
+            (350, "nearest", 3.0),  # ties go to the earlier point
+            (10, "nearest", 1.0),
+            (900, "nearest", 5.0),
+        ],
+    )
+    def test_modes(self, series, ts, mode, expected):
+        """Test prev / next / nearest selection."""
+        assert series.at(ts, mode) == expected
+
+    def test_invalid_mode(self, series):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError, match="mode must be one of"):
+            series.at(100, mode="linear")
+
+    def test_empty_series(self):
+        """Test lookups on an empty series."""
+        s = PriceSeries([], [])
+        assert s.at(1) is None
+        assert s.at(1, "nearest") is None
+        assert s.start is None
+
+
+class TestPriceSeriesSlicing:
+    """Test suite for zero-copy slicing."""
+
+    def test_between_inclusive(self, series):
+        """Test that between() keeps both bounds."""
+        assert list(series.between(200, 400)) == [(200, 2.0), (300, 3.0), (400, 4.0)]
+        assert len(series.between(201, 299)) == 0
+
+    def test_slices_share_buffers(self, series):
+        """Test that slices are views over the original arrays."""
+        view = series[1:3]
+        assert view.timestamps.obj is series.timestamps.obj
+        assert view.at(250) == 2.0
+
+    def test_step_rejected(self, series):
+        """Test that stepped slices are refused (they cannot stay sorted views)."""
+        with pytest.raises(ValueError, match="step 1"):
+            series[::2]
+
+
+class TestPriceSeriesMerge:
+    """Test suite for merging series."""
+
+    def test_merge_interleaves_and_other_wins(self, series):
+        """Test that merge is ordered and other's values win on collisions."""
+        other = PriceSeries([50, 300, 600], [0.5, 30.0, 6.0])
+        merged = series.merge(other)
+        assert list(merged.timestamps) == [50, 100, 200, 300, 400, 500, 600]
+        assert merged.at(300) == 30.0
+
+    def test_merge_with_empty(self, series):
+        """Test that merging with an empty series returns the same points."""
+        assert series.merge(PriceSeries([], [])) == series
+        assert PriceSeries([], []).merge(series) == series
+
+
+class TestAlign:
+    """Test suite for as-of alignment onto a grid."""
+
+    def test_prev_with_forward_fill(self):
+        """Test backward as-of join with unlimited forward fill."""
+        s = PriceSeries([100, 300], [1.0, 3.0])
+        aligned = align({"a": s}, [50, 100, 200, 300, 400])
+        assert aligned.to_points() == [
+            {"timestamp": 50, "a": None},
+            {"timestamp": 100, "a": 1.0},
+            {"timestamp": 200, "a": 1.0},
+            {"timestamp": 300, "a": 3.0},
+            {"timestamp": 400, "a": 3.0},
+        ]
+
+    def test_nearest_absorbs_drift(self):
+        """Test that drifting timestamps land on the closest grid point."""
+        s = PriceSeries([3607, 7195], [1.0, 2.0])
+        aligned = align({"a": s}, [3600, 7200], mode="nearest")
+        assert list(aligned.column("a")) == [1.0, 2.0]
+
+    def test_tolerance(self):
+        """Test that points farther than tolerance are missing."""
+        s = PriceSeries([100], [1.0])
+        aligned = align({"a": s}, [100, 150, 250], tolerance=60)
+        assert [p["a"] for p in aligned.to_points()] == [1.0, 1.0, None]
+
+    def test_limit(self):
+        """Test that one point is reused at most limit times."""
+        s = PriceSeries([0], [1.0])
+        aligned = align({"a": s}, [0, 1, 2, 3], limit=2)
+        assert [p["a"] for p in aligned.to_points()] == [1.0, 1.0, 1.0, None]
+
+    def test_multiple_columns_and_datetime_points(self):
+        """Test aligning a timestamp series with a Twelve Data datetime series."""
+        token = PriceSeries([86400, 172800], [10.0, 11.0])
+        fx = PriceSeries.from_points(
+            [{"datetime": "1970-01-02", "close": 1.1}, {"datetime": "1970-01-03", "close": 1.2}],
+            "close",
+        )
+        aligned = align({"token": token, "eurusd": fx}, [86400, 172800])
+        assert aligned.columns == ("token", "eurusd")
+        assert list(aligned.rows()) == [(86400, 10.0, 1.1), (172800, 11.0, 1.2)]
+
+    def test_envelope_datetimes_read_in_its_timezone(self):
+        """Test that intraday datetimes agree with the epoch timestamps of the same envelope."""
+        envelope = {
+            "timezone": "America/New_York",
+            "data": [{"datetime": "2021-01-04 09:30:00", "close": 1.0}],
+        }
+        assert PriceSeries.from_envelope(envelope, "close").start == 1609770600
+        assert PriceSeries.from_points(envelope["data"], "close").start == 1609752600
+
+    def test_matches_point_lookups(self):
+        """Test that align agrees with PriceSeries.at for every mode."""
+        s = PriceSeries([10, 25, 40, 41, 90], [1.0, 2.0, 3.0, 4.0, 5.0])
+        grid = list(range(0, 100, 7))
+        for mode in ("prev", "next", "nearest"):
+            col = align({"a": s}, grid, mode=mode).column("a")
+            expected = [s.at(g, mode) for g in grid]
+            assert [None if math.isnan(v) else v for v in col] == expected
+
+    def test_invalid_grid(self):
+        """Test that an unsorted grid is rejected."""
+        with pytest.raises(ValueError, match="strictly increasing"):
+            align({}, [2, 1])
@@ -0,0 +1,135 @@
+"""Unit tests for the invutils proxy server and client forwarding."""
+
+import socket
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from invutils.prices.coingecko import gecko_price_current
+from invutils.prices.defillama import llama_price_chart
+from invutils.server import FUNCTIONS, make_server
+from invutils.utils import current_priority, priority_scope
+from invutils.utils.proxy import ProxyError, call_proxy, set_proxy
+
+
+@pytest.fixture
+def proxy_url():
+    """Run the proxy on an ephemeral TCP port and route client calls through it."""
+    server = make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    set_proxy(url)
+    yield url
+    set_proxy(None)
+    server.shutdown()
+    server.server_close()
+
+
+class TestProxyServer:
+    """Test suite for invutils serve."""
+
+    def test_exposes_public_functions(self):
+        """Test that every public price function is served, unwrapped."""
+        assert "gecko_price_current" in FUNCTIONS
+        assert "llama_price_chart" in FUNCTIONS
+        assert FUNCTIONS["gecko_price_current"] is gecko_price_current.__wrapped__
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_client_call_forwarded(self, mock_handle_api, proxy_url,
+                                   mock_gecko_price_current_response):
+        """Test that a configured proxy answers with the standard envelope."""
+        mock_handle_api.return_value = mock_gecko_price_current_response
+
+        result = gecko_price_current("bitcoin,ethereum")
+
+        assert result["source"] == "coingecko"
+        assert result["status"] == "success"
+        assert result["count"] == 2
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_priority_forwarded(self, mock_handle_api, proxy_url,
+                                mock_gecko_price_current_response):
+        """Test that the caller's priority class applies on the server."""
+        seen = []
+
+        def record(api_name, request, timeout):
+            seen.append(current_priority())
+            return mock_gecko_price_current_response
+
+        mock_handle_api.side_effect = record
+
+        with priority_scope("bulk"):
+            gecko_price_current("bitcoin")
+
+        assert seen == ["bulk"]
+
+    @patch("invutils.prices.defillama.handle_api_request")
+    def test_positional_args_forwarded(self, mock_handle_api, proxy_url,
+                                       mock_llama_price_chart_response):
+        """Test that positional arguments are bound to names before forwarding."""
+        mock_handle_api.return_value = mock_llama_price_chart_response
+
+        result = llama_price_chart(
+            "ethereum:0x0000000000000000000000000000000000000000", 1640908800, 3
+        )
+
+        assert result["span"] == 3
+        assert result["count"] == 3
+
+    def test_validation_errors_reraised(self, proxy_url):
+        """Test that server-side validation errors surface as the same exception type."""
+        with pytest.raises(ValueError, match="id cannot be empty"):
+            gecko_price_current("   ")
+
+    def test_unknown_function(self, proxy_url):
+        """Test that unknown functions are rejected."""
+        with pytest.raises(ProxyError):
+            call_proxy(proxy_url, "not_a_function", {})
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_unreachable_proxy_falls_back(self, mock_handle_api,
+                                          mock_gecko_price_current_response):
+        """Test that an unreachable proxy falls back to a direct call."""
+        mock_handle_api.return_value = mock_gecko_price_current_response
+        set_proxy("http://127.0.0.1:9")
+        try:
+            result = gecko_price_current("bitcoin")
+        finally:
+            set_proxy(None)
+
+        assert result["status"] == "success"
+        mock_handle_api.assert_called_once()
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_timeout_after_send_does_not_fall_back(self, mock_handle_api):
+        """Test that a call the proxy accepted but never answered is not repeated directly."""
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)  # accepts connections, never replies
+        set_proxy(f"http://127.0.0.1:{listener.getsockname()[1]}")
+        try:
+            result = gecko_price_current("bitcoin", deadline=0.1)
+        finally:
+            set_proxy(None)
+            listener.close()
+
+        assert result["status"] == "error"
+        assert result["source"] == "coingecko"
+        mock_handle_api.assert_not_called()
+
+    @patch("invutils.prices.coingecko.handle_api_request")
+    def test_unix_socket(self, mock_handle_api, tmp_path, mock_gecko_price_current_response):
+        """Test serving over a Unix domain socket."""
+        mock_handle_api.return_value = mock_gecko_price_current_response
+        path = str(tmp_path / "invutils.sock")
+        server = make_server(unix_socket=path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = call_proxy("unix://" + path, "gecko_price_current", {"id": "bitcoin"})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result["status"] == "success"
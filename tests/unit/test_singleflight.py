@@ -0,0 +1,271 @@
+"""Unit tests for invutils.utils.singleflight module."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from invutils.utils import deadline_scope, set_transport
+from invutils.utils.faults import _response
+from invutils.utils.helpers import (
+    ApiRequest,
+    coalescer,
+    handle_api_request,
+    handle_api_request_async,
+)
+from invutils.utils.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight coalescing."""
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that calls which do not overlap each execute."""
+        flight = SingleFlight()
+        func = Mock(return_value=42)
+
+        assert flight.do("k", func) == 42
+        assert flight.do("k", func) == 42
+
+        assert func.call_count == 2
+        assert flight.stats() == {"executed": 2, "coalesced": 0, "in_flight": 0}
+
+    def test_concurrent_identical_calls_share_one_execution(self):
+        """Test that overlapping calls with the same key run the function once."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return {"price": 1.0}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(timeout=5)
+
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)
+        ]
+        for t in followers:
+            t.start()
+        # Give followers time to register as waiters before releasing the leader
+        while flight.stats()["coalesced"] < 4:
+            time.sleep(0.001)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(timeout=5)
+
+        assert len(calls) == 1
+        assert results == [{"price": 1.0}] * 5
+        assert flight.stats()["coalesced"] == 4
+
+    def test_different_keys_run_independently(self):
+        """Test that distinct keys are never coalesced."""
+        flight = SingleFlight()
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+        assert flight.stats()["executed"] == 2
+
+    def test_exception_propagates_and_key_is_released(self):
+        """Test that a failing call raises and does not leave the key in flight."""
+        flight = SingleFlight()
+
+        def boom():
+            raise RuntimeError("upstream failed")
+
+        with pytest.raises(RuntimeError):
+            flight.do("k", boom)
+        assert flight.stats()["in_flight"] == 0
+        assert flight.do("k", lambda: "ok") == "ok"
+
+    def test_waiter_gives_up_after_timeout(self):
+        """Test that a waiter raises TimeoutError while the leader's call runs on."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(timeout=5)
+            return "late"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(timeout=5)
+
+        with pytest.raises(TimeoutError):
+            flight.do("k", slow, timeout=0.01)
+        release.set()
+        leader.join(timeout=5)
+
+        assert results == ["late"]
+        assert flight.stats()["in_flight"] == 0
+
+    def test_reset_stats(self):
+        """Test that reset_stats zeroes the counters."""
+        flight = SingleFlight()
+        flight.do("k", lambda: None)
+        flight.reset_stats()
+        assert flight.stats() == {"executed": 0, "coalesced": 0, "in_flight": 0}
+
+    def test_async_concurrent_calls_share_one_execution(self):
+        """Test that concurrent coroutines with the same key await one call."""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "shared"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(5)))
+
+        results = asyncio.run(main())
+
+        assert results == ["shared"] * 5
+        assert len(calls) == 1
+        assert flight.stats()["coalesced"] == 4
+
+    def test_async_exception_reaches_all_waiters(self):
+        """Test that a failing async call raises in every coalesced waiter."""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad payload")
+
+        async def main():
+            return await asyncio.gather(
+                *(flight.do_async("k", fetch) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+
+
+class TestApiRequestCoalescing:
+    """Test that handle_api_request coalesces identical ApiRequests."""
+
+    def test_request_key_ignores_param_order_and_api_key(self):
+        """Test that the request key is normalized."""
+        a = ApiRequest("https://x", params={"a": 1, "b": 2, "apikey": "secret-1"})
+        b = ApiRequest("https://x", params={"b": 2, "a": 1, "apikey": "secret-2"})
+        assert a.key() == b.key()
+        assert "secret" not in repr(a)
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_concurrent_identical_requests_hit_upstream_once(self, mock_get):
+        """Test that threads requesting the same URL share one upstream call."""
+        response = Mock()
+        response.json.return_value = {"bitcoin": {"usd": 1.0}}
+        response.raise_for_status = Mock()
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            return response
+
+        mock_get.side_effect = slow_get
+        request = ApiRequest("https://api.example/simple/price", params={"ids": "bitcoin"})
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(handle_api_request("x", request, 10)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert results == [{"bitcoin": {"usd": 1.0}}] * 5
+        assert mock_get.call_count == 1
+
+    def test_followers_see_the_shared_status(self):
+        """Test that every coalesced caller's request gets the status of the shared response."""
+        calls = []
+
+        def slow_not_found(url, **_kwargs):
+            calls.append(url)
+            time.sleep(0.05)
+            return _response(url, 404, b'{"error": "coin not found"}')
+
+        set_transport(slow_not_found)
+        try:
+            api_requests = [ApiRequest("https://api.example/coins/nope") for _ in range(3)]
+            threads = [
+                threading.Thread(target=handle_api_request, args=("x", request, 10))
+                for request in api_requests
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=5)
+        finally:
+            set_transport(None)
+
+        assert len(calls) == 1
+        assert [request.status_code for request in api_requests] == [404, 404, 404]
+
+    def test_follower_returns_none_at_its_deadline(self, caplog):
+        """Test that a coalesced caller stops waiting on the leader when its deadline passes."""
+        release = threading.Event()
+
+        def slow(url, **_kwargs):
+            release.wait(timeout=5)
+            return _response(url, 200, b'{"ok": true}')
+
+        set_transport(slow)
+        try:
+            results = []
+            leader = threading.Thread(
+                target=lambda: results.append(
+                    handle_api_request("x", ApiRequest("https://api.example/slow"), 10)
+                )
+            )
+            leader.start()
+            while coalescer.stats()["in_flight"] < 1:
+                time.sleep(0.001)
+
+            start = time.monotonic()
+            with deadline_scope(0.05):
+                follower = handle_api_request("x", ApiRequest("https://api.example/slow"), 10)
+            waited = time.monotonic() - start
+            release.set()
+            leader.join(timeout=5)
+        finally:
+            set_transport(None)
+
+        assert follower is None
+        assert waited < 1.0
+        assert results == [{"ok": True}]
+        assert "Deadline Error: no response before the deadline" in caplog.text
+
+    @patch("invutils.utils.helpers.requests.get")
+    def test_async_identical_requests_hit_upstream_once(self, mock_get):
+        """Test that the asyncio path coalesces identical requests."""
+        response = Mock()
+        response.json.return_value = {"ok": True}
+        response.raise_for_status = Mock()
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            return response
+
+        mock_get.side_effect = slow_get
+        request = ApiRequest("https://api.example/chart", params={"days": 30})
+
+        async def main():
+            return await asyncio.gather(
+                *(handle_api_request_async("x", request, 10) for _ in range(5))
+            )
+
+        assert asyncio.run(main()) == [{"ok": True}] * 5
+        assert mock_get.call_count == 1
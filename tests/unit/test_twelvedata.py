@@ -266,6 +266,7 @@ class TestTwelvedataPriceHistorical:
         assert result["status"] == "error"
         assert result["count"] == 0
         assert result["data"] == []
+        assert result["message"] == "symbol not found"
 
     @patch("invutils.prices.twelvedata.handle_api_request")
     def test_empty_values_list(self, mock_handle_api):
@@ -286,6 +287,79 @@ class TestTwelvedataPriceHistorical:
         assert result["interval"] == "1week"
 
 
+class TestTwelvedataEpoch:
+    """Test suite for twelvedata_price_historical(epoch=True)."""
+
+    def test_invalid_epoch_type(self):
+        with pytest.raises(TypeError, match="epoch must be a boolean"):
+            twelvedata_price_historical("AAPL", "key", epoch="yes")
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_daily_bars_utc_midnight(self, mock_handle_api, mock_twelvedata_price_historical_response):
+        mock_handle_api.return_value = mock_twelvedata_price_historical_response
+
+        result = twelvedata_price_historical("AAPL", "test-key", epoch=True)
+
+        assert [row["timestamp"] for row in result["data"]] == [1609891200, 1609804800, 1609718400]
+        assert result["data"][0]["datetime"] == "2021-01-06"
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_intraday_uses_exchange_timezone_and_dst(self, mock_handle_api):
+        bar = {"open": "1", "high": "1", "low": "1", "close": "1"}
+        mock_handle_api.return_value = {
+            "meta": {"exchange_timezone": "America/New_York"},
+            "values": [
+                {"datetime": "2021-07-01 09:30:00", **bar},  # EDT, UTC-4
+                {"datetime": "2021-01-04 09:30:00", **bar},  # EST, UTC-5
+                {"datetime": "2021-01-04 15:59:00", **bar},
+            ],
+        }
+
+        result = twelvedata_price_historical("AAPL", "test-key", interval="1min", epoch=True)
+
+        assert [row["timestamp"] for row in result["data"]] == [
+            1625146200, 1609770600, 1609793940,
+        ]
+        assert result["timezone"] == "America/New_York"
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_forex_without_timezone_is_utc(self, mock_handle_api):
+        mock_handle_api.return_value = {
+            "meta": {"symbol": "EUR/USD"},
+            "values": [{"datetime": "2021-01-04 10:00:00", "open": "1", "high": "1",
+                        "low": "1", "close": "1"}],
+        }
+
+        result = twelvedata_price_historical("EUR/USD", "test-key", interval="1h", epoch=True)
+
+        assert result["data"][0]["timestamp"] == 1609754400
+        assert "timezone" not in result
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_requested_timezone_is_sent_and_used(self, mock_handle_api):
+        mock_handle_api.return_value = {
+            "meta": {"exchange_timezone": "America/New_York"},
+            "values": [{"datetime": "2021-01-04 14:30:00", "open": "1", "high": "1",
+                        "low": "1", "close": "1"}],
+        }
+
+        result = twelvedata_price_historical(
+            "AAPL", "test-key", interval="1min", start_date="2021-01-04 14:30:00",
+            epoch=True, timezone="UTC",
+        )
+
+        assert mock_handle_api.call_args[0][1].params["timezone"] == "UTC"
+        assert result["data"][0]["timestamp"] == 1609770600
+
+    @patch("invutils.prices.twelvedata.handle_api_request")
+    def test_default_omits_timestamp(self, mock_handle_api, mock_twelvedata_price_historical_response):
+        mock_handle_api.return_value = mock_twelvedata_price_historical_response
+
+        result = twelvedata_price_historical("AAPL", "test-key")
+
+        assert all("timestamp" not in row for row in result["data"])
+
+
 class TestTwelvedataPriceChartAlias:
     """Verify twelvedata_price_chart is an alias for twelvedata_price_historical."""
 